@@ -11,6 +11,7 @@ vorticity, etc.
 The following routines are currently implemented:
 
      alt2press -- Calculate pressure from elevation and altimeter setting.
+     avwind_batch -- Calculate the density weighted mean wind of a layer for a batch of wind soundings.
      calccondpr -- Calculate condensation pressure from the pressure, temperature, and relative humidity.
      calccondprdef -- Calculate condensation pressure deficit from the pressure, temperature, and relative humidity.
      calcdpd -- Calculate dewpoint depression from temperature and relative humidity.
@@ -25,31 +26,124 @@ The following routines are currently implemented:
      calctv -- Calculate virtual temperature from the pressure, temperature, and relative humidity.
      calctv2 -- Calculate virtual temperature from  temperature and specific humidity.
      calctw -- Calculate wet-bulb temperature from pressure, temperature, and relative humidity.
+     call_stats -- Statistics of the calls recorded with set_instrumentation.
+     capecin -- Calculate CAPE, CIN and the LCL, LFC and equilibrium level for a batch of soundings.
      cclpar -- Calculate pressure, height, and temperature of the convective condensation level (CCL) from a sounding.
+     cclpar_batch -- Calculate the convective condensation level for a batch of soundings.
      cgp -- Calculate convective gust potential based on Western Region Technical Attachment 76-??.
+     contour -- Calculate contour lines of a grid for any number of levels, without shared state.
+     copy_mode -- Report or forbid copies of input arrays, optionally treating C-ordered grids as transposed.
      derived_icing -- Calculate derived icing value from temperature and relative humidity
      dmixr -- Calculate the water vapor mixing ratio with respect to either water or ice.
      dzdlnp -- Calculate the rate of change of height versus the log of pressure.
+     eqp_batch -- Resample a ragged batch of soundings at uniform pressure intervals.
      esat -- Calculate saturation vapor pressure as a function of temperature
+     esat_table -- Context manager interpolating saturation vapor pressure in a table.
+     fndiverg -- Calculate the divergence of the component of the Q-vector normal to the isotherms.
+     frzlev_batch -- Calculate the pressure and height of the freezing level for a batch of soundings.
+     gusts_batch -- Calculate the gust potential for a batch of soundings.
+     helicity_batch -- Calculate helicity and storm relative helicity for a batch of wind soundings.
      hgt2pres -- Calculate pressure from height based on a standard atmosphere.
+     instrumentation -- Context manager recording the calls, time, copies and missing values of the routines.
+     isentropic -- Interpolate pressure, winds and height from pressure levels to isentropic surfaces.
+     kinematics -- Calculate vorticity, divergence, deformation and advection fields in one pass over a grid.
+     lclpar_batch -- Calculate the lifting condensation level for a batch of soundings.
      mixrat -- Calculate mixing ratio from the pressure, temperature, and relative humidity.
+     moist_table -- Context manager interpolating pseudo-moist adiabats in a table cached on disk.
+     moistlift -- Calculate the temperature of parcels lifted along a pseudo-moist adiabat.
+     moisture -- Calculate dewpoint, mixing ratio, theta-e, wet-bulb and other humidity fields in one pass over a grid.
      mslp2thkns -- Estimate 1000 to 500 mb layer thickness from 500 mb height and mean sea level pressure
+     parallel -- Context manager computing large grids in bands on several threads.
      pottemp -- Calculate the potential temperature based on temperature, dewpoint temperature, and pressure
      press2alt -- Calculate altimeter setting from pressure and elevation
      ptozsa -- Convert a pressure into height in a standard atmosphere
+     qdiverg -- Calculate the Q-vector divergence at a pressure level.
+     qg_diagnostics -- Calculate Q-vector, Qn, Qs, their divergences and frontogenesis from cached gradients.
+     qg_layer -- Calculate the geostrophic and thermal gradients of a layer once for qg_diagnostics.
+     qg_level -- Calculate the geostrophic and thermal gradients of a single level once for qg_diagnostics.
+     radiation -- Calculate the mean solar radiation at the ground, broadcasting over time and grid points.
      radnorm -- Calculate normalized earth-sun distance factor (R0/R)**2
+     reset_call_stats -- Clear the statistics returned by call_stats.
+     richno_batch -- Calculate the bulk Richardson number for a batch of soundings.
+     set_copy_mode -- Session wide form of copy_mode.
+     set_esat_table -- Session wide form of esat_table.
+     set_instrumentation -- Session wide form of instrumentation.
+     set_moist_table -- Session wide form of moist_table.
+     set_wetbulb_iterations -- Session wide form of wetbulb_iterations.
+     set_workers -- Session wide form of parallel.
      slfront -- Calculate the QG frontogenesis function on a single level using just that level's data.
      soldec -- Calculate solar declination angle
      spechum -- Calculate specific humidity from pressure, temperature, and relative humidity.
      spechum2 -- Calculate saturation specific  humidity from dewpoint and pressure.
+     sweat_batch -- Calculate the SWEAT index for a batch of soundings.
      tdofesat -- Calculate dewpoint termperature as a function of saturation vapor pressure
      thetawa -- Calculate the adiabatic web bulb potential temperature
      timeq -- Calculate equation of time
+     totals_batch -- Calculate the total, cross and vertical totals indices for a batch of soundings.
+     tplcl -- Calculate the temperature and pressure of the lifting condensation level of parcels, with a status mask.
+     tpzlcl -- Calculate the temperature, pressure and distance to the lifting condensation level of parcels, with a status mask.
      tv2temp -- Calculate temperature from the virtual temperature and specific humidity.
+     vertical_interp -- Interpolate fields to pressure levels with a plan from vertical_plan.
+     vertical_plan -- Find the pressures bracketing a set of levels in every column once for vertical_interp.
+     wetbulb_iterations -- Context manager solving wet-bulb and LCL temperatures in a fixed number of steps.
      ztopsa -- Convert a height into pressure in a standard atmosphere
 """
 
+import sys
+import types
+
 from .version import git_revision as __git_revision__
 from .version import version as __version__
 
-from awips import *
+
+class _Package(types.ModuleType):
+    """
+    The aoslib package, which imports the routines from awips, and with them
+    numpy and the _awips extension, when one of them is first used.
+
+    Each routine is looked up in awips the first time it is used and then
+    kept as an attribute of the package, as ``from awips import *`` would
+    have made it.
+    """
+
+    def __getattr__(self, name):
+        if name.startswith('__') and name != '__all__':
+            raise AttributeError(name)
+        awips = _import_awips()
+        if name == '__all__':
+            return _public(awips)
+        # The import of awips sets the submodules (awips, _awips) on the
+        # package, other names are taken from awips.
+        if name in self.__dict__:
+            return self.__dict__[name]
+        if name not in awips.__all__:
+            raise AttributeError("module %r has no attribute %r" %
+                                 (self.__name__, name))
+        value = getattr(awips, name)
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | set(_public(_import_awips())))
+
+
+def _import_awips():
+    """ The awips module, imported the first time it is needed. """
+    name = __name__ + '.awips'
+    if name not in sys.modules:
+        __import__(name)
+    return sys.modules[name]
+
+
+def _public(module):
+    """ The names ``from module import *`` imports, its ``__all__``. """
+    return list(module.__all__)
+
+
+# Replace this module by a _Package holding the same attributes.  The
+# original is kept, as Python 2 clears the globals of a module when it is
+# deleted.
+_package = _Package(__name__, __doc__)
+_package.__dict__.update(sys.modules[__name__].__dict__)
+_package._module = sys.modules[__name__]
+sys.modules[__name__] = _package
@@ -1,10 +1,1195 @@
 """
 Python front end to routines in AWIPS I
+
+The pointwise grid routines (calctd, calcrh, mixrat, add_aray, ...) accept
+arrays of any number of dimensions.  The arguments are broadcast against
+each other and the result has the broadcast shape, so a stack of levels
+(nlev, ny, nx) or a scalar surface pressure combined with a temperature
+grid can be processed in a single call.  Results have at least two
+dimensions, one dimensional input gives a result of shape (n, 1).  The
+`ni` row count option only applies to one and two dimensional input.
+
+The Fortran routines work on float32 arrays in Fortran order and any other
+input is copied into a temporary before the call.  `copy_mode` reports
+these copies, as a warning or a `CopyError`, and with ``transposed=True``
+lets the pointwise grid routines work on C-contiguous float32 grids
+directly by treating them as the transposed Fortran layout:
+
+>>> import aoslib
+>>> import numpy as np
+>>> t = np.zeros((1000, 2000), dtype=np.float32) + 300.
+>>> rh = np.zeros((1000, 2000), dtype=np.float32) + 50.
+>>> with aoslib.copy_mode('raise', transposed=True):
+...     td = aoslib.calctd(t, rh)
+
+`set_copy_mode` changes the same settings for the rest of the session.
+
+Missing values are marked by the Fortran routines with values above 99998
+on input and the flag 1e37 on output.  The pointwise grid routines and the
+``*_aray`` style routines also take NaN or masked (``numpy.ma``) input
+values as missing, and with ``missing='nan'`` or ``missing='mask'`` return
+NaN in place of the flag or a masked array.  The conversion is done on
+each band of the result as it is computed:
+
+>>> td = aoslib.calctd([[300., np.nan]], [[50., 50.]], missing='nan')
+>>> round(float(td[0, 0]), 2), bool(np.isnan(td[0, 1]))
+(288.7, True)
+
+The grid routines with stencils (smooth, slfront, calcpv, meanomega,
+dgeocomps, qdiverg, fndiverg), capecin and the ``*_batch`` sounding
+routines take the same `missing` option and masked input.  The failure
+value -999 of thetawa, which it returns for unphysical input such as a
+dewpoint at or below 0 K, and the flag 99999 of the sounding routines for
+levels which are not found are missing as well.  The single sounding
+routines (cclpar, cgp, ctop, dzdlnp, richno, ptozsa, ztopsa) return the
+flags of the Fortran routines unchanged.
+
+The compiled routines release the GIL while they run, so calls made from
+several threads, for example on different tiles of a grid, run in
+parallel.  Within ``with aoslib.parallel(workers):`` (or after
+`set_workers`) the pointwise grid routines, smooth, slfront, kinematics,
+moisture, isentropic and the QG routines do this themselves, splitting
+large grids between a pool of threads.  The contouring routines
+(fortconbuf, contr1_b, smoothing_b) keep their state in COMMON blocks and
+hold the GIL instead; `contour` keeps none and can be run from several
+threads.  The Q-vector smoothing set by setqsmooth is shared by all
+threads.
+
+`esat_table` (or `set_esat_table`) replaces the saturation vapor pressure
+formula by interpolation in a table of selectable resolution, trading
+accuracy for throughput in esat, mixrat, spechum, calctw, moisture and
+the parcel routines.  In the same way `moist_table` replaces the integration of
+pseudo-moist adiabats in thetawa, cgp and moistlift by interpolation in a
+table which is cached on disk, and `wetbulb_iterations` replaces the
+convergence tests of the wet-bulb (calctw, moisture) and LCL (thetawa,
+cgp) solvers by a fixed number of Newton steps.
+
+`instrumentation` (or `set_instrumentation` and `call_stats`) records the
+number of calls of each routine, the time spent in the Python wrapper,
+in converting the arguments and in the compiled routines, the number of
+elements and bytes copied and the number of missing values returned.
+
+`qg_layer` and `qg_level` compute the geostrophic and thermal gradients
+behind qdiverg, fndiverg, fsdiverg, frontogen, slqdiv and slfront once, and
+`qg_diagnostics` derives any of those products from the cached result.
+
+`vertical_plan` finds the pair of pressures bracketing each of a set of
+levels in every column of model or sounding data once, and
+`vertical_interp` interpolates any number of fields to the levels with it.
+
+`radiation` broadcasts the solar radiation over time series and grids, and
+radnorm, soldec and timeq accept arrays of days.  The terms depending on
+the day are computed once for each distinct day and cached.
 """
 
+import functools
+import multiprocessing
+import os
+import threading
+import time
+import warnings
+from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
+
+import numpy as np
+
 import _awips
 
-def density(p,tvir):
+# The routines and settings of the package, which aoslib exports.
+__all__ = ['CopyError', 'CopyWarning', 'QGGradients', 'VerticalPlan',
+           'add_aray', 'add_by_cnst', 'alt2press', 'avwind_batch',
+           'calccondpr', 'calccondprdef', 'calcdpd', 'calcli', 'calcpv',
+           'calcrh', 'calcrh2', 'calctd', 'calctd2', 'calcthetae',
+           'calcthetae2', 'calctv', 'calctv2', 'calctw', 'call_stats',
+           'capecin', 'cclpar', 'cclpar_batch', 'cgp', 'constant', 'contour',
+           'copy_mode', 'crossvectors', 'ctop', 'density', 'derivative',
+           'derived_icing', 'dgeocomps', 'div_aray', 'dmixr', 'dotvectors',
+           'dzdlnp', 'eqp_batch', 'esat', 'esat_table', 'exp_aray', 'fndiverg',
+           'frzlev_batch', 'gusts_batch', 'helicity_batch', 'hgt2pres',
+           'instrumentation', 'isentropic', 'kinematics', 'lclpar_batch',
+           'lintrans', 'meanomega', 'mixrat', 'moist_table', 'moistlift',
+           'moisture', 'mslp2thkns', 'mult_by_cnst', 'natlog', 'parallel',
+           'pottemp', 'powercalc', 'press2alt', 'ptozsa', 'qdiverg',
+           'qg_diagnostics', 'qg_layer', 'qg_level', 'radiation', 'radnorm',
+           'reset_call_stats', 'richno', 'richno_batch', 'set_copy_mode',
+           'set_esat_table', 'set_instrumentation', 'set_moist_table',
+           'set_wetbulb_iterations', 'set_workers', 'slfront', 'smooth',
+           'soldec', 'spechum', 'spechum2', 'sweat_batch', 'tdofesat',
+           'thetawa', 'timeq', 'totals_batch', 'tplcl', 'tpzlcl', 'tv2temp',
+           'vertical_interp', 'vertical_plan', 'wetbulb_iterations', 'ztopsa']
+
+_copy_settings = {'copies': 'allow', 'transposed': False}
+_parallel_settings = {'workers': 1}
+_esat_settings = {'points': 0}
+_moist_settings = {'table': False}
+_wetbulb_settings = {'iterations': 0}
+_moist_tables = {}
+
+# Call statistics: the stores being filled, and those of the session and of
+# the instrumentation context managers.
+_stats_settings = {'stores': []}
+_session_stats = {}
+_stats_lock = threading.Lock()
+_stats_local = threading.local()
+_clock = getattr(time, 'perf_counter', time.time)
+# Public functions which change settings rather than compute, and are not
+# instrumented.
+_SETTINGS = ('set_copy_mode', 'copy_mode', 'set_workers', 'parallel',
+             'set_esat_table', 'esat_table', 'set_moist_table', 'moist_table',
+             'set_wetbulb_iterations', 'wetbulb_iterations',
+             'set_instrumentation', 'instrumentation', 'call_stats',
+             'reset_call_stats')
+_STATS_FIELDS = ('calls', 'time', 'kernel_calls', 'kernel_time',
+                 'conversion_time', 'elements', 'copies', 'bytes_copied',
+                 'missing')
+
+# Moist adiabat table: wet bulb potential temperature of the first adiabat
+# and spacing (K), number of adiabats, first pressure and pressure spacing
+# (mb) and number of pressures.
+_MOIST_GRID = (223.15, 0.25, 401, 1050., 5., 201)
+_pools = {}
+
+# Smallest number of grid points worth giving to a worker thread.
+_MIN_BAND = 16384
+
+
+class CopyError(ValueError):
+    """ An input array had to be copied while copy_mode is 'raise'. """
+    pass
+
+
+class CopyWarning(RuntimeWarning):
+    """ An input array had to be copied while copy_mode is 'warn'. """
+    pass
+
+
+def set_copy_mode(copies='allow', transposed=False):
+    """
+    Set how input arrays which must be copied before a call are reported.
+
+    Parameters
+    ----------
+    copies : {'allow', 'warn', 'raise'}
+        'allow' copies silently, 'warn' issues a CopyWarning and 'raise'
+        raises a CopyError for every input which is not already a float32
+        array in the layout the routine uses.  Scalars and smaller arrays
+        broadcast against the other inputs are expanded into a full array
+        and reported as 'broadcast'.
+    transposed : bool
+        True to pass two dimensional C-contiguous input of the pointwise
+        grid routines as the transposed Fortran ordered array, which needs
+        no copy for float32 data.  The result is then C-contiguous.  The
+        `ni` row count option cannot be used in this mode.
+
+    Returns
+    -------
+    previous : tuple
+        The previous (copies, transposed) settings.
+
+    """
+    if copies not in ('allow', 'warn', 'raise'):
+        raise ValueError("copies must be 'allow', 'warn' or 'raise'")
+    previous = (_copy_settings['copies'], _copy_settings['transposed'])
+    _copy_settings['copies'] = copies
+    _copy_settings['transposed'] = bool(transposed)
+    return previous
+
+
+@contextmanager
+def copy_mode(copies='raise', transposed=False):
+    """
+    Context manager form of `set_copy_mode`.
+
+    The previous settings are restored on exit.
+
+    Examples
+    --------
+    >>> import aoslib
+    >>> with aoslib.copy_mode('raise'):
+    ...     aoslib.calctd([[300.]], [[50.]])
+    Traceback (most recent call last):
+        ...
+    CopyError: calctd: input 1 of 2 is copied (float64, C order)
+
+    """
+    previous = set_copy_mode(copies, transposed)
+    try:
+        yield
+    finally:
+        set_copy_mode(*previous)
+
+
+def set_workers(workers=1):
+    """
+    Set the number of threads used by the grid routines.
+
+    With more than one worker the pointwise grid routines, the ``*_aray``
+    style routines (esat, dmixr, ...), smooth and slfront split large grids
+    into bands along the second (nj) dimension which are computed
+    concurrently and written into a single output array.  The stencil
+    routines compute each band with enough neighbouring points (a halo) to
+    give the same result as a single call.
+
+    Parameters
+    ----------
+    workers : int or None
+        Number of threads, None for one per CPU.
+
+    Returns
+    -------
+    previous : int
+        The previous number of workers.
+
+    """
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if workers < 1:
+        raise ValueError('workers must be at least 1')
+    previous = _parallel_settings['workers']
+    _parallel_settings['workers'] = int(workers)
+    return previous
+
+
+@contextmanager
+def parallel(workers=None):
+    """
+    Context manager form of `set_workers`, by default using one thread per
+    CPU.
+
+    The previous number of workers is restored on exit.
+
+    Examples
+    --------
+    >>> import aoslib
+    >>> import numpy as np
+    >>> p = np.zeros((2000, 5000), dtype=np.float32, order='F') + 850.
+    >>> t = np.zeros((2000, 5000), dtype=np.float32, order='F') + 290.
+    >>> rh = np.zeros((2000, 5000), dtype=np.float32, order='F') + 70.
+    >>> with aoslib.parallel(8):
+    ...     tw = aoslib.calctw(p, t, rh)
+
+    """
+    previous = set_workers(workers)
+    try:
+        yield
+    finally:
+        set_workers(previous)
+
+
+def set_esat_table(points=0):
+    """
+    Select table interpolation for the saturation vapor pressure.
+
+    esat, mixrat, spechum, calctw and the routines using adiabatic_te
+    (calcli, the parcel routines, ...) normally evaluate
+    exp(26.66082 - 0.0091379024*K - 6106.396/K) at every point.  With a
+    table of `points` values spread evenly from 173.15 K to 373.15 K they
+    interpolate linearly instead, which is faster at the cost of accuracy.
+    The largest relative error of the saturation vapor pressure is about
+    0.0044 * dt**2 for a spacing of dt degrees:
+
+    ======  =======  ===============
+    points  dt (K)   relative error
+    ======  =======  ===============
+    201     1.0      4.4e-3
+    2001    0.1      4.5e-5
+    20001   0.01     4.3e-6
+    ======  =======  ===============
+
+    The table takes 160 kB whatever its resolution.  Temperatures outside
+    it use the exact formula, as do the dewpoint routines (the inverse
+    needs a logarithm to index a table, which costs more than the closed
+    form).  The table is shared by all threads and should not be changed
+    while another thread is computing.
+
+    Parameters
+    ----------
+    points : int
+        Number of table points, between 2 and 20001, or 0 for the exact
+        formula.
+
+    Returns
+    -------
+    previous : int
+        The previous number of table points.
+
+    """
+    if points != 0 and not 2 <= points <= 20001:
+        raise ValueError('points must be 0 or between 2 and 20001')
+    previous = _esat_settings['points']
+    _awips.setesatlut(points)
+    _esat_settings['points'] = int(points)
+    return previous
+
+
+@contextmanager
+def esat_table(points=2001):
+    """
+    Context manager form of `set_esat_table`, by default using a 0.1 K
+    table.
+
+    The previous table is restored on exit.
+
+    Examples
+    --------
+    >>> import aoslib
+    >>> import numpy as np
+    >>> with aoslib.esat_table(2001):
+    ...     es = aoslib.esat(np.linspace(250., 300., 5))
+
+    """
+    previous = set_esat_table(points)
+    try:
+        yield
+    finally:
+        set_esat_table(previous)
+
+
+def _moist_adiabats():
+    """
+    The moist adiabat table, read from the cache directory or, the first
+    time, built with moisttable and saved there.
+    """
+    cache = os.environ.get('AOSLIB_CACHE',
+                           os.path.join(os.path.expanduser('~'), '.cache',
+                                        'aoslib'))
+    path = os.path.join(cache, 'moist_adiabats_%g_%g_%d_%g_%g_%d.npy' %
+                        _MOIST_GRID)
+    if path in _moist_tables:
+        return _moist_tables[path]
+    thw0, dthw, nthw, p0, dp, npres = _MOIST_GRID
+    table = None
+    try:
+        table = np.load(path)
+    except (IOError, OSError, ValueError):
+        pass
+    if (table is None or table.shape != (npres, nthw) or
+            table.dtype != np.float32):
+        table = np.asfortranarray(
+            _awips.moisttable(thw0, dthw, p0, dp, npres, nthw))
+        # Written under a temporary name and renamed so that a concurrent
+        # reader never sees part of a table.  The table is rebuilt next
+        # time if the cache directory cannot be written.
+        try:
+            if not os.path.isdir(cache):
+                os.makedirs(cache)
+            tmp = '%s.%d.tmp' % (path, os.getpid())
+            with open(tmp, 'wb') as f:
+                np.save(f, table)
+            os.rename(tmp, path)
+        except (IOError, OSError):
+            pass
+    _moist_tables[path] = table
+    return table
+
+
+def set_moist_table(table=False):
+    """
+    Select interpolation in a table of pseudo-moist adiabats.
+
+    thetawa, cgp and moistlift normally integrate the pseudo-moist adiabat
+    of every parcel with pseudolift.  With the table they interpolate
+    between 401 adiabats, with wet bulb potential temperatures from
+    223.15 K to 323.15 K every 0.25 K, tabulated every 5 mb from 1050 mb
+    to 50 mb, which is over a hundred times faster.  Parcels outside the
+    table are still integrated.  Compared to the 100 step integration the
+    results differ by at most 0.003 K for thetawa, and for moistlift by
+    0.003 K up to 300 mb and 0.015 K up to 100 mb.
+
+    The table (320 kB) is built the first time it is used and saved in the
+    directory named by the AOSLIB_CACHE environment variable, by default
+    ~/.cache/aoslib, from which later sessions read it.  It is shared by
+    all threads and should not be switched while another thread is
+    computing.
+
+    Parameters
+    ----------
+    table : bool
+        True to use the table, False to integrate every parcel.
+
+    Returns
+    -------
+    previous : bool
+        The previous setting.
+
+    """
+    previous = _moist_settings['table']
+    if table:
+        thw0, dthw, nthw, p0, dp, npres = _MOIST_GRID
+        _awips.setmoistlut(_moist_adiabats(), thw0, dthw, p0, dp)
+    else:
+        _awips.setmoistlut(np.zeros((1, 1), dtype=np.float32, order='F'),
+                           0., 1., 0., 1.)
+    _moist_settings['table'] = bool(table)
+    return previous
+
+
+@contextmanager
+def moist_table(table=True):
+    """
+    Context manager form of `set_moist_table`.
+
+    The previous setting is restored on exit.
+
+    Examples
+    --------
+    >>> import aoslib
+    >>> import numpy as np
+    >>> with aoslib.moist_table():
+    ...     thw = aoslib.thetawa(np.linspace(270., 300., 5), 265., 850., 1)
+
+    """
+    previous = set_moist_table(table)
+    try:
+        yield
+    finally:
+        set_moist_table(previous)
+
+
+def set_wetbulb_iterations(iterations=0):
+    """
+    Select a fixed number of Newton steps for the wet-bulb and LCL solvers.
+
+    calctw solves for the wet-bulb temperature of each point, and tpzlcl
+    (so thetawa and cgp) for the LCL temperature of each parcel, by
+    iterating until the point converges, which keeps the loops from being
+    vectorized and makes their run time depend on the data.  With a fixed
+    number of steps every point takes the same, branch free, path instead:
+
+    * calctw takes the steps on the logarithm of the vapor pressure balance,
+      which is close to linear.  Three steps match the 1e-5 relative
+      convergence test of the iteration, to within 0.001 K, and are about
+      three times faster.
+    * tpzlcl starts from Bolton's (1980) equation 15, within 0.1 K of the
+      solution, and one or two steps give the same LCL temperature to
+      within 0.0001 K, the tolerance of its convergence test.
+
+    The setting is shared by all threads and should not be changed while
+    another thread is computing.  calctw can also be given the number of
+    steps for a single call.
+
+    Parameters
+    ----------
+    iterations : int
+        Number of Newton steps, or 0 to iterate until converged.
+
+    Returns
+    -------
+    previous : int
+        The previous number of steps.
+
+    """
+    if iterations < 0:
+        raise ValueError('iterations must not be negative')
+    previous = _wetbulb_settings['iterations']
+    _awips.settwfix(iterations)
+    _wetbulb_settings['iterations'] = int(iterations)
+    return previous
+
+
+@contextmanager
+def wetbulb_iterations(iterations=3):
+    """
+    Context manager form of `set_wetbulb_iterations`, by default taking
+    three steps.
+
+    The previous setting is restored on exit.
+
+    Examples
+    --------
+    >>> import aoslib
+    >>> with aoslib.wetbulb_iterations():
+    ...     tw = aoslib.calctw([[850.]], [[290.]], [[40.]])
+
+    """
+    previous = set_wetbulb_iterations(iterations)
+    try:
+        yield
+    finally:
+        set_wetbulb_iterations(previous)
+
+
+def set_instrumentation(enabled=False):
+    """
+    Record statistics of the calls of the aoslib routines.
+
+    While enabled each call of an aoslib routine adds to the statistics of
+    that routine, which `call_stats` returns:
+
+    * calls -- number of calls.
+    * time -- wall time in the routine (s).
+    * kernel_calls, kernel_time -- number of calls of the compiled
+      routines and the time in them (s), excluding argument conversion.
+    * conversion_time -- time converting array arguments of the compiled
+      routines to float32 arrays in Fortran order (s), which f2py would
+      otherwise do as part of the call.  With several worker threads
+      kernel_time and conversion_time are summed over the threads.
+    * elements -- number of array elements passed to the compiled
+      routines, inputs and outputs.
+    * copies, bytes_copied -- number of input arrays copied because they
+      are not float32 arrays in the memory order of the routine, as
+      reported by `copy_mode`, and the size of the copies (bytes).
+    * missing -- number of output elements with the 1e37 missing value flag.
+
+    The time outside the compiled routines and the argument conversion is
+    that of the Python wrapper.  When a routine calls another both record
+    the call, and compiled routines run in worker threads (see
+    `set_workers`) count for the routine which started them.  Recording
+    adds a few microseconds to each call, disabled it only costs a test of
+    a flag.
+
+    Parameters
+    ----------
+    enabled : bool
+        True to record statistics, False to stop.
+
+    Returns
+    -------
+    previous : bool
+        Whether statistics were being recorded before.
+
+    """
+    previous = any([s is _session_stats for s in _stats_settings['stores']])
+    stores = [s for s in _stats_settings['stores'] if s is not _session_stats]
+    if enabled:
+        stores.append(_session_stats)
+    _set_stats_stores(stores)
+    return previous
+
+
+@contextmanager
+def instrumentation():
+    """
+    Context manager recording statistics of the calls of the aoslib
+    routines made within it, see `set_instrumentation`.
+
+    Yields a dictionary of the statistics of each routine, filled in as the
+    routines are called.  Statistics recorded with `set_instrumentation`
+    are not changed.
+
+    Examples
+    --------
+    >>> import aoslib
+    >>> with aoslib.instrumentation() as stats:
+    ...     td = aoslib.calctd([[300., 1e37]], [[50., 50.]])
+    >>> stats['calctd']['calls'], stats['calctd']['missing']
+    (1, 1)
+
+    """
+    stats = {}
+    _set_stats_stores(_stats_settings['stores'] + [stats])
+    try:
+        yield stats
+    finally:
+        _set_stats_stores([s for s in _stats_settings['stores']
+                           if s is not stats])
+
+
+def call_stats():
+    """
+    Statistics of the calls recorded since `set_instrumentation` was
+    enabled or `reset_call_stats` called.
+
+    Returns
+    -------
+    stats : dict
+        Dictionary of the statistics of each routine called, keyed by the
+        name of the routine.  See `set_instrumentation` for the statistics.
+
+    """
+    with _stats_lock:
+        return dict((name, dict(record))
+                    for name, record in _session_stats.items())
+
+
+def reset_call_stats():
+    """ Clear the statistics returned by `call_stats`. """
+    with _stats_lock:
+        _session_stats.clear()
+
+
+def _set_stats_stores(stores):
+    """
+    Fill the statistics dictionaries in `stores`, calling the compiled
+    routines through `_InstrumentedModule` while there are any.
+    """
+    global _awips
+    module = _awips
+    if isinstance(module, _InstrumentedModule):
+        module = module.module
+    _awips = _InstrumentedModule(module) if stores else module
+    _stats_settings['stores'] = stores
+
+
+def _record(name, **counts):
+    """ Add `counts` to the statistics of the routine `name`. """
+    if name is None:
+        return
+    with _stats_lock:
+        for stats in _stats_settings['stores']:
+            if name not in stats:
+                stats[name] = dict.fromkeys(_STATS_FIELDS, 0)
+            record = stats[name]
+            for key, value in counts.items():
+                record[key] += value
+
+
+def _current_call():
+    """ Name of the aoslib routine being called by this thread, if any. """
+    calls = getattr(_stats_local, 'calls', None)
+    return calls[-1] if calls else None
+
+
+def _push_call(name):
+    """ Make `name` the routine being called by this thread. """
+    if not hasattr(_stats_local, 'calls'):
+        _stats_local.calls = []
+    _stats_local.calls.append(name)
+
+
+def _instrumented(func):
+    """ `func` recording its calls while `set_instrumentation` is on. """
+    name = func.__name__
+
+    def routine(*args, **kwargs):
+        if not _stats_settings['stores']:
+            return func(*args, **kwargs)
+        _push_call(name)
+        start = _clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _stats_local.calls.pop()
+            _record(name, calls=1, time=_clock() - start)
+
+    return functools.update_wrapper(routine, func)
+
+
+class _InstrumentedModule(object):
+    """
+    Stand-in for the _awips module whose compiled routines record the time
+    spent converting their arguments and running, the elements passed and
+    the missing values returned.
+    """
+
+    def __init__(self, module):
+        self.module = module
+        self.routines = {}
+
+    def __getattr__(self, name):
+        attr = getattr(self.module, name)
+        # Only the Fortran routines have a _cpointer, COMMON blocks such as
+        # qsmthcmn are callable f2py objects as well.
+        if not hasattr(attr, '_cpointer'):
+            return attr
+        if name not in self.routines:
+            self.routines[name] = self._routine(name, attr)
+        return self.routines[name]
+
+    def _routine(self, name, func):
+        def routine(*args, **kwargs):
+            start = _clock()
+            args = [_fortran_array(a) for a in args]
+            kwargs = dict((k, _fortran_array(a)) for k, a in kwargs.items())
+            converted = _clock()
+            result = func(*args, **kwargs)
+            done = _clock()
+            elements = sum([a.size for a in list(args) + list(kwargs.values())
+                            if isinstance(a, np.ndarray)])
+            outputs = result if isinstance(result, tuple) else (result, )
+            missing = 0
+            with np.errstate(invalid='ignore'):
+                for a in outputs:
+                    if (isinstance(a, np.ndarray) and
+                            a.dtype.kind == 'f'):
+                        missing += int(np.count_nonzero(a > 1e36))
+            _record(_current_call() or name, kernel_calls=1,
+                    kernel_time=done - converted,
+                    conversion_time=converted - start, elements=elements,
+                    missing=missing)
+            return result
+
+        routine.__name__ = name
+        return routine
+
+
+def _fortran_array(a):
+    """
+    A floating point array argument of a compiled routine as a float32
+    array in Fortran order, as f2py would convert it.
+    """
+    if isinstance(a, (list, tuple)):
+        a = np.asarray(a)
+    if (not isinstance(a, np.ndarray) or a.ndim == 0 or
+            a.dtype.kind != 'f'):
+        return a
+    if a.dtype == np.float32 and a.flags.f_contiguous:
+        return a
+    return np.asfortranarray(a, dtype=np.float32)
+
+
+def _bands(n, size, halo=0):
+    """
+    Split n columns, of a grid with size points, into one band per worker
+    thread.  None when the grid is too small to be worth splitting.
+    """
+    nbands = min(_parallel_settings['workers'], n // (2 * halo + 1),
+                 size // _MIN_BAND)
+    if nbands < 2:
+        return None
+    edges = np.linspace(0, n, nbands + 1).astype(int)
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _run(tasks):
+    """ Call each of the callables in tasks using the worker threads. """
+    workers = _parallel_settings['workers']
+    if workers not in _pools:
+        _pools[workers] = ThreadPool(workers)
+    name = _current_call()
+    if name is None:
+        _pools[workers].map(lambda task: task(), tasks)
+        return
+
+    def call(task):
+        # The worker threads record their calls for the caller's routine.
+        _push_call(name)
+        try:
+            task()
+        finally:
+            _stats_local.calls.pop()
+
+    _pools[workers].map(call, tasks)
+
+
+def _tiled(func, arrays, extra=(), kwargs=None, outarg='result', halo=0,
+           worknames=(), scratch=(), missing='flag'):
+    """
+    Call the (mni, nj) grid routine `func` on `arrays`, followed by the
+    scalars in `extra` and the keyword arguments `kwargs`.
+
+    When `set_workers` allows it the call is split into bands along the
+    second dimension, which are computed in the worker threads and written
+    into one output array, passed in and returned as the keyword argument
+    `outarg`.  A single column is split along the first dimension instead.
+    For stencil routines each band is extended by `halo` points either side
+    and only its inner part kept.  The work arrays named in `worknames` are
+    not shared between bands and the arrays at the positions in `scratch`,
+    which the routine overwrites, are copied for each band.  Missing values
+    in the output are converted as set by `missing`, band by band.
+    """
+    kwargs = dict(kwargs or {})
+    arrays = [a.reshape(-1, 1) if a.ndim == 1 else a for a in arrays]
+    shape = arrays[0].shape
+    axis = 1
+    if shape[1] == 1 and not halo and 'ni' not in kwargs:
+        axis = 0
+    bands = _bands(shape[axis], arrays[0].size, halo)
+    if bands is None:
+        result = func(*(arrays + list(extra)), **kwargs)
+        mask = _mask(result, missing)
+        _mark_missing(result, missing, mask)
+        return _masked(result, mask)
+    out = kwargs.pop(outarg, None)
+    if out is None:
+        out = np.zeros(shape, dtype=np.float32, order='F')
+    elif out.dtype != np.float32 or not out.flags.f_contiguous:
+        out = np.array(out, dtype=np.float32, order='F')
+    mask = _mask(out, missing)
+    for name in worknames:
+        kwargs.pop(name, None)
+
+    def band(lo, hi):
+        index = [slice(None), slice(None)]
+        if not halo:
+            index[axis] = slice(lo, hi)
+            index = tuple(index)
+            kw = dict(kwargs)
+            kw[outarg] = part = out[index]
+            result = func(*([a[index] for a in arrays] + list(extra)), **kw)
+            if not np.may_share_memory(result, part):
+                # A band of a 3D output is not contiguous and so was copied.
+                part[...] = result
+            _mark_missing(out[index], missing,
+                          None if mask is None else mask[index])
+            return
+        start = max(lo - halo, 0)
+        index[axis] = slice(start, min(hi + halo, shape[axis]))
+        index = tuple(index)
+        part = [a[index] for a in arrays]
+        for i in scratch:
+            part[i] = np.array(part[i], dtype=np.float32, order='F')
+        result = func(*(part + list(extra)), **kwargs)
+        out[:, lo:hi] = result[:, lo - start:hi - start]
+        _mark_missing(out[:, lo:hi], missing,
+                      None if mask is None else mask[:, lo:hi])
+
+    _run([lambda lo=lo, hi=hi: band(lo, hi) for lo, hi in bands])
+    return _masked(out, mask)
+
+
+def _filled(args):
+    """
+    The arguments as arrays, with the masked elements of ``numpy.ma``
+    arrays set to the 1e37 missing value flag.
+    """
+    return [np.where(np.ma.getmaskarray(a), 1e37, np.ma.getdata(a))
+            if np.ma.isMaskedArray(a) else np.asarray(a) for a in args]
+
+
+def _check_missing(missing):
+    """ Raise ValueError unless `missing` is one of the accepted values. """
+    if missing not in ('flag', 'nan', 'mask'):
+        raise ValueError("missing must be 'flag', 'nan' or 'mask'")
+
+
+def _mask(result, missing):
+    """
+    An empty mask for `result` when `missing` is 'mask', otherwise None.
+    """
+    _check_missing(missing)
+    if missing != 'mask':
+        return None
+    return np.empty(result.shape, dtype=bool,
+                    order='F' if result.flags.f_contiguous else 'C')
+
+
+def _mark_missing(result, missing, mask=None):
+    """
+    Replace the missing value flags (> 1e36) in `result` by NaN when
+    `missing` is 'nan', or set `mask` where they and NaNs are when it is
+    'mask'.
+    """
+    if missing == 'flag':
+        return
+    with np.errstate(invalid='ignore'):
+        if missing == 'nan':
+            np.copyto(result, np.nan, where=result > 1e36)
+        else:
+            np.less_equal(result, 1e36, out=mask)
+            np.logical_not(mask, out=mask)
+
+
+def _masked(result, mask):
+    """ `result` as a masked array when there is a mask. """
+    if mask is None:
+        return result
+    return np.ma.MaskedArray(result, mask=mask, copy=False)
+
+
+def _missing_results(results, missing, above=1e36, failed=None):
+    """
+    The results of a routine returning missing values as the values above
+    `above`, and as `failed` when given, with those of the floating point
+    arrays and scalars returned as NaN or masked as set by `missing`.  The
+    flags are left as they are with 'flag'.  `results` is a single
+    result or a tuple of them.  Other results are returned unchanged.
+    """
+    _check_missing(missing)
+    if missing == 'flag':
+        return results
+    if isinstance(results, tuple):
+        return tuple([_missing_results(r, missing, above, failed)
+                      for r in results])
+    if not (isinstance(results, (np.ndarray, np.generic)) and
+            results.dtype.kind == 'f'):
+        return results
+    scalar = isinstance(results, np.generic)
+    result = np.asarray(results)
+    with np.errstate(invalid='ignore'):
+        bad = ~(result <= above)
+        if failed is not None:
+            bad |= result == failed
+    if missing == 'nan':
+        np.copyto(result, np.nan, where=bad)
+    else:
+        result = np.ma.MaskedArray(result, mask=bad, copy=False)
+    return result[()] if scalar else result
+
+
+def _check_kwargs(name, kwargs, allowed=('ni', )):
+    """
+    Raise TypeError for the keyword arguments of the routine `name` which
+    are not among `allowed`, rather than passing them on to f2py.
+    """
+    for key in kwargs:
+        if key not in allowed:
+            raise TypeError('%s() got an unexpected keyword argument %r' %
+                            (name, key))
+
+
+def _check_copies(func, arrays, order='F', stacklevel=4):
+    """
+    Report inputs to `func` which are not float32 arrays of the given
+    memory order and so are copied before the call.
+    """
+    action = _copy_settings['copies']
+    if action == 'allow' and not _stats_settings['stores']:
+        return
+    name = getattr(func, '__name__', str(func)).split()[-1]
+    for i, a in enumerate(arrays):
+        if not isinstance(a, np.ndarray):
+            a = np.asarray(a)
+            layout = 'not an array'
+        elif a.dtype != np.float32:
+            layout = None
+        elif order == 'F' and a.flags.f_contiguous:
+            continue
+        elif order == 'C' and a.flags.c_contiguous:
+            continue
+        else:
+            layout = None
+        if layout is None:
+            if 0 in a.strides and a.size > 1:
+                # A scalar or smaller array broadcast against the others.
+                layout = 'broadcast'
+            elif a.flags.c_contiguous:
+                layout = 'C order'
+            elif a.flags.f_contiguous:
+                layout = 'Fortran order'
+            else:
+                layout = 'non-contiguous'
+        if _stats_settings['stores']:
+            _record(_current_call(), copies=1, bytes_copied=a.size * 4)
+            if action == 'allow':
+                continue
+        msg = '%s: input %d of %d is copied (%s, %s)' % (
+            name, i + 1, len(arrays), a.dtype, layout)
+        if action == 'raise':
+            raise CopyError(msg)
+        warnings.warn(msg, CopyWarning, stacklevel=stacklevel)
+
+
+def _elementwise(func, args, out=None, extra=(), missing='flag'):
+    """
+    Apply one of the ``*_aray`` routines element-by-element.
+
+    The arrays in `args` are broadcast against each other and passed to
+    `func` flattened, followed by the scalars in `extra` and the output
+    array.  The result has the broadcast shape and the floating point type
+    of the inputs (at least float32).  When `out` is a C-contiguous float32
+    array the routine writes into it directly, otherwise the result is
+    cast into `out`.  Masked input elements are missing and `missing`
+    selects how missing values are returned.
+    """
+    arrays = np.broadcast_arrays(*_filled(args))
+    shape = arrays[0].shape
+    # Python scalars do not take part in the choice of output type.
+    dtype = np.result_type(np.float32, *[
+        a.dtype for a, arg in zip(arrays, args)
+        if np.ndim(arg) > 0 or isinstance(arg, np.generic)])
+    if out is not None and out.shape != shape:
+        raise ValueError('out has shape %s, expected %s' %
+                         (out.shape, shape))
+    _check_copies(func, arrays, 'C')
+    flat = [np.ascontiguousarray(a, dtype=np.float32).reshape(-1)
+            for a in arrays]
+    if (out is not None and out.dtype == np.float32 and
+            out.flags.c_contiguous):
+        mask = _mask(out, missing)
+        if out.size:
+            _split(func, flat, extra, out.reshape(-1), missing,
+                   None if mask is None else mask.reshape(-1))
+        return _masked(out, mask)
+    result = np.empty(shape, dtype=np.float32)
+    mask = _mask(result, missing)
+    if result.size:
+        _split(func, flat, extra, result.reshape(-1), missing,
+               None if mask is None else mask.reshape(-1))
+    if out is not None:
+        np.copyto(out, result, casting='unsafe')
+        return _masked(out, mask)
+    if dtype != np.float32:
+        result = result.astype(dtype)
+    if result.ndim == 0:
+        return _masked(result, mask)[()]
+    return _masked(result, mask)
+
+
+def _split(func, flat, extra, result, missing='flag', mask=None):
+    """
+    Call one of the ``*_aray`` routines on the flattened arrays in `flat`,
+    in bands for the worker threads when `set_workers` allows it, and
+    convert the missing values of each band as set by `missing`.
+    """
+    def band(lo, hi):
+        func(*([a[lo:hi] for a in flat] + list(extra) + [result[lo:hi]]))
+        _mark_missing(result[lo:hi], missing,
+                      None if mask is None else mask[lo:hi])
+
+    bands = _bands(result.size, result.size)
+    if bands is None:
+        band(0, result.size)
+        return
+    _run([lambda lo=lo, hi=hi: band(lo, hi) for lo, hi in bands])
+
+
+def _elementwise_status(func, args, nout, extra=(), missing='flag'):
+    """
+    Apply one of the ``*_aray`` routines with `nout` outputs and an
+    integer status element-by-element.
+
+    The arrays in `args` are broadcast against each other and passed to
+    `func` flattened, followed by the scalars in `extra`, the outputs and
+    the status, in bands for the worker threads when `set_workers` allows
+    it.  Returns the float32 outputs with the broadcast shape followed by
+    the boolean array of the elements with a positive status.  Masked
+    input elements are missing and `missing` selects how missing values
+    are returned.
+    """
+    arrays = np.broadcast_arrays(*_filled(args))
+    shape = arrays[0].shape
+    _check_copies(func, arrays, 'C')
+    flat = [np.ascontiguousarray(a, dtype=np.float32).reshape(-1)
+            for a in arrays]
+    results = [np.empty(shape, dtype=np.float32) for i in range(nout)]
+    ier = np.empty(shape, dtype=np.int32)
+    masks = [_mask(r, missing) for r in results]
+    outs = [r.reshape(-1) for r in results] + [ier.reshape(-1)]
+
+    def band(lo, hi):
+        func(*([a[lo:hi] for a in flat] + list(extra) +
+               [o[lo:hi] for o in outs]))
+        for r, m in zip(outs, masks):
+            _mark_missing(r[lo:hi], missing,
+                          None if m is None else m.reshape(-1)[lo:hi])
+
+    size = ier.size
+    bands = _bands(size, size)
+    if bands is None:
+        if size:
+            band(0, size)
+    else:
+        _run([lambda lo=lo, hi=hi: band(lo, hi) for lo, hi in bands])
+    results = [_masked(r, m) for r, m in zip(results, masks)]
+    return tuple(results) + (ier > 0, )
+
+
+def _grid(func, args, extra=(), out=None, outarg='result', **kwargs):
+    """
+    Apply one of the pointwise (mni, nj) grid routines to N-d arrays.
+
+    The arrays in `args` are broadcast against each other and followed by
+    the scalars in `extra`.  Input with more than two dimensions is passed
+    to `func` as a single (n, 1) column and the result reshaped to the
+    broadcast shape, which for C-contiguous float32 input needs no copy.
+    With ``copy_mode(transposed=True)`` 2D input is passed transposed.
+    `out` is given to `func` as the keyword argument `outarg`.  Large grids
+    are computed in bands by the threads set with `set_workers`.  Masked
+    input elements are missing and the keyword argument `missing` selects
+    how missing values are returned.
+    """
+    missing = kwargs.pop('missing', 'flag')
+    arrays = list(np.broadcast_arrays(*_filled(args)))
+    shape = arrays[0].shape
+    if len(shape) == 2 and _copy_settings['transposed']:
+        if 'ni' in kwargs:
+            raise ValueError('ni cannot be used with transposed=True')
+        _check_copies(func, _with_out(arrays, out), 'C')
+        if out is not None:
+            kwargs[outarg] = out.T
+        arrays = [a.T for a in arrays]
+        return _result(_tiled(func, arrays, extra, kwargs, outarg,
+                              missing=missing).T, out)
+    if len(shape) <= 2:
+        _check_copies(func, _with_out(arrays, out))
+        if out is not None:
+            kwargs[outarg] = out
+        return _result(_tiled(func, arrays, extra, kwargs, outarg,
+                              missing=missing), out)
+    if 'ni' in kwargs:
+        raise ValueError('ni can only be used with 1D or 2D arrays')
+    if out is not None and out.shape != shape:
+        raise ValueError('out has shape %s, expected %s' % (out.shape, shape))
+    if not arrays[0].size:
+        if out is None:
+            out = np.empty(shape, dtype=np.float32)
+        return _masked(out, _mask(out, missing))
+    _check_copies(func, _with_out(arrays, out), 'C')
+    flat = [np.ascontiguousarray(a, dtype=np.float32).reshape(-1, 1)
+            for a in arrays]
+    if (out is not None and out.dtype == np.float32 and
+            out.flags.c_contiguous):
+        kwargs[outarg] = out.reshape(-1, 1)
+    return _result(_tiled(func, flat, extra, kwargs, outarg,
+                          missing=missing).reshape(shape), out)
+
+
+def _with_out(arrays, out):
+    """ The arrays to check for copies, including `out` when given. """
+    if out is None:
+        return arrays
+    return list(arrays) + [out]
+
+
+def _result(result, out):
+    """
+    Return `out` holding `result`, copying the values across when f2py
+    computed them in a temporary because `out` was not a float32 array in
+    Fortran order.
+    """
+    if out is None:
+        return result
+    if not np.may_share_memory(np.ma.getdata(result), out):
+        np.copyto(out, np.ma.getdata(result), casting='unsafe')
+    if np.ma.isMaskedArray(result):
+        return np.ma.MaskedArray(out, mask=result.mask, copy=False)
+    return out
+
+
+def _work(func, names, work):
+    """
+    Keyword arguments passing the work arrays in the sequence `work` to
+    `func` as the arguments `names`.
+    """
+    if work is None:
+        return {}
+    if len(work) != len(names):
+        raise ValueError('work must be a sequence of %d arrays' % len(names))
+    _check_copies(func, work)
+    return dict(zip(names, work))
+
+
+def _soundings(*args):
+    """
+    Arrange a batch of soundings for one of the column routines.
+
+    Each argument is an array_like of shape (ncol, nlev), or (nlev,) for a
+    single sounding.  The arrays are returned as float32 arrays of shape
+    (nlev, ncol) in Fortran order, which for C-contiguous float32 input are
+    views of the original data.  Masked elements are set to the 1e37 flag.
+    """
+    _check_copies('soundings', args, 'C')
+    cols = []
+    for a in _filled(args):
+        a = np.asarray(a, dtype=np.float32)
+        if a.ndim == 1:
+            a = a[np.newaxis]
+        cols.append(np.ascontiguousarray(a).T)
+    return cols
+
+
+def _nlvls(nlvls, cols):
+    """ Number of valid levels in each sounding, default is all levels. """
+    nlev, ncol = cols[0].shape
+    if nlvls is None:
+        nlvls = nlev
+    result = np.empty(ncol, dtype=np.int32)
+    result[...] = np.asarray(nlvls).reshape(-1)
+    if np.any(result > nlev):
+        raise ValueError('nlvls cannot exceed the number of levels, %d' %
+                         nlev)
+    return result
+
+
+def _per_column(value, cols):
+    """ A scalar or one value per sounding, as a float32 array. """
+    result = np.empty(cols[0].shape[1], dtype=np.float32)
+    result[...] = np.asarray(value, dtype=np.float32).reshape(-1)
+    return result
+
+
+def density(p,tvir,out=None):
     """
     Calculate air density from pressure and virtual temperature from an
     sounding array.
@@ -15,6 +1200,8 @@ def density(p,tvir):
         Sounding pressures (mb)
     tvir : array_like, 1D
         Sounding virtual temperatures (C)
+    out : array, 1D, optional
+        Array to store the densities in.
     
     Returns
     -------
@@ -23,7 +1210,9 @@ def density(p,tvir):
     
     Notes: To do: just make K and Pa
     """
-    return _awips.density(p,tvir)
+    if out is None:
+        return _awips.density(p,tvir)
+    return _result(_awips.density(p,tvir,rho=out), out)
 
 def richno(ht,hw,uw,vw,rho,buoy):
     """
@@ -50,22 +1239,28 @@ def richno(ht,hw,uw,vw,rho,buoy):
     return _awips.richno(ht,hw,uw,vw,rho,buoy)
            
           
-def calctd(t, rh, **kwargs):
+def calctd(t, rh, out=None, **kwargs):
     """
     Calculate dewpoint from temperature and relative humidity.
 
     Parameters
     ----------
-    t : array_like, 2D
+    t : array_like
         Temperatures in Kelvin.
-    rh : array_like, 2D
+    rh : array_like
         Relative humidities (0. - 100.).
     ni : int, optional
         Number of rows to calculate dewpoint for, default is all rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    td : array, 2D
+    td : array
         Dewpoints in Kelvin. Will have same shape as t.
 
     Notes
@@ -81,27 +1276,33 @@ def calctd(t, rh, **kwargs):
     array([[ 288.70455933]], dtype=float32)
 
     """
-    return _awips.calctd(t, rh, **kwargs)
+    return _grid(_awips.calctd, (t, rh), out=out, outarg='td', **kwargs)
 
 
-def calctd2(p, t, q, **kwargs):
+def calctd2(p, t, q, out=None, **kwargs):
     """
     Calculate dewpoint from pressure, temperature, and specific humidity.
 
     Parameters
     ----------
-    p : array_like, 2D
+    p : array_like
         Pressure (mb).
-    t : array_like, 2D
+    t : array_like
         Temperature (Kelvin).
-    q : array_like, 2D
+    q : array_like
         Specific humidity (g/Kg).
     ni : int, optional
         Number of rows to calculate dewpoint for, default is all rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    td : array, 2D
+    td : array
         Dewpoints in Kelvin. Will have same shape as p.
 
     Notes
@@ -117,29 +1318,35 @@ def calctd2(p, t, q, **kwargs):
     285.42
 
     """
-    return _awips.calctd2(p, t, q, **kwargs)
+    return _grid(_awips.calctd2, (p, t, q), out=out, outarg='td', **kwargs)
 
 
-def calccondpr(p, t, rh, **kwargs):
+def calccondpr(p, t, rh, out=None, **kwargs):
     """
     Calculate condensation pressure from the pressure, temperature, and
     relative humidity.
 
     Parameters
     ----------
-    p : array_like, 2D
+    p : array_like
         Pressure (mb).
-    t : array_like, 2D
+    t : array_like
         Temperature (Kelvin).
-    rh : array_like, 2D
+    rh : array_like
         Relative humidity (range 0 - 100).
     ni : int, optional
         Number of rows to calculate condensation pressure for, default is all
         rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    q : array, 2D
+    q : array
         Condensation pressure (mb). Will have same shape as p.
 
     Notes
@@ -155,29 +1362,35 @@ def calccondpr(p, t, rh, **kwargs):
     array([[ 974.52386475]], dtype=float32)
 
     """
-    return _awips.calccondpr(p, t, rh, **kwargs)
+    return _grid(_awips.calccondpr, (p, t, rh), out=out, outarg='q', **kwargs)
 
 
-def calccondprdef(p, t, rh, **kwargs):
+def calccondprdef(p, t, rh, out=None, **kwargs):
     """
     Calculate condensation pressure deficit from the pressure, temperature,
     and relative humidity.
 
     Parameters
     ----------
-    p : array_like, 2D
+    p : array_like
         Pressure (mb).
-    t : array_like, 2D
+    t : array_like
         Temperature (Kelvin).
-    rh : array_like, 2D
+    rh : array_like
         Relative humidity (range 0 - 100).
     ni : int, optional
         Number of rows to calculate condensation pressure for, default is all
         rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    q : array, 2D
+    q : array
         Condensation pressure deficit (mb). Will have same shape as p.
 
     Notes
@@ -193,25 +1406,32 @@ def calccondprdef(p, t, rh, **kwargs):
     array([[ 38.72613525]], dtype=float32)
 
     """
-    return _awips.calccondprdef(p, t, rh, **kwargs)
+    return _grid(_awips.calccondprdef, (p, t, rh),
+                 out=out, outarg='q', **kwargs)
 
 
-def alt2press(alt, z, **kwargs):
+def alt2press(alt, z, out=None, **kwargs):
     """
     Calculate pressure from elevation and altimeter setting.
 
     Parameters
     ----------
-    alt : array_like, 2D
+    alt : array_like
         Altimeter setting (mb?).
-    z : array_like, 2D
+    z : array_like
         Elevation  (m).
     ni : int, optional
         Number of rows to calculate pressure for, default is all rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    p : array, 2D
+    p : array
         Pressure (mb). Will have same shape as p.
 
     Notes
@@ -227,33 +1447,39 @@ def alt2press(alt, z, **kwargs):
     706.1
 
     """
-    return _awips.alt2press(alt, z, **kwargs)
+    return _grid(_awips.alt2press, (alt, z), out=out, outarg='p', **kwargs)
 
 
-def calcli(p, t, rh, t5, **kwargs):
+def calcli(p, t, rh, t5, out=None, **kwargs):
     """
     Calculate lifted index from pressure, temperature, relative humidity,
     and 500mb (normally) temperature.
 
     Parameters
     ----------
-    p : array_like, 2D
+    p : array_like
         Pressure (mb).
-    t : array_like, 2D
+    t : array_like
         Temperature (Kelvin).
-    rh : array_like, 2D
+    rh : array_like
         Relative humidity (range 0 - 100).
-    t5 : array_like, 2D
+    t5 : array_like
         Temperature at 500 mb (or as given by p5 if specified) (Kelvin).
     p5 : real, optional
         Upper pressure, normally 500mb.
     ni : int, optional
         Number of rows to calculate condensation pressure for, default is all
         rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    li : array, 2D
+    li : array
         Lifted index (C). Will have same shape as p.
 
     Notes
@@ -269,11 +1495,11 @@ def calcli(p, t, rh, t5, **kwargs):
     array([[-4.64505005]], dtype=float32)
 
     """
-    return _awips.calcli(p, t, rh, t5, **kwargs)
+    return _grid(_awips.calcli, (p, t, rh, t5), out=out, outarg='li', **kwargs)
 
 
 def calcpv(p_up, p_low, th_up, th_low, u_up, v_up, u_low, v_low, dx, dy,
-           coriolis, **kwargs):
+           coriolis, out=None, work=None, missing='flag', **kwargs):
     """
     Calculate isentropic potential vorticity through a layer.
 
@@ -304,6 +1530,13 @@ def calcpv(p_up, p_low, th_up, th_low, u_up, v_up, u_low, v_low, dx, dy,
     ni : int, optional
         Number of rows to calculate potential vorticity for, default is all
         rows.
+    out : array, 2D, optional
+        Array to store the potential vorticity in.
+    work : sequence of 2 arrays, 2D, optional
+        Scratch arrays with the shape of p_up, reused between calls.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  Masked input values are treated as missing.
 
     Returns
     -------
@@ -322,27 +1555,42 @@ def calcpv(p_up, p_low, th_up, th_low, u_up, v_up, u_low, v_low, dx, dy,
     TODO
 
     """
-    return _awips.calcpv(p_up, p_low, th_up, th_low, u_up, v_up, u_low, v_low,
-                         dx, dy, coriolis, **kwargs)
-
-
-def calcdpd(t, rh, **kwargs):
+    _check_kwargs('calcpv', kwargs)
+    _check_missing(missing)
+    args = (p_up, p_low, u_up, v_up, u_low, v_low, dx, dy, coriolis)
+    _check_copies(_awips.calcpv, _with_out(args, out), stacklevel=3)
+    p_up, p_low, u_up, v_up, u_low, v_low, dx, dy, coriolis = _filled(args)
+    kwargs.update(_work(_awips.calcpv, ('avort1', 'avort2'), work))
+    if out is not None:
+        kwargs['pvort'] = out
+    return _missing_results(_result(_awips.calcpv(
+        p_up, p_low, th_up, th_low, u_up, v_up, u_low, v_low, dx, dy,
+        coriolis, **kwargs), out), missing)
+
+
+def calcdpd(t, rh, out=None, **kwargs):
     """
     Calculate dewpoint depression from temperature and relative humidity.
 
     Parameters
     ----------
-    t : array_like, 2D
+    t : array_like
         Temperatures in Kelvin.
-    rh : array_like, 2D
+    rh : array_like
         Relative humidities (0. - 100.).
     ni : int, optional
         Number of rows to calculate dewpoint depression for, default is all
         rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    dpd : array, 2D
+    dpd : array
         Dewpoint depression in Celcius. Will have same shape as t.
 
     Notes
@@ -358,25 +1606,31 @@ def calcdpd(t, rh, **kwargs):
     array([[ 11.29544067]], dtype=float32)
 
     """
-    return _awips.calcdpd(t, rh, **kwargs)
+    return _grid(_awips.calcdpd, (t, rh), out=out, outarg='dpd', **kwargs)
 
 
-def calcrh(t, td, **kwargs):
+def calcrh(t, td, out=None, **kwargs):
     """
     Calculate relative humidity from temperature and dewpoint.
 
     Parameters
     ----------
-    t : array_like, 2D
+    t : array_like
         Temperature  (K or C).
-    td : array_like, 2D
+    td : array_like
         Dewpoint (K or C -- must be same as t).
     ni : int, optional
         Number of rows to calculate relative humidity for, default is all rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    rh : array, 2D
+    rh : array
         Relative humidity (range: 0 -- 100)
 
     Notes
@@ -392,28 +1646,34 @@ def calcrh(t, td, **kwargs):
     array([[ 54.30759811]], dtype=float32)
 
     """
-    return _awips.calcrh(t, td, **kwargs)
+    return _grid(_awips.calcrh, (t, td), out=out, outarg='rh', **kwargs)
 
 
-def calcrh2(p, t, q, **kwargs):
+def calcrh2(p, t, q, out=None, **kwargs):
     """
     Calculate relative humidity from pressure, temperature, and specific
     humidity.
 
     Parameters
     ----------
-    p : array_like, 2D
+    p : array_like
         Pressure (mb).
-    t : array_like, 2D
+    t : array_like
         Temperature (Kelvin).
-    q : array_like, 2D
+    q : array_like
         Specific humidity (g/Kg).
     ni : int, optional
         Number of rows to calculate relative humidity for, default is all rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    rh : array, 2D
+    rh : array
         Relative humidity (range: 0 -- 100)
 
     Notes
@@ -429,29 +1689,35 @@ def calcrh2(p, t, q, **kwargs):
     array([[ 50.00162125]], dtype=float32)
 
     """
-    return _awips.calcrh2(p, t, q, **kwargs)
+    return _grid(_awips.calcrh2, (p, t, q), out=out, outarg='rh', **kwargs)
 
 
-def calcthetae(p, t, rh, **kwargs):
+def calcthetae(p, t, rh, out=None, **kwargs):
     """
     Calculate equivalent potential temperature from the pressure, temperature,
     and relative humidity.
 
     Parameters
     ----------
-    p : array_like, 2D
+    p : array_like
         Pressure (mb).
-    t : array_like, 2D
+    t : array_like
         Temperature (K).
-    rh : array_like, 2D
+    rh : array_like
         Relative humidity (range 0 - 100).
     ni : int, optional
         Number of rows to calculate potential temperature for, default is all
         rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    q : array, 2D
+    q : array
         Theta E (Equivalent potential temperature) (K). Will have same shape
         as p.
 
@@ -468,29 +1734,35 @@ def calcthetae(p, t, rh, **kwargs):
     array([[ 336.05654907]], dtype=float32)
 
     """
-    return _awips.calcthetae(p, t, rh, **kwargs)
+    return _grid(_awips.calcthetae, (p, t, rh), out=out, outarg='q', **kwargs)
 
 
-def calcthetae2(p, t, td, **kwargs):
+def calcthetae2(p, t, td, out=None, **kwargs):
     """
     Calculate equivalent potential temperature from the pressure,
     temperature, and dewpoint.
 
     Parameters
     ----------
-    p : array_like, 2D
+    p : array_like
         Pressure (mb).
-    t : array_like, 2D
+    t : array_like
         Temperature (C or K).
-    td : array_like, 2D
+    td : array_like
         Dewpoint (C or K -- must be the same as t)
     ni : int, optional
         Number of rows to calculate potential temperature for, default is all
         rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    q : array, 2D
+    q : array
         Theta E (Equivalent potential temperature) (K). Will have same shape
         as p.
 
@@ -507,29 +1779,35 @@ def calcthetae2(p, t, td, **kwargs):
     array([[ 319.97634888]], dtype=float32)
 
     """
-    return _awips.calcthetae2(p, t, td, **kwargs)
+    return _grid(_awips.calcthetae2, (p, t, td), out=out, outarg='q', **kwargs)
 
 
-def calctv(p, t, rh, **kwargs):
+def calctv(p, t, rh, out=None, **kwargs):
     """
     Calculate virtual temperature from the pressure, temperature, and
     relative humidity.
 
     Parameters
     ----------
-    p : array_like, 2D
+    p : array_like
         Pressure (mb).
-    t : array_like, 2D
+    t : array_like
         Temperature (K).
-    rh : array_like, 2D
+    rh : array_like
         Relative humidity (range 0 - 100).
     ni : int, optional
         Number of rows to calculate virtual temperature for, default is all
         rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    tv : array, 2D
+    tv : array
         Virtual temperature (K). Will have same shape as p.
 
     Notes
@@ -545,26 +1823,32 @@ def calctv(p, t, rh, **kwargs):
     array([[ 298.81143188]], dtype=float32)
 
     """
-    return _awips.calctv(p, t, rh, **kwargs)
+    return _grid(_awips.calctv, (p, t, rh), out=out, outarg='tv', **kwargs)
 
 
-def calctv2(t, q, **kwargs):
+def calctv2(t, q, out=None, **kwargs):
     """
     Calculate virtual temperature from  temperature and specific humidity.
 
     Parameters
     ----------
-    t : array_like, 2D
+    t : array_like
         Temperature (Kelvin).
-    q : array_like, 2D
+    q : array_like
         Specific humidity (g/Kg).
     ni : int, optional
         Number of rows to calculate virtual temperature for, default is all
         rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    tv : array, 2D
+    tv : array
         Virtual temperature (K)
 
     Notes
@@ -580,29 +1864,39 @@ def calctv2(t, q, **kwargs):
     array([[ 297.73538208]], dtype=float32)
 
     """
-    return _awips.calctv2(t, q, **kwargs)
+    return _grid(_awips.calctv2, (t, q), out=out, outarg='tv', **kwargs)
 
 
-def calctw(p, t, rh, **kwargs):
+def calctw(p, t, rh, out=None, iterations=None, **kwargs):
     """
     Calculate wet-bulb temperature from pressure, temperature, and relative
     humidity.
 
     Parameters
     ----------
-    p : array_like, 2D
+    p : array_like
         Pressure (mb).
-    t : array_like, 2D
+    t : array_like
         Temperature (K).
-    rh : array_like, 2D
+    rh : array_like
         Relative humidity (range 0 - 100).
+    iterations : int, optional
+        Number of Newton steps taken at every point, or 0 to iterate each
+        point until it converges.  By default the setting of
+        `set_wetbulb_iterations`.
     ni : int, optional
         Number of rows to calculate wet-bulb temperature for, default is all
         rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    tw : array, 2D
+    tw : array
         Web-bulb temperature (K). Will have same shape as p.
 
     Notes
@@ -618,41 +1912,574 @@ def calctw(p, t, rh, **kwargs):
     array([[ 294.28710938]], dtype=float32)
 
     """
-    return _awips.calctw(p, t, rh, **kwargs)
+    if iterations is None:
+        iterations = _wetbulb_settings['iterations']
+    if iterations > 0:
+        return _grid(_awips.calctwfx, (p, t, rh), (iterations, ), out=out,
+                     outarg='tw', **kwargs)
+    return _grid(_awips.calctw, (p, t, rh), out=out, outarg='tw', **kwargs)
 
 
-def cclpar(mix, p, ht, t, **kwargs):
+def capecin(p, ht, t, td, nlvls=None, out=None, work=None, missing='flag'):
     """
-    Calculate pressure, height, and temperature of the convective condensation
-    level (CCL) from a sounding.
+    Calculate CAPE, CIN and the LCL, LFC and equilibrium level for a batch
+    of soundings.
+
+    The parcel is lifted from the lowest level of each sounding with the
+    mixing ratio of the surface dewpoint.  All soundings are processed in a
+    single call to compiled code.
 
     Parameters
     ----------
-    mix : real
-        Mixing ratio used to intersect the sounding (g/kg).
-    p : array_like, 1D
-        Sounding pressures (mb).
-    ht : array_like, 1D
-        Sounding heights (m above sea level)
-    t : array_like, 1D
+    p : array_like, 2D (ncol, nlev)
+        Sounding pressures (mb), ordered from the surface up.  A 1D array is
+        treated as a single sounding.
+    ht : array_like, 2D (ncol, nlev)
+        Sounding heights (m above sea level).
+    t : array_like, 2D (ncol, nlev)
         Sounding temperatures (K).
+    td : array_like, 2D (ncol, nlev)
+        Sounding dewpoint temperatures (K).
+    nlvls : int or array_like, 1D (ncol), optional
+        Number of valid levels in each sounding, default is all levels.
+    out : sequence of 8 arrays, 1D (ncol), optional
+        Arrays to store cape, cin, plcl, hlcl, plfc, hlfc, peql and heql in.
+    work : array, 2D (nlev + 1, 7), optional
+        Scratch array, reused between calls.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values, flagged by 1e37 or 99999, as they are
+        (default), as NaN or in a masked array.
 
     Returns
     -------
-    pccl : real
-        Pressure of the convective condensation level (mb).
-    tccl : real
-        Temperature of the convective condensation level (K).
-    hccl : real
-        Height of the convective condensation level (m above sea level).
+    cape : array, 1D (ncol), float32
+        Convective available potential energy (J/kg).
+    cin : array, 1D (ncol), float32
+        Convective inhibition, the negative buoyant energy below the LFC
+        (J/kg).
+    plcl, hlcl : array, 1D (ncol), float32
+        Pressure (mb) and height (m above sea level) of the lifting
+        condensation level.
+    plfc, hlfc : array, 1D (ncol), float32
+        Pressure (mb) and height (m above sea level) of the level of free
+        convection.
+    peql, heql : array, 1D (ncol), float32
+        Pressure (mb) and height (m above sea level) of the equilibrium
+        level.
+
     Notes
     -----
-    1) The low level mean mixing ratio is input to this routine...
-       computed outside.
-    2) On days with a strong low level inversion, the convective
-       temperature may seem low because the strict definition is
-       used in the computation (i.e., where the low level mixing
-       ratio line first intersects the sounding).
+    1) Levels which are not found are given the flag value 99999.  When no
+       LFC is found CAPE and CIN are 0.
+    2) Soundings with fewer than 2 or more than 450 valid levels, or with
+       values > 99998.0 in any valid level, have all outputs set to the
+       flag value 1.e37.
+
+    """
+    cols = _soundings(p, ht, t, td)
+    kwargs = {}
+    if work is not None:
+        kwargs.update(_work(_awips.capecin, ('work', ), (work, )))
+    if out is None:
+        return _missing_results(_awips.capecin(
+            *(cols + [_nlvls(nlvls, cols)]), **kwargs), missing, above=99998.)
+    names = ('cape', 'cin', 'plcl', 'hlcl', 'plfc', 'hlfc', 'peql', 'heql')
+    if len(out) != len(names):
+        raise ValueError('out must be a sequence of 8 arrays')
+    _check_copies(_awips.capecin, out, stacklevel=3)
+    kwargs.update(zip(names, out))
+    result = _awips.capecin(*(cols + [_nlvls(nlvls, cols)]), **kwargs)
+    result = tuple([_result(r, o) for r, o in zip(result, out)])
+    return _missing_results(result, missing, above=99998.)
+
+
+def frzlev_batch(elev, p, ht, t, nlvls=None, missing='flag'):
+    """
+    Calculate the pressure and height of the freezing level for a batch of
+    soundings.
+
+    Parameters
+    ----------
+    elev : float or array_like, 1D (ncol)
+        Station elevations (m above sea level).
+    p : array_like, 2D (ncol, nlev)
+        Sounding pressures (mb), ordered from the surface up.  A 1D array is
+        treated as a single sounding.
+    ht : array_like, 2D (ncol, nlev)
+        Sounding heights (m above sea level).
+    t : array_like, 2D (ncol, nlev)
+        Sounding temperatures (K).
+    nlvls : int or array_like, 1D (ncol), optional
+        Number of valid levels in each sounding, default is all levels.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values, flagged by 1e37 or 99999, as they are
+        (default), as NaN or in a masked array.
+
+    Returns
+    -------
+    pfrz, hfrz : array, 1D (ncol), float32
+        Pressure (mb) and height (m above sea level) of the freezing level,
+        or the surface pressure and a height of 0 when there is none.
+
+    Notes
+    -----
+    1) Soundings with fewer than 2 valid levels have the flag value 1.e37.
+
+    """
+    cols = _soundings(p, ht, t)
+    result = _awips.frzlevb(_per_column(elev, cols), *(cols + [
+        _nlvls(nlvls, cols)]))
+    return _missing_results(result, missing, above=99998.)
+
+
+def cclpar_batch(mix, p, ht, t, nlvls=None, missing='flag'):
+    """
+    Calculate pressure, temperature and height of the convective
+    condensation level (CCL) for a batch of soundings.
+
+    Parameters
+    ----------
+    mix : float or array_like, 1D (ncol)
+        Mixing ratio used to intersect each sounding (g/kg).
+    p : array_like, 2D (ncol, nlev)
+        Sounding pressures (mb), ordered from the surface up.  A 1D array is
+        treated as a single sounding.
+    ht : array_like, 2D (ncol, nlev)
+        Sounding heights (m above sea level).
+    t : array_like, 2D (ncol, nlev)
+        Sounding temperatures (K).
+    nlvls : int or array_like, 1D (ncol), optional
+        Number of valid levels in each sounding, default is all levels.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values, flagged by 1e37 or 99999, as they are
+        (default), as NaN or in a masked array.
+
+    Returns
+    -------
+    pccl, tccl, hccl : array, 1D (ncol), float32
+        Pressure (mb), temperature (K) and height (m above sea level) of the
+        convective condensation level, 99999.0 when it is not found.
+
+    Notes
+    -----
+    1) Soundings with fewer than 2 valid levels have the flag value 1.e37.
+
+    """
+    cols = _soundings(p, ht, t)
+    result = _awips.cclparb(_per_column(mix, cols), *(cols + [
+        _nlvls(nlvls, cols)]))
+    return _missing_results(result, missing, above=99998.)
+
+
+def lclpar_batch(meanmix, ts, p, ht, t, td, nlvls=None, missing='flag'):
+    """
+    Calculate pressure, temperature and height of the lifting condensation
+    level (LCL) for a batch of soundings.
+
+    Parameters
+    ----------
+    meanmix : float or array_like, 1D (ncol)
+        Mixing ratio used to intersect each sounding (kg/kg).
+    ts : float or array_like, 1D (ncol)
+        Surface temperature of each sounding (K).
+    p : array_like, 2D (ncol, nlev)
+        Sounding pressures (mb), ordered from the surface up.  A 1D array is
+        treated as a single sounding.
+    ht : array_like, 2D (ncol, nlev)
+        Sounding heights (m above sea level).
+    t : array_like, 2D (ncol, nlev)
+        Sounding temperatures (K).
+    td : array_like, 2D (ncol, nlev)
+        Sounding dewpoint temperatures (K).
+    nlvls : int or array_like, 1D (ncol), optional
+        Number of valid levels in each sounding, default is all levels.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values, flagged by 1e37 or 99999, as they are
+        (default), as NaN or in a masked array.
+
+    Returns
+    -------
+    plcl, tlcl, hlcl : array, 1D (ncol), float32
+        Pressure (mb), temperature (K) and height (m above sea level) of the
+        lifting condensation level, 99999.0 when it is not found.
+
+    Notes
+    -----
+    1) Soundings with fewer than 2 valid levels have the flag value 1.e37.
+
+    """
+    cols = _soundings(p, ht, t, td)
+    result = _awips.lclparb(_per_column(meanmix, cols), _per_column(ts, cols),
+                            *(cols + [_nlvls(nlvls, cols)]))
+    return _missing_results(result, missing, above=99998.)
+
+
+def totals_batch(p, t, td, nlvls=None, missing='flag'):
+    """
+    Calculate the total totals, cross totals and vertical totals indices
+    for a batch of soundings.
+
+    Parameters
+    ----------
+    p : array_like, 2D (ncol, nlev)
+        Sounding pressures (mb), ordered from the surface up.  A 1D array is
+        treated as a single sounding.
+    t : array_like, 2D (ncol, nlev)
+        Sounding temperatures (K).
+    td : array_like, 2D (ncol, nlev)
+        Sounding dewpoint temperatures (K).
+    nlvls : int or array_like, 1D (ncol), optional
+        Number of valid levels in each sounding, default is all levels.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values, flagged by 1e37 or 99999, as they are
+        (default), as NaN or in a masked array.
+
+    Returns
+    -------
+    totidx, crstot, vertot : array, 1D (ncol), float32
+        Total totals, cross totals and vertical totals, 99999.0 for
+        soundings which start above 820 mb or do not reach 500 mb.
+
+    Notes
+    -----
+    1) 800 mb is used in place of 850 mb for soundings starting above 900
+       mb.
+    2) Soundings with fewer than 2 valid levels have the flag value 1.e37.
+
+    """
+    cols = _soundings(p, t, td)
+    result = _awips.totalsb(*(cols + [_nlvls(nlvls, cols)]))
+    return _missing_results(result, missing, above=99998.)
+
+
+def sweat_batch(p, t, td, pw, uw, vw, nlvls=None, nw=None, missing='flag'):
+    """
+    Calculate the severe weather threat (SWEAT) index for a batch of
+    soundings.
+
+    Parameters
+    ----------
+    p : array_like, 2D (ncol, nlev)
+        Sounding pressures (mb), ordered from the surface up.  A 1D array is
+        treated as a single sounding.
+    t : array_like, 2D (ncol, nlev)
+        Sounding temperatures (K).
+    td : array_like, 2D (ncol, nlev)
+        Sounding dewpoint temperatures (K).
+    pw : array_like, 2D (ncol, nwlev)
+        Pressures of the wind reports (mb), ordered from the surface up.
+    uw, vw : array_like, 2D (ncol, nwlev)
+        Wind components (m/s).
+    nlvls : int or array_like, 1D (ncol), optional
+        Number of valid levels in each sounding, default is all levels.
+    nw : int or array_like, 1D (ncol), optional
+        Number of valid wind levels in each sounding, default is all levels.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values, flagged by 1e37 or 99999, as they are
+        (default), as NaN or in a masked array.
+
+    Returns
+    -------
+    swidx : array, 1D (ncol), float32
+        SWEAT index, 99999.0 for soundings which do not span 820 to 500 mb.
+
+    Notes
+    -----
+    1) Soundings with fewer than 2 valid levels or wind levels have the
+       flag value 1.e37.
+
+    """
+    cols = _soundings(p, t, td)
+    winds = _soundings(pw, uw, vw)
+    result = _awips.sweatb(*(cols + [_nlvls(nlvls, cols)] + winds +
+                             [_nlvls(nw, winds)]))
+    return _missing_results(result, missing, above=99998.)
+
+
+def gusts_batch(p, t, td, nlvls=None, missing='flag'):
+    """
+    Calculate the gust potential for a batch of soundings.
+
+    Parameters
+    ----------
+    p : array_like, 2D (ncol, nlev)
+        Sounding pressures (mb), ordered from the surface up.  A 1D array is
+        treated as a single sounding.
+    t : array_like, 2D (ncol, nlev)
+        Sounding temperatures (K).
+    td : array_like, 2D (ncol, nlev)
+        Sounding dewpoint temperatures (K).
+    nlvls : int or array_like, 1D (ncol), optional
+        Number of valid levels in each sounding, default is all levels.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values, flagged by 1e37 or 99999, as they are
+        (default), as NaN or in a masked array.
+
+    Returns
+    -------
+    gstpot : array, 1D (ncol), int32
+        Gust potential (0 - 4), 99999 for soundings which do not span 700
+        to 300 mb or have fewer than 2 valid levels.
+
+    """
+    cols = _soundings(p, t, td)
+    result = _awips.gustsb(*(cols + [_nlvls(nlvls, cols)]))
+    return _missing_results(result, missing, above=99998.)
+
+
+def helicity_batch(hw, pw, uw, vw, elev, ztop, diravg, spdavg, nw=None,
+                   missing='flag'):
+    """
+    Calculate helicity and storm relative helicity for a batch of wind
+    soundings.
+
+    The storm motion is taken as 75% of the mean wind speed, 30 degrees to
+    the right of the mean wind direction.
+
+    Parameters
+    ----------
+    hw : array_like, 2D (ncol, nwlev)
+        Heights of the wind reports (m above sea level), ordered from the
+        surface up.  A 1D array is treated as a single sounding.
+    pw : array_like, 2D (ncol, nwlev)
+        Pressures of the wind reports (mb).
+    uw, vw : array_like, 2D (ncol, nwlev)
+        Wind components (m/s).
+    elev : float or array_like, 1D (ncol)
+        Station elevations (m above sea level).
+    ztop : float or array_like, 1D (ncol)
+        Depth of the layer above the ground (m).
+    diravg, spdavg : float or array_like, 1D (ncol)
+        Mean wind direction (degrees) and speed (m/s).
+    nw : int or array_like, 1D (ncol), optional
+        Number of valid wind levels in each sounding, default is all levels.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values, flagged by 1e37 or 99999, as they are
+        (default), as NaN or in a masked array.
+
+    Returns
+    -------
+    ghx, ghy : array, 1D (ncol), float32
+        Components of the wind shear over the layer (m/s).
+    stmdir, stmspd : array, 1D (ncol), float32
+        Storm direction (degrees) and speed (knots).
+    helicity, srhel : array, 1D (ncol), float32
+        Helicity and storm relative helicity (m**2/s**2), 99999.0 for
+        soundings which do not reach ztop.
+
+    Notes
+    -----
+    1) Soundings with fewer than 2 valid wind levels have the flag value
+       1.e37.
+
+    """
+    winds = _soundings(hw, pw, uw, vw)
+    result = _awips.helicb(*(winds + [_nlvls(nw, winds)] + [
+        _per_column(x, winds) for x in (elev, ztop, diravg, spdavg)]))
+    return _missing_results(result, missing, above=99998.)
+
+
+def avwind_batch(elev, top, bot, hw, pw, tw, uw, vw, nw=None, missing='flag'):
+    """
+    Calculate the density weighted mean wind of a layer for a batch of wind
+    soundings.
+
+    Parameters
+    ----------
+    elev : float or array_like, 1D (ncol)
+        Station elevations (m above sea level).
+    top, bot : float or array_like, 1D (ncol)
+        Top and bottom of the layer above the ground (km).
+    hw : array_like, 2D (ncol, nwlev)
+        Heights of the wind reports (m above sea level), ordered from the
+        surface up.  A 1D array is treated as a single sounding.
+    pw : array_like, 2D (ncol, nwlev)
+        Pressures of the wind reports (mb).
+    tw : array_like, 2D (ncol, nwlev)
+        Temperatures at the wind reports (K).
+    uw, vw : array_like, 2D (ncol, nwlev)
+        Wind components (m/s).
+    nw : int or array_like, 1D (ncol), optional
+        Number of valid wind levels in each sounding, default is all levels.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values, flagged by 1e37 or 99999, as they are
+        (default), as NaN or in a masked array.
+
+    Returns
+    -------
+    uavg, vavg : array, 1D (ncol), float32
+        Mean wind components (m/s).
+    avdir, avspd : array, 1D (ncol), float32
+        Mean wind direction (degrees) and speed (m/s), 99999.0 for soundings
+        which do not span the layer.
+
+    Notes
+    -----
+    1) Soundings with fewer than 2 valid wind levels have the flag value
+       1.e37.
+
+    """
+    winds = _soundings(hw, pw, tw, uw, vw)
+    result = _awips.avwindb(*([_per_column(x, winds) for x in (elev, top, bot)]
+                              + winds + [_nlvls(nw, winds)]))
+    return _missing_results(result, missing, above=99998.)
+
+
+def richno_batch(ht, hw, uw, vw, rho, buoy, nlvls=None, nw=None,
+                 missing='flag'):
+    """
+    Calculate the bulk Richardson number for a batch of soundings.
+
+    Parameters
+    ----------
+    ht : array_like, 2D (ncol, nlev)
+        Heights of the density reports (m), ordered from the surface up.  A
+        1D array is treated as a single sounding.
+    hw : array_like, 2D (ncol, nwlev)
+        Heights of the wind reports (m).
+    uw, vw : array_like, 2D (ncol, nwlev)
+        Wind components (m/s).
+    rho : array_like, 2D (ncol, nlev)
+        Air density at each sounding level (kg/m**3).
+    buoy : float or array_like, 1D (ncol)
+        Positive buoyant energy (J/kg).
+    nlvls : int or array_like, 1D (ncol), optional
+        Number of valid levels in each sounding, default is all levels.
+    nw : int or array_like, 1D (ncol), optional
+        Number of valid wind levels in each sounding, default is all levels.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values, flagged by 1e37 or 99999, as they are
+        (default), as NaN or in a masked array.
+
+    Returns
+    -------
+    richnum : array, 1D (ncol), float32
+        Dimensionless bulk Richardson number, 99999.0 where it cannot be
+        computed.
+
+    Notes
+    -----
+    1) Soundings with fewer than 2 or more than 500 valid levels or wind
+       levels have the flag value 1.e37.
+
+    """
+    ht, rho = _soundings(ht, rho)
+    winds = _soundings(hw, uw, vw)
+    result = _awips.richnob(*([ht] + winds + [rho, _nlvls(nlvls, [ht]),
+                                              _nlvls(nw, winds),
+                                              _per_column(buoy, [ht])]))
+    return _missing_results(result, missing, above=99998.)
+
+
+def eqp_batch(deltap, offsets, p, ht, t, td, nuniform=None, missing='flag'):
+    """
+    Resample a ragged batch of soundings at uniform pressure intervals.
+
+    Parameters
+    ----------
+    deltap : float
+        Pressure interval (mb).
+    offsets : array_like, 1D (nsta + 1)
+        Start of each sounding in the flat arrays, followed by the end of
+        the last: sounding k is ``p[offsets[k]:offsets[k + 1]]``, for
+        example ``np.cumsum([0] + lengths)``.
+    p : array_like, 1D
+        Pressures (mb) of all of the soundings, one after the other, each
+        ordered from the surface up.
+    ht : array_like, 1D
+        Heights (m) of the levels.
+    t, td : array_like, 1D
+        Temperatures and dewpoints of the levels.
+    nuniform : int, optional
+        Number of levels of the output, by default the most of any
+        sounding.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.
+
+    Returns
+    -------
+    pp : array, 2D (nsta, nuniform), float32
+        The surface pressure followed by the multiples of deltap up to the
+        top of each sounding (mb).
+    htt, tt, ttd : array, 2D (nsta, nuniform), float32
+        Height, temperature and dewpoint at those pressures, interpolated
+        in log(p).
+    nn : array, 1D (nsta), int32
+        Number of levels of each sounding.
+
+    Notes
+    -----
+    1) The outputs are those of eqp for each sounding, laid out as the
+       soundings of the ``*_batch`` routines with ``nlvls=nn``.
+    2) Levels beyond nn, and those eqp does not interpolate, are 1.e37.
+       Soundings with fewer than 2 levels or needing more than nuniform
+       levels have nn of 0.
+
+    Examples
+    --------
+    >>> import aoslib
+    >>> p = [1000., 900., 800., 950., 850.]
+    >>> ht = [100., 1000., 2000., 500., 1400.]
+    >>> t = [20., 14., 8., 18., 12.]
+    >>> td = [15., 10., 5., 12., 8.]
+    >>> pp, htt, tt, ttd, nn = aoslib.eqp_batch(50., [0, 3, 5], p, ht, t, td)
+    >>> nn.tolist()
+    [5, 3]
+    >>> pp[0, :nn[0]].tolist()
+    [1000.0, 950.0, 900.0, 850.0, 800.0]
+    >>> [round(float(x), 2) for x in tt[1, :nn[1]]]
+    [18.0, 15.08, 12.0]
+
+    """
+    _check_copies(_awips.eqpb, (p, ht, t, td), 'C', stacklevel=3)
+    offsets = np.asarray(offsets, dtype=np.int32).reshape(-1)
+    arrays = [np.asarray(a, dtype=np.float32).reshape(-1)
+              for a in _filled((p, ht, t, td))]
+    if len(offsets) < 1 or offsets[0] < 0 or np.any(np.diff(offsets) < 0):
+        raise ValueError('offsets must be non-decreasing from 0 or more')
+    if offsets[-1] > len(arrays[0]):
+        raise ValueError('offsets must not exceed the length of p, %d' %
+                         len(arrays[0]))
+    if nuniform is None:
+        nuniform = max(list(_awips.eqpbn(deltap, offsets, arrays[0])) + [1])
+    result = _awips.eqpb(deltap, offsets, *(arrays + [nuniform]))
+    result = tuple([a.T for a in result[:4]]) + (result[4], )
+    return _missing_results(result, missing)
+
+
+def cclpar(mix, p, ht, t, **kwargs):
+    """
+    Calculate pressure, height, and temperature of the convective condensation
+    level (CCL) from a sounding.
+
+    Parameters
+    ----------
+    mix : real
+        Mixing ratio used to intersect the sounding (g/kg).
+    p : array_like, 1D
+        Sounding pressures (mb).
+    ht : array_like, 1D
+        Sounding heights (m above sea level)
+    t : array_like, 1D
+        Sounding temperatures (K).
+
+    Returns
+    -------
+    pccl : real
+        Pressure of the convective condensation level (mb).
+    tccl : real
+        Temperature of the convective condensation level (K).
+    hccl : real
+        Height of the convective condensation level (m above sea level).
+    Notes
+    -----
+    1) The low level mean mixing ratio is input to this routine...
+       computed outside.
+    2) On days with a strong low level inversion, the convective
+       temperature may seem low because the strict definition is
+       used in the computation (i.e., where the low level mixing
+       ratio line first intersects the sounding).
     3) Return values will contain flag value 99999. if no CCL is found.
 
     Examples
@@ -732,7 +2559,7 @@ def constant(a,const,**kwargs):
     return _awips.constant(a,const,**kwargs)
 
 
-def crossvectors(ax, ay, bx, by, **kwargs):
+def crossvectors(ax, ay, bx, by, out=None, **kwargs):
     """
     Cross a field of vectors by another.  Each i,j in one array of vectors
     is crossed with the corresponding i,j in the other array of vectors.
@@ -740,6 +2567,12 @@ def crossvectors(ax, ay, bx, by, **kwargs):
     Parameters
     ----------
     XXX
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
@@ -750,7 +2583,7 @@ def crossvectors(ax, ay, bx, by, **kwargs):
     XXX
 
     """
-    return _awips.crossvectors(ax, ay, bx, by, **kwargs)
+    return _grid(_awips.crossvectors, (ax, ay, bx, by), out=out, **kwargs)
 
 
 def ctop(p, ht, vv, peqlev, **kwargs):
@@ -792,27 +2625,33 @@ def ctop(p, ht, vv, peqlev, **kwargs):
     return _awips.ctop(p, ht, vv, peqlev, **kwargs)
 
 
-def derivative(a1, a2, b1, b2, **kwargs):
+def derivative(a1, a2, b1, b2, out=None, **kwargs):
     """
     Calculate the derivative of a with respect to b.
 
     Parameters
     ----------
-    a1 : array_like, 2D
+    a1 : array_like
         First a coordinate.
-    a2 : array_like, 2D
+    a2 : array_like
         Second a coordinate.
-    b1 : array_like, 2D
+    b1 : array_like
         First b coordinate.
-    b2 : array_like, 2D
+    b2 : array_like
         Second b coordinate.
     ni : int, optional
         Number of rows to calculate derivative for, default is all rows.
         Rows beyond ni will be zero filled.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    result : array, 2D, float32
+    result : array, float32
         Derivative of a with respect to b.
 
     Notes
@@ -828,25 +2667,31 @@ def derivative(a1, a2, b1, b2, **kwargs):
     array([[-19.60000038,  -9.19999981]], dtype=float32)
 
     """
-    return _awips.derivative(a1, a2, b1, b2, **kwargs)
+    return _grid(_awips.derivative, (a1, a2, b1, b2), out=out, **kwargs)
 
 
-def derived_icing(t, rh, **kwargs):
+def derived_icing(t, rh, out=None, **kwargs):
     """
     Calculate derived icing value from temperature and relative humidity
 
     Parameters
     ----------
-    t : array_like, 2D
+    t : array_like
         Temperature (K).
-    rh : array_like, 2D
+    rh : array_like
         Relative humidity (range 0 - 100).
     ni : int, optional
         Number of rows to calculate derived icing for, default is all rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    icg : array, 2D
+    icg : array
         Derived icing value (non-dim)
 
     Notes
@@ -860,31 +2705,38 @@ def derived_icing(t, rh, **kwargs):
     >>> aoslib.derived_icing([[267.15]], [[85.]])
     array([[ 3.33333325]], dtype=float32)
     """
-    return _awips.derived_icing(t, rh, **kwargs)
+    return _grid(_awips.derived_icing, (t, rh),
+                 out=out, outarg='icg', **kwargs)
 
 
-def dotvectors(ax, ay, bx, by, **kwargs):
+def dotvectors(ax, ay, bx, by, out=None, **kwargs):
     """
     Dot a field of vectors by another.  Each element in one array of vectors
     is dotted with the corresponding element in the other array of vectors.
     
     Parameters
     ----------
-    ax : array_like, 2D
+    ax : array_like
          First a value.
-    ay : array_like, 2D
+    ay : array_like
          Second a value.
-    bx : array_like, 2D
+    bx : array_like
          First b value.
-    by : array_like, 2D
+    by : array_like
          Second b value.
     ni : int, optional
          Number of rows to calculate dot product for, default is all rows.
          Rows beyond ni will be zero filled.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    result : array, 2D, float32
+    result : array, float32
          Dot product of a and b. Will have same shape as ax.
 
     Notes
@@ -899,25 +2751,31 @@ def dotvectors(ax, ay, bx, by, **kwargs):
     array([[ 5., 9.]], dtype=float32)
 
     """
-    return _awips.dotvectors(ax, ay, bx, by, **kwargs)
+    return _grid(_awips.dotvectors, (ax, ay, bx, by), out=out, **kwargs)
 
 
-def exp_aray(a, **kwargs):
+def exp_aray(a, out=None, **kwargs):
     """
     Calculates the exponential of a field. 
     b = exp(a).
 
     Parameters
     ----------
-    a : array_like, 2D
+    a : array_like
          Input array.
     ni : int, optional
          Number of rows to calculate exponential, default is all rows.
          Rows beyond ni will be zero filled.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    b : array, 2D, float32
+    b : array, float32
         Exponential of input array, a.
 
     Notes
@@ -935,23 +2793,29 @@ def exp_aray(a, **kwargs):
            [  3.67879450e-01,   9.99999993e+36]], dtype=float32)
 
     """
-    return _awips.exp_aray(a, **kwargs)
+    return _grid(_awips.exp_aray, (a, ), out=out, outarg='b', **kwargs)
 
 
-def hgt2pres(z, **kwargs):
+def hgt2pres(z, out=None, **kwargs):
     """
     Calculate pressure from height based on a standard atmosphere.
 
     Parameters
     ----------
-    z : array_like, 2D
+    z : array_like
         Height (m)
     ni : int, optional
         Number of rows to calculate pressure for, default is all rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    p : array, 2D
+    p : array
         Pressure (mb).
 
     Notes
@@ -967,17 +2831,17 @@ def hgt2pres(z, **kwargs):
     array([[ 700.90557861]], dtype=float32)
 
     """
-    return _awips.hgt2pres(z, **kwargs)
+    return _grid(_awips.hgt2pres, (z, ), out=out, outarg='p', **kwargs)
 
 
-def lintrans(a, mult, add, **kwargs):
+def lintrans(a, mult, add, out=None, **kwargs):
     """
     Routine to do a linear translation on an array. Each element in the 
     array is multiplied by 'mult' and then added to by 'add'.
 
     Parameters
     ----------
-    a : array_like, 2D
+    a : array_like
         Input array.
     mult : real
         Value to be multiplied by each element of the input array.
@@ -986,10 +2850,16 @@ def lintrans(a, mult, add, **kwargs):
     ni : int, optional
         Number of rows to perform linear translation on, default is all rows.
         Rows beyond ni will be zero filled.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    result : array, 2D, float32
+    result : array, float32
         Linear translation of input array. Will have same shape as a.
 
     Notes
@@ -1005,28 +2875,34 @@ def lintrans(a, mult, add, **kwargs):
            [  98.,  100.]], dtype=float32)
 
     """
-    return _awips.lintrans(a, mult, add, **kwargs)
+    return _grid(_awips.lintrans, (a, ), (mult, add, ), out=out, **kwargs)
 
 
-def mixrat(p, t, rh, **kwargs):
+def mixrat(p, t, rh, out=None, **kwargs):
     """
     Calculate mixing ratio from the pressure, temperature, and relative
     humidity.
 
     Parameters
     ----------
-    p : array_like, 2D
+    p : array_like
         Pressure (mb).
-    t : array_like, 2D
+    t : array_like
         Temperature (K).
-    rh : array_like, 2D
+    rh : array_like
         Relative humidity (range 0 - 100).
     ni : int, optional
         Number of rows to calculate mixing ratio for, default is all rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    q  : array, 2D
+    q  : array
         Mixing ratio (g/kg)
 
     Notes
@@ -1042,26 +2918,32 @@ def mixrat(p, t, rh, **kwargs):
     array([[ 15.00989723]], dtype=float32)
 
     """
-    return _awips.mixrat(p, t, rh, **kwargs)
+    return _grid(_awips.mixrat, (p, t, rh), out=out, outarg='q', **kwargs)
 
 
-def mslp2thkns(mslp, hgt, **kwargs):
+def mslp2thkns(mslp, hgt, out=None, **kwargs):
     """
     Estimate 1000 to 500 mb layer thickness from 500 mb height and mean sea
     level pressure
 
     Parameters
     ----------
-    mslp : array_like, 2D
+    mslp : array_like
         Mean sea level pressure (mb).
-    hgt : array_like, 2D
+    hgt : array_like
         Height of 500 mb level (m)
     ni : int, optional
         Number of rows to estimate thickness for, default is all rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    thkns  : array, 2D
+    thkns  : array
         Thickness of 1000 to 500 layer (m)
 
     Notes
@@ -1077,27 +2959,34 @@ def mslp2thkns(mslp, hgt, **kwargs):
     array([[ 5459.20117188]], dtype=float32)
 
     """
-    return _awips.mslp2thkns(mslp, hgt, **kwargs)
+    return _grid(_awips.mslp2thkns, (mslp, hgt),
+                 out=out, outarg='thkns', **kwargs)
 
 
-def mult_by_cnst(a, const, **kwargs):
+def mult_by_cnst(a, const, out=None, **kwargs):
     """
     Routine to multiply an array by a real constant. Each element in the 
     array is multiplied by the constant. 
 
     Parameters
     ----------
-    a : array_like, 2D
+    a : array_like
 	Input array
     const: real
         Value to be multiplied by each element of the input array.
     ni : int, optional
         Number of rows to calculate natural log for, default is all rows.
 	Rows beyond ni will be zero filled.
-   
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
+
     Returns
     -------
-    result : array, 2D, float32
+    result : array, float32
         Resulting array after multiplying each element in a by const.
         Will have the same shape as a.
 
@@ -1113,25 +3002,31 @@ def mult_by_cnst(a, const, **kwargs):
            [ -1.50000005e+37,   9.99999993e+36]], dtype=float32)
 
     """
-    return _awips.mult_by_cnst(a,const, **kwargs)
+    return _grid(_awips.mult_by_cnst, (a, ), (const, ), out=out, **kwargs)
 
 
-def natlog(a, **kwargs):
+def natlog(a, out=None, **kwargs):
     """
     Calculates the natural log of a field. 
     b = ln(a).
 
     Parameters
     ----------
-    a : array_like, 2D
+    a : array_like
 	Input array.
     ni : int, optional
         Number of rows to calculate natural log for, default is all rows.
         Rows beyond ni will be zero filled.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    b : array, 2D, float32
+    b : array, float32
         Natural log of each element in input array, a.
         Will have the same shape as a.
 
@@ -1147,26 +3042,32 @@ def natlog(a, **kwargs):
            [  9.99999993e+36,   9.99999993e+36]], dtype=float32)
 
     """
-    return _awips.natlog(a, **kwargs)
+    return _grid(_awips.natlog, (a, ), out=out, outarg='b', **kwargs)
 
 
-def powercalc(a, b, **kwargs):
+def powercalc(a, b, out=None, **kwargs):
     """
     Raise each item in the field a to the power in field b.
     result = a**b.
 
     Parameters
     ----------
-    a : array_like, 2D
+    a : array_like
         Array holding bases.
-    b : array_like, 2D
+    b : array_like
         Array holding exponents.
     ni : int, optional
         Number of rows to raise to given power, default is all rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    result : array, 2D
+    result : array
         Will have same shape as a and b.
 
     Notes
@@ -1184,25 +3085,31 @@ def powercalc(a, b, **kwargs):
     array([[ 256.]], dtype=float32)
 
     """
-    return _awips.powercalc(a, b, **kwargs)
+    return _grid(_awips.powercalc, (a, b), out=out, **kwargs)
 
 
-def press2alt(p, z, **kwargs):
+def press2alt(p, z, out=None, **kwargs):
     """
     Calculate altimeter setting from pressure and elevation
 
     Parameters
     ----------
-    p : array_like, 2D
+    p : array_like
         Pressure (mb).
-    z : array_like, 2D
+    z : array_like
         Elevation (m)
     ni : int, optional
         Number of rows to calculate altimeter setting for, default is all rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    alt  : array, 2D
+    alt  : array
         Altimeter setting (mb)
 
     Notes
@@ -1217,7 +3124,7 @@ def press2alt(p, z, **kwargs):
     >>> aoslib.press2alt([[800]], [[5000]])
     array([[ 1500.59912109]], dtype=float32)
     """
-    return _awips.press2alt(p, z, **kwargs)
+    return _grid(_awips.press2alt, (p, z), out=out, outarg='alt', **kwargs)
 
 
 def ptozsa(p, **kwargs):
@@ -1249,7 +3156,8 @@ def ptozsa(p, **kwargs):
     return _awips.ptozsa(p, **kwargs)
 
 
-def slfront(z, t, p, dx, dy, coriolis,  **kwargs):
+def slfront(z, t, p, dx, dy, coriolis, out=None, work=None, missing='flag',
+            **kwargs):
     """
     Calculate the QG frontogenesis function on a single level using just that
     level's data.
@@ -1271,6 +3179,13 @@ def slfront(z, t, p, dx, dy, coriolis,  **kwargs):
     ni : int, optional
         Number of rows to calculate frontogenesis function for, default is all
         rows.
+    out : array, 2D, optional
+        Array to store the frontogenesis function in.
+    work : sequence of 7 arrays, 2D, optional
+        Scratch arrays with the shape of z, reused between calls.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  Masked input values are treated as missing.
 
     Returns
     -------
@@ -1299,28 +3214,52 @@ def slfront(z, t, p, dx, dy, coriolis,  **kwargs):
            [  9.99999993e+36,   9.99999993e+36,   9.99999993e+36]], dtype=float32)
 
     """
-    return _awips.slfront(z, t, p, dx, dy, coriolis,  **kwargs)
-
-
-def spechum(p, t, rh, **kwargs):
+    _check_kwargs('slfront', kwargs)
+    _check_copies(_awips.slfront, _with_out((z, t, dx, dy, coriolis), out),
+                  stacklevel=3)
+    kwargs.update(_work(_awips.slfront, ('slqx', 'slqy', 'w1', 'w2', 'w3',
+                                         'dtdx', 'dtdy'), work))
+    if out is not None:
+        kwargs['fgen'] = out
+
+    def front(z, t, dx, dy, coriolis, **kwargs):
+        return _awips.slfront(z, t, p, dx, dy, coriolis, **kwargs)
+
+    # Each smoothing pass set by setqsmooth widens the stencil by a point,
+    # and smooths z and t in place.
+    halo = 1 + max(int(_awips.qsmthcmn.passes), 0)
+    arrays = _filled((z, t, dx, dy, coriolis))
+    return _result(_tiled(front, arrays, (), kwargs, 'fgen', halo=halo,
+                          worknames=('slqx', 'slqy', 'w1', 'w2', 'w3', 'dtdx',
+                                     'dtdy'), scratch=(0, 1),
+                          missing=missing), out)
+
+
+def spechum(p, t, rh, out=None, **kwargs):
     """
     Calculate specific humidity from pressure, temperature, and relative
     humidity.
 
     Parameters
     ----------
-    p : array_like, 2D
+    p : array_like
         Pressure (mb).
-    t : array_like, 2D
+    t : array_like
         Temperature (K).
-    rh : array_like, 2D
+    rh : array_like
         Relative humidity (range 0 - 100).
     ni : int, optional
         Number of rows to calculate specific humidity for, default is all rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    q : array, 2D
+    q : array
         Specific humidity (g/kg). Will have same shape as p.
 
     Notes
@@ -1336,26 +3275,32 @@ def spechum(p, t, rh, **kwargs):
     array([[ 14.78793144]], dtype=float32)
 
     """
-    return _awips.spechum(p, t, rh, **kwargs)
+    return _grid(_awips.spechum, (p, t, rh), out=out, outarg='q', **kwargs)
 
 
-def spechum2(p, td, **kwargs):
+def spechum2(p, td, out=None, **kwargs):
     """
     Calculate saturation specific  humidity from dewpoint and pressure.
 
     Parameters
     ----------
-    p : array_like, 2D
+    p : array_like
         Pressure  (mb).
-    td : array_like, 2D
+    td : array_like
         Dewpoint (K).
     ni : int, optional
         Number of rows to calculate specific humidity for, default is all
         rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    q : array, 2D
+    q : array
         Specific humidity (g/kg)
 
     Notes
@@ -1371,25 +3316,31 @@ def spechum2(p, td, **kwargs):
     array([[ 19.75852013]], dtype=float32)
 
     """
-    return _awips.spechum2(p, td, **kwargs)
+    return _grid(_awips.spechum2, (p, td), out=out, outarg='q', **kwargs)
 
 
-def tv2temp(tv, q, **kwargs):
+def tv2temp(tv, q, out=None, **kwargs):
     """
     Calculate temperature from the virtual temperature and specific humidity.
 
     Parameters
     ----------
-    tv : array_like, 2D
+    tv : array_like
         Virtural temperature  (K).
-    q : array_like, 2D
+    q : array_like
         Specific humidity (g/kg)
     ni : int, optional
         Number of rows to calculate temperature for, default is all rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    t : array, 2D
+    t : array
         Temperature (K)
 
     Notes
@@ -1405,7 +3356,7 @@ def tv2temp(tv, q, **kwargs):
     array([[ 306.45977783]], dtype=float32)
 
     """
-    return _awips.tv2temp(tv, q, **kwargs)
+    return _grid(_awips.tv2temp, (tv, q), out=out, outarg='t', **kwargs)
 
 
 def ztopsa(z, **kwargs):
@@ -1438,24 +3389,30 @@ def ztopsa(z, **kwargs):
     return _awips.ztopsa(z, **kwargs)
 
 
-def dmixr(temp, pres, iw, **kwargs):
+def dmixr(temp, pres, iw, out=None, missing='flag', **kwargs):
     """
     Calculate the water vapor mixing ratio with respect to either water or
     ice.
 
     Parameters
     ----------
-    temp : real
+    temp : real or array_like
         Temperature (K).
-    pres : real
-        Pressure (mb)
+    pres : real or array_like
+        Pressure (mb), must be broadcastable against temp.
     iw : int
        > 0 for mixing ratio with respect to water
        < 0 for mixing ratio with respect to ice
+    out : array, optional
+        Array in which to place the result, must have the broadcast shape
+        of the inputs.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    dmixr  : real
+    dmixr  : real or array
         mixing ratio (g/kg)
 
     Notes
@@ -1468,13 +3425,21 @@ def dmixr(temp, pres, iw, **kwargs):
     Examples
     --------
     >>> import aoslib
+    >>> import numpy as np
     >>> aoslib.dmixr(301., 1000, -1)
     31.9014892578125
     >>> aoslib.dmixr(301., 1000, 1)
     24.23381233215332
+    >>> w = aoslib.dmixr(np.array([301., 280.], dtype='float32'), 1000, 1)
+    >>> [round(float(x), 4) for x in w]
+    [24.2338, 6.2304]
 
     """
-    return _awips.dmixr(temp, pres, iw, **kwargs)
+    if (out is None and missing == 'flag' and np.ndim(temp) == 0 and
+            np.ndim(pres) == 0):
+        return _awips.dmixr(temp, pres, iw, **kwargs)
+    return _elementwise(_awips.dmixr_aray, (temp, pres), out, (iw, ),
+                        missing)
 
 
 def dzdlnp(p, t, td, **kwargs):
@@ -1510,20 +3475,75 @@ def dzdlnp(p, t, td, **kwargs):
     return _awips.dzdlnp(p, t, td, **kwargs)
 
 
-def radnorm(jd, **kwargs):
+# Solar declination, earth-sun distance factor and equation of time of
+# each Julian day met so far by the array versions of the sun functions.
+_day_terms = {}
+
+
+def _days(jd):
+    """
+    The solar declination, earth-sun distance factor and equation of time
+    of the distinct days of the Julian days `jd`, each computed once and
+    kept in `_day_terms`.
+
+    Returns the (3, ndays + 1) float32 array of the terms of each day, the
+    first column holding the 1e37 flag, and the int32 array with the shape
+    of `jd` of the column of each of its elements, 0 where the day is
+    missing (> 99998, NaN or masked).
+    """
+    data = np.asarray(np.ma.getdata(jd))
+    with np.errstate(invalid='ignore'):
+        valid = ~np.ma.getmaskarray(jd) & (data <= 99998)
+    days, index = np.unique(data[valid], return_inverse=True)
+    table = np.empty((3, days.size + 1), dtype=np.float32)
+    table[:, 0] = 1e37
+    for i, day in enumerate(days):
+        day = int(day)
+        terms = _day_terms.get(day)
+        if terms is None:
+            terms = (_awips.soldec(day), _awips.radnorm(day),
+                     _awips.timeq(day))
+            _day_terms[day] = terms
+        table[:, i + 1] = terms
+    column = np.zeros(data.shape, dtype=np.int32)
+    column[valid] = index.reshape(-1) + 1
+    return table, column
+
+
+def _day_term(jd, row, missing):
+    """
+    Row `row` of the terms of `_days` for each of the Julian days `jd`,
+    with missing values returned as set by `missing`.
+    """
+    table, column = _days(jd)
+    result = table[row][column]
+    mask = _mask(result, missing)
+    _mark_missing(result, missing, mask)
+    return _masked(result, mask)
+
+
+def radnorm(jd, missing='flag', **kwargs):
     """
     Calculate normalized earth-sun distance factor (R0/R)**2
 
     Parameters
     ----------
-    jd : int
+    jd : int or array_like
         Julian day number
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values of array input as the 1e37 flag (default),
+        as NaN or in a masked array.
 
     Returns
     -------
-    radnorm  : real
+    radnorm  : real or array
         Normalized earth-sun distance factor
 
+    Notes
+    -----
+    For array input the value is computed once for each distinct day and
+    kept for later calls.
+
     Examples
     --------
     >>> import aoslib
@@ -1531,24 +3551,34 @@ def radnorm(jd, **kwargs):
     0.9666188955307007
 
     """
-    return _awips.radnorm(jd, **kwargs)
+    if np.ndim(jd) == 0 and not np.ma.is_masked(jd):
+        return _awips.radnorm(jd, **kwargs)
+    return _day_term(jd, 1, missing)
 
 
-def soldec(jd, **kwargs):
+def soldec(jd, missing='flag', **kwargs):
     """
     Calculate solar declination angle
 
     Parameters
     ----------
-    jd : int
+    jd : int or array_like
         Julian day number
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values of array input as the 1e37 flag (default),
+        as NaN or in a masked array.
 
     Returns
     -------
-    soldec  : real
+    soldec  : real or array
         Solar declination angle (radians)
 
 
+    Notes
+    -----
+    For array input the value is computed once for each distinct day and
+    kept for later calls.
+
     Examples
     --------
     >>> import aoslib
@@ -1556,24 +3586,34 @@ def soldec(jd, **kwargs):
     0.4033815860748291
 
     """
-    return _awips.soldec(jd, **kwargs)
+    if np.ndim(jd) == 0 and not np.ma.is_masked(jd):
+        return _awips.soldec(jd, **kwargs)
+    return _day_term(jd, 0, missing)
 
 
-def timeq(jd, **kwargs):
+def timeq(jd, missing='flag', **kwargs):
     """
     Calculate equation of time
 
     Parameters
     ----------
-    jd : int
+    jd : int or array_like
         Julian day number
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values of array input as the 1e37 flag (default),
+        as NaN or in a masked array.
 
     Returns
     -------
-    timeq  : real
+    timeq  : real or array
         Equation of time (radians)
 
 
+    Notes
+    -----
+    For array input the value is computed once for each distinct day and
+    kept for later calls.
+
     Examples
     --------
     >>> import aoslib
@@ -1581,21 +3621,91 @@ def timeq(jd, **kwargs):
     -0.01598
 
     """
-    return _awips.timeq(jd, **kwargs)
+    if np.ndim(jd) == 0 and not np.ma.is_masked(jd):
+        return _awips.timeq(jd, **kwargs)
+    return _day_term(jd, 2, missing)
 
 
-def esat(t, **kwargs):
+def radiation(lat, lng, lsm, jd, hr, bext, od, out=None, missing='flag'):
+    """
+    Calculate the mean solar radiation at the ground
+
+    Parameters
+    ----------
+    lat : real or array_like
+        Latitude (degrees).
+    lng : real or array_like
+        Longitude (degrees).
+    lsm : real or array_like
+        Longitude of the standard meridian (degrees).
+    jd : int or array_like
+        Julian day number.
+    hr : real or array_like
+        Local standard time (decimal hours).
+    bext : real or array_like
+        Rayleigh extinction coefficient.
+    od : real or array_like
+        Optical depth.
+    out : array, optional
+        Array in which to place the result, must have the broadcast shape
+        of the inputs.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
+
+    Returns
+    -------
+    radiation  : real or array
+        Mean solar radiation at the ground over the 5 minutes centred on
+        hr (W/m**2), 0 when the sun is below the horizon.
+
+    Notes
+    -----
+    1) The arguments are broadcast against each other, so a time series of
+       grids is computed from jd and hr of shape (nt, 1, 1) and lat and
+       lng of shape (ny, nx).
+    2) The solar declination, earth-sun distance factor and equation of
+       time are computed once for each distinct day, as by soldec, radnorm
+       and timeq, and kept for later calls.
+    3) Values > 99998.0 in any of the inputs are missing.
+
+    Examples
+    --------
+    >>> import aoslib
+    >>> import numpy as np
+    >>> lat = np.array([[30.], [40.]])
+    >>> hr = np.arange(6., 19., 3.).reshape(-1, 1, 1)
+    >>> aoslib.radiation(lat, -100., -90., 172, hr, 0.1, 1.).shape
+    (5, 2, 1)
+
+    """
+    table, column = _days(jd)
+    # When every day is missing no point refers to the table, which is
+    # then passed with just its flag column.
+    terms = table[:, 1:] if table.shape[1] > 1 else table
+    return _elementwise(_awips.radiation_aray,
+                        (lat, lng, lsm, hr, bext, od,
+                         column.astype(np.float32)),
+                        out, tuple(terms), missing)
+
+
+def esat(t, out=None, missing='flag', **kwargs):
     """
     Calculate saturation vapor pressure as a function of temperature
 
     Parameters
     ----------
-    t : real
+    t : real or array_like
         Temperature (C or K).
+    out : array, optional
+        Array in which to place the result, must have the same shape as t.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    esat  : real
+    esat  : real or array
         Saturation vapor pressure (mb)
 
     Notes
@@ -1607,28 +3717,38 @@ def esat(t, **kwargs):
     Examples
     --------
     >>> import aoslib
-
+    >>> import numpy as np
     >>> aoslib.esat(273.15)
     6.106378078460693
     >>> aoslib.esat(0)
     6.106378078460693
+    >>> es = aoslib.esat(np.array([273.15, 300.], dtype='float32'))
+    >>> [round(float(x), 4) for x in es]
+    [6.1064, 35.3323]
 
     """
-    return _awips.esat(t,  **kwargs)
+    if out is None and missing == 'flag' and np.ndim(t) == 0:
+        return _awips.esat(t,  **kwargs)
+    return _elementwise(_awips.esat_aray, (t, ), out, missing=missing)
 
 
-def tdofesat(es, **kwargs):
+def tdofesat(es, out=None, missing='flag', **kwargs):
     """
     Calculate dewpoint termperature as a function of saturation vapor pressure
 
     Parameters
     ----------
-    es : real
+    es : real or array_like
         Saturation vapor pressure (mb).
+    out : array, optional
+        Array in which to place the result, must have the same shape as es.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    tdofesat  : real
+    tdofesat  : real or array
         Dewpoint termperature (K)
 
     Notes
@@ -1642,29 +3762,37 @@ def tdofesat(es, **kwargs):
     349.4
 
     """
-    return _awips.tdofesat(es,  **kwargs)
+    if out is None and missing == 'flag' and np.ndim(es) == 0:
+        return _awips.tdofesat(es,  **kwargs)
+    return _elementwise(_awips.tdofesat_aray, (es, ), out, missing=missing)
 
 
-def pottemp(temp, dwpt, pres, iw, **kwargs):
+def pottemp(temp, dwpt, pres, iw, out=None, missing='flag', **kwargs):
     """
     Calculate the potential temperature based on temperature, dewpoint
     temperature, and pressure
 
     Parameters
     ----------
-    temp: real
+    temp: real or array_like
         Temperature (C or K)
-    dwpt : real
+    dwpt : real or array_like
         Dew point temperature (C or K -- must be the same units as temp)
-    pres :
+    pres : real or array_like
         Pressure (mb)
     iw : int
         >0 for mixing ratio with respect to water
         <0 for mixing ratio with respect to ice
+    out : array, optional
+        Array in which to place the result, must have the broadcast shape
+        of temp, dwpt and pres.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    pottemp : int
+    pottemp : real or array
         Potential temperature (C or K)
 
     Examples
@@ -1676,35 +3804,49 @@ def pottemp(temp, dwpt, pres, iw, **kwargs):
     33.215
 
     """
-    return _awips.pottemp(temp, dwpt, pres, iw, **kwargs)
+    if (out is None and missing == 'flag' and
+            np.ndim(temp) == np.ndim(dwpt) == np.ndim(pres) == 0):
+        return _awips.pottemp(temp, dwpt, pres, iw, **kwargs)
+    return _elementwise(_awips.pottemp_aray, (temp, dwpt, pres), out, (iw, ),
+                        missing)
 
 
-def thetawa(temp, dwpt, pres, iw,  **kwargs):
+def thetawa(temp, dwpt, pres, iw, out=None, missing='flag', **kwargs):
     """
     Calculate the adiabatic web bulb potential temperature
 
     Parameters
     ----------
-    temp: real
+    temp: real or array_like
         Temperature (C or K)
-    dwpt : real
+    dwpt : real or array_like
         Dew point temperature (C or K -- must be the same units as temp)
-    pres :
+    pres : real or array_like
         Pressure (mb)
     iw : int
         >0 for mixing ratio with respect to water
         <0 for mixing ratio with respect to ice
+    out : array, optional
+        Array in which to place the result, must have the broadcast shape
+        of temp, dwpt and pres.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    thetawa : real
+    thetawa : real or array
         Adiabatic wet bulb potential temperature (C or K depending on input
         units)
 
     Notes
     -----
     1) Values less than 100 for temperature are assumed to be Celcius degrees
-    1) A flag value of -999.0 is returned if this routine fails
+    2) A flag value of -999.0 is returned if the iteration for the
+       temperature at the LCL does not converge, which only happens for
+       unphysical input such as a dewpoint at or below 0 K or far above
+       the temperature.  It is missing, like the 1e37 flag, with
+       missing='nan' or 'mask'.
 
     Examples
     --------
@@ -1714,15 +3856,148 @@ def thetawa(temp, dwpt, pres, iw,  **kwargs):
     >>> aoslib.thetawa(30,30,700,1)
     33.21508026123047
 
+    """
+    if (out is None and missing == 'flag' and
+            np.ndim(temp) == np.ndim(dwpt) == np.ndim(pres) == 0):
+        return _awips.thetawa(temp, dwpt, pres, iw,  **kwargs)
+    return _missing_results(_elementwise(_awips.thetawa_aray,
+                                         (temp, dwpt, pres), out, (iw, )),
+                            missing, failed=-999.)
+
+
+def tplcl(temp, dwpt, pres, missing='flag'):
+    """
+    Calculate the temperature and pressure of the lifting condensation
+    level (LCL) of parcels.
+
+    Parameters
+    ----------
+    temp : real or array_like
+        Parcel temperature (C).
+    dwpt : real or array_like
+        Parcel dew point temperature (C).
+    pres : real or array_like
+        Initial pressure of the parcel (mb).
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
+
+    Returns
+    -------
+    tl : array
+        Temperature at the LCL (K).
+    pl : array
+        Pressure at the LCL (mb).
+    ok : array of bool
+        True where the LCL was found, False where an input is missing or
+        the iteration failed.
+
+    Notes
+    -----
+    1) The arrays are broadcast against each other and the results have
+       the broadcast shape.  Points which are not ok are missing in tl and
+       pl.
+
+    Examples
+    --------
+    >>> import aoslib
+    >>> import numpy as np
+    >>> tl, pl, ok = aoslib.tplcl([20., 20.], [10., np.nan], 1000.)
+    >>> ok.tolist()
+    [True, False]
+
+    """
+    return _elementwise_status(_awips.tplcl_aray, (temp, dwpt, pres), 2,
+                               missing=missing)
+
+
+def tpzlcl(temp, dwpt, pres, iw=1, missing='flag'):
+    """
+    Calculate the temperature and pressure of the lifting condensation
+    level (LCL) of parcels and the distance to it.
+
+    Parameters
+    ----------
+    temp : real or array_like
+        Parcel temperature (K).
+    dwpt : real or array_like
+        Parcel dew point temperature (K).
+    pres : real or array_like
+        Initial pressure of the parcel (mb).
+    iw : int, optional
+        >0 for mixing ratio with respect to water (default)
+        <0 for mixing ratio with respect to ice
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
+
+    Returns
+    -------
+    tl : array
+        Temperature at the LCL (K).
+    pl : array
+        Pressure at the LCL (mb).
+    zl : array
+        Distance between the initial level and the LCL (m).
+    ok : array of bool
+        True where the LCL was found, False where an input is missing or
+        the iteration failed.
+
+    Notes
+    -----
+    1) The arrays are broadcast against each other and the results have
+       the broadcast shape.  Points which are not ok are missing in tl, pl
+       and zl.
+    2) Within `wetbulb_iterations` the LCL temperature is solved in a fixed
+       number of Newton steps, which does not fail.
+
+    """
+    return _elementwise_status(_awips.tpzlcl_aray, (temp, dwpt, pres), 3,
+                               (iw, ), missing)
+
 
+def moistlift(t, pstart, pfinish, out=None, missing='flag'):
+    """
+    Calculate the temperature of parcels lifted (or lowered) along a
+    pseudo-moist adiabat.
+
+    Parameters
+    ----------
+    t : real or array_like
+        Temperature of the parcels at pstart (K).
+    pstart : real or array_like
+        Starting pressure (mb).
+    pfinish : real or array_like
+        Final pressure (mb).
+    out : array, optional
+        Array in which to place the result, with the broadcast shape of the
+        inputs.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
+    Returns
+    -------
+    t : array
+        Temperature of the parcels at pfinish (K).
+
+    Notes
+    -----
+    1) The parcels are integrated with pseudolift in 100 steps, or
+       interpolated from the moist adiabat table within `moist_table`.
 
+    Examples
+    --------
+    >>> import aoslib
+    >>> aoslib.moistlift(280., 1000., [850., 500.])
+    array([ 270.31234741,  236.18002319], dtype=float32)
 
     """
-    return _awips.thetawa(temp, dwpt, pres, iw,  **kwargs)
+    return _elementwise(_awips.moistlift_aray, (t, pstart, pfinish), out,
+                        missing=missing)
 
 
-def add_aray(a, b, **kwargs):
+def add_aray(a, b, out=None, **kwargs):
     """
     Add two arrays element-by-element.
 
@@ -1731,9 +4006,9 @@ def add_aray(a, b, **kwargs):
 
     Parameters
     ----------
-    a : array_like, 2D
+    a : array_like
         First array to add.
-    b : array_like, 2D
+    b : array_like
         Seconds array to add.
     mode : int, optional
         Flag controlling how bad values are handled.
@@ -1742,10 +4017,16 @@ def add_aray(a, b, **kwargs):
         values are treated as zeros.
     ni : int, optional
         Number of rows to calculate addition for, default is all rows.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    result : array, 2D, float32
+    result : array, float32
         Element by element addition of a and b.
 
     Notes
@@ -1755,10 +4036,10 @@ def add_aray(a, b, **kwargs):
        >1.e36 in the input arrays `a` and `b`
 
     """
-    return _awips.add_aray(a, b, **kwargs)
+    return _grid(_awips.add_aray, (a, b), out=out, **kwargs)
 
 
-def dgeocomps(z, f, spax, spay, **kwargs):
+def dgeocomps(z, f, spax, spay, out=None, missing='flag', **kwargs):
     """
     Calculate components of geostrophic wind.
 
@@ -1778,6 +4059,11 @@ def dgeocomps(z, f, spax, spay, **kwargs):
         values in spax and spay will be used.  Note that if these limits are
         specified locations beyond the limits in the output are indeterminate
         and should not be used.
+    out : sequence of 4 arrays, 2D, optional
+        Arrays to store dugdx, dugdy, dvgdx and dvgdy in.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  Masked input values are treated as missing.
 
     Returns
     -------
@@ -1790,10 +4076,25 @@ def dgeocomps(z, f, spax, spay, **kwargs):
     1) No quality control is performed in this routine.
 
     """
-    return _awips.dgeocomps(z, f, spax, spay, **kwargs)
-
-
-def meanomega(p1, u1, v1, p2, u2, v2, dx, dy, dt, **kwargs):
+    _check_kwargs('dgeocomps', kwargs, ('nx', 'ny'))
+    _check_missing(missing)
+    names = ('dugdx', 'dugdy', 'dvgdx', 'dvgdy')
+    if out is None:
+        _check_copies(_awips.dgeocomps, (z, f, spax, spay), stacklevel=3)
+        return _missing_results(_awips.dgeocomps(
+            *_filled((z, f, spax, spay)), **kwargs), missing)
+    if len(out) != len(names):
+        raise ValueError('out must be a sequence of 4 arrays')
+    _check_copies(_awips.dgeocomps, [z, f, spax, spay] + list(out),
+                  stacklevel=3)
+    kwargs.update(zip(names, out))
+    result = _awips.dgeocomps(*_filled((z, f, spax, spay)), **kwargs)
+    return _missing_results(tuple([_result(r, o)
+                                   for r, o in zip(result, out)]), missing)
+
+
+def meanomega(p1, u1, v1, p2, u2, v2, dx, dy, dt, out=None, work=None,
+              missing='flag', **kwargs):
     """
     Calculate the mean adiabatic omega on a theta surface.
 
@@ -1812,6 +4113,13 @@ def meanomega(p1, u1, v1, p2, u2, v2, dx, dy, dt, **kwargs):
         Time period between parameters in seconds.
     nx : int, optional
         Number of rows to calculate omega for, default is all rows.
+    out : array, 2D, optional
+        Array to store omega in.
+    work : array, 2D, optional
+        Scratch array with the shape of p1, reused between calls.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  Masked input values are treated as missing.
 
     Returns
     -------
@@ -1826,10 +4134,20 @@ def meanomega(p1, u1, v1, p2, u2, v2, dx, dy, dt, **kwargs):
        at the positions where such values are found.
 
     """
-    return _awips.meanomega(p1, u1, v1, p2, u2, v1, dx, dy, dt, **kwargs)
-
-
-def smooth(input, smth, **kwargs):
+    _check_kwargs('meanomega', kwargs, ('nx', ))
+    _check_missing(missing)
+    args = (p1, u1, v1, p2, u2, v2, dx, dy)
+    _check_copies(_awips.meanomega, _with_out(args, out), stacklevel=3)
+    p1, u1, v1, p2, u2, v2, dx, dy = _filled(args)
+    if work is not None:
+        kwargs.update(_work(_awips.meanomega, ('work', ), (work, )))
+    if out is not None:
+        kwargs['omega'] = out
+    return _missing_results(_result(_awips.meanomega(
+        p1, u1, v1, p2, u2, v2, dx, dy, dt, **kwargs), out), missing)
+
+
+def smooth(input, smth, out=None, npasses=1, missing='flag', **kwargs):
     """
     Smooth the input array.
 
@@ -1838,21 +4156,36 @@ def smooth(input, smth, **kwargs):
     z(i) = (1 - s) z(i) + s(z(i+1) + z(i-1)) / 2
 
     Run this function in 2 passes with smth of 0.5 and -0.5 to damp 2dx waves
-    comletely but leave 4dx and longer waves with little damping.
+    comletely but leave 4dx and longer waves with little damping.  All of the
+    passes are made in one sweep over the grid, with each column still in
+    cache for the next pass, and columns without missing values skip the
+    missing value tests.
 
     Parameters
     ----------
-    input : array_like, 2D
+    input : array_like, 2D or 3D
         Input signal, missing values are indicated with the values >99998.
-    smth : float
-        Smoothing filter parameter.
+        A 3D array is a stack of grids along the first dimension, (nlev,
+        ni, nj) as for isentropic and vertical_plan, each smoothed
+        separately.
+    smth : float or sequence of floats
+        Smoothing filter parameter, or the parameters of successive passes,
+        for example [0.5, -0.5].
+    npasses : int, optional
+        Number of times to apply the passes in `smth`, default 1.
     ix : int, optional
         Number of rows for input to smooth, default is all rows.  Rows beyond
         ix will be zero filled.
+    out : array, 2D or 3D, optional
+        Array to store the output signal in, rows beyond ix are left
+        unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as they are (default), as NaN or in a masked
+        array.  Masked input values are treated as missing.
 
     Returns
     -------
-    ouput : array, 2D, float32
+    ouput : array, 2D or 3D, float32
         Output signal after smoothing.  Missing values are indicated with
         values > 99998.
 
@@ -1860,11 +4193,40 @@ def smooth(input, smth, **kwargs):
     -----
     1) No quality control is performed in this routine.
 
-    """
-    return _awips.smooth(input, smth, **kwargs)
-
+    Examples
+    --------
+    >>> import aoslib
+    >>> import numpy as np
+    >>> a = np.zeros((5, 5)); a[2, 2] = 1.
+    >>> round(float(aoslib.smooth(a, [0.5, -0.5], npasses=2)[2, 2]), 4)
+    0.2659
 
-def add_by_cnst(a, const, **kwargs):
+    """
+    _check_kwargs('smooth', kwargs, ('ix', ))
+    _check_missing(missing)
+    _check_copies(_awips.smoothn, _with_out((input, ), out), stacklevel=3)
+    weights = np.tile(np.asarray(smth, dtype=np.float32).ravel(), npasses)
+    if not len(weights):
+        raise ValueError('at least one smoothing pass is needed')
+    input, = _filled([input])
+    if input.ndim not in (2, 3):
+        raise ValueError('input must be 2D or 3D')
+    # The grids are passed to smoothn along its last dimension.
+    flat = input.ndim == 2
+    if flat:
+        input = input[:, :, np.newaxis]
+    else:
+        input = input.transpose(1, 2, 0)
+    if out is not None:
+        kwargs['output'] = (out[:, :, np.newaxis] if flat else
+                            out.transpose(1, 2, 0))
+    result = _tiled(_awips.smoothn, [input], (weights, ), kwargs, 'output',
+                    halo=len(weights))
+    result = result[:, :, 0] if flat else result.transpose(2, 0, 1)
+    return _missing_results(_result(result, out), missing, above=99998.)
+
+
+def add_by_cnst(a, const, out=None, **kwargs):
     """
     Add a constant to elements in an array.
 
@@ -1873,17 +4235,23 @@ def add_by_cnst(a, const, **kwargs):
 
     Parameters
     ----------
-    a : array_like, 2D
+    a : array_like
         Input array, values greater than 1e36 are considered missing/bad.
     const : float
         Constant to add to elements of the array.
     ni : int, optional
         Number of rows to calculate addition for, default is all rows.
         Rows beyond ni in will be zero filled.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    result : array, 2D, float32
+    result : array, float32
         Result of adding const to elements in a, missing/bad values are
         indicated by 1.e37.
 
@@ -1892,10 +4260,10 @@ def add_by_cnst(a, const, **kwargs):
     1) No quality control is peformed in this routine.
 
     """
-    return _awips.add_by_cnst(a, const, **kwargs)
+    return _grid(_awips.add_by_cnst, (a, ), (const, ), out=out, **kwargs)
 
 
-def div_aray(a, b, **kwargs):
+def div_aray(a, b, out=None, **kwargs):
     """
     Divide two arrays element-by-element.
 
@@ -1904,17 +4272,23 @@ def div_aray(a, b, **kwargs):
 
     Parameters
     ----------
-    a : array_like, 2D
+    a : array_like
         Array holding numerators.
-    b : array_like, 2D
+    b : array_like
         Array holding denominators.
     ni : int, optional
         Number of rows to calculate division for, default is all rows.
         Rows beyond ni in will be zero filled.
+    out : array, optional
+        Array to store the result in, with the shape of the result.  Rows
+        beyond `ni` are left unchanged.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  NaN and masked input values are treated as missing.
 
     Returns
     -------
-    result : array, 2D, float32
+    result : array, float32
         Element by element division of a over b, missing/bad values and
         division by zero are inducated by 1.e37.
 
@@ -1923,4 +4297,847 @@ def div_aray(a, b, **kwargs):
     1) No quality control is peformed in this routine.
 
     """
-    return _awips.div_aray(a, b, **kwargs)
+    return _grid(_awips.div_aray, (a, b), out=out, **kwargs)
+
+
+def qdiverg(zmid, ztop, zbot, ptop, pbot, dx, dy, f, out=None, work=None,
+            missing='flag', **kwargs):
+    """
+    Calculate the Q-vector divergence at a pressure level.
+
+    Parameters
+    ----------
+    zmid : array_like, 2D
+        Heights of the level at which the Q-vector divergence is computed
+        (m above sea level).
+    ztop, zbot : array_like, 2D
+        Heights of the top and bottom of the layer centered on zmid (m above
+        sea level).  Must have the same shape as zmid.
+    ptop, pbot : float
+        Pressures corresponding to ztop and zbot (mb).
+    dx, dy : array_like, 2D
+        Grid spacing in the x and y directions (m).  Must have the same shape
+        as zmid.
+    f : array_like, 2D
+        Coriolis parameter (1/s).  Must have the same shape as zmid.
+    ni : int, optional
+        Number of rows to calculate the divergence for, default is all rows.
+    out : array, 2D, optional
+        Array to store the Q-vector divergence in.
+    work : sequence of 7 arrays, 2D, optional
+        Scratch arrays with the shape of zmid, reused between calls.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  Masked input values are treated as missing.
+
+    Returns
+    -------
+    qdiv : array, 2D, float32
+        Q-vector divergence, boundaries and bad/missing values are indicated
+        by 1.e37.
+
+    Notes
+    -----
+    1) No scaling of the output is done in this routine.
+
+    """
+    _check_kwargs('qdiverg', kwargs)
+    _check_missing(missing)
+    args = (zmid, ztop, zbot, dx, dy, f)
+    _check_copies(_awips.qdiverg, _with_out(args, out), stacklevel=3)
+    zmid, ztop, zbot, dx, dy, f = _filled(args)
+    kwargs.update(_work(_awips.qdiverg, ('w1', 'w2', 'w3', 'w4', 'w5', 'qx',
+                                         'qy'), work))
+    if out is not None:
+        kwargs['qdiv'] = out
+    return _missing_results(_result(_awips.qdiverg(
+        zmid, ztop, zbot, ptop, pbot, dx, dy, f, **kwargs), out), missing)
+
+
+def fndiverg(zmid, ztop, zbot, ptop, pbot, dx, dy, f, out=None, work=None,
+             missing='flag', **kwargs):
+    """
+    Calculate the divergence of the component of the Q-vector normal to the
+    isotherms for a layer.
+
+    Parameters
+    ----------
+    zmid : array_like, 2D
+        Heights of the middle of the layer (m above sea level).
+    ztop, zbot : array_like, 2D
+        Heights of the top and bottom of the layer (m above sea level).  Must
+        have the same shape as zmid.
+    ptop, pbot : float
+        Pressures corresponding to ztop and zbot (mb).
+    dx, dy : array_like, 2D
+        Grid spacing in the x and y directions (m).  Must have the same shape
+        as zmid.
+    f : array_like, 2D
+        Coriolis parameter (1/s).  Must have the same shape as zmid.
+    ni : int, optional
+        Number of rows to calculate the divergence for, default is all rows.
+    out : array, 2D, optional
+        Array to store the divergence in.
+    work : sequence of 7 arrays, 2D, optional
+        Scratch arrays with the shape of zmid, reused between calls.
+    missing : {'flag', 'nan', 'mask'}, optional
+        Return missing values as the 1e37 flag (default), as NaN or in a
+        masked array.  Masked input values are treated as missing.
+
+    Returns
+    -------
+    fndiv : array, 2D, float32
+        Fn vector divergence (K/m^2/s), boundaries and bad/missing values are
+        indicated by 1.e37.
+
+    Notes
+    -----
+    1) No scaling of the output is done in this routine.
+
+    """
+    _check_kwargs('fndiverg', kwargs)
+    _check_missing(missing)
+    args = (zmid, ztop, zbot, dx, dy, f)
+    _check_copies(_awips.fndiverg, _with_out(args, out), stacklevel=3)
+    zmid, ztop, zbot, dx, dy, f = _filled(args)
+    kwargs.update(_work(_awips.fndiverg, ('fnx', 'fny', 'w1', 'dtdx', 'dtdy',
+                                          'qx', 'qy'), work))
+    if out is not None:
+        kwargs['fndiv'] = out
+    return _missing_results(_result(_awips.fndiverg(
+        zmid, ztop, zbot, ptop, pbot, dx, dy, f, **kwargs), out), missing)
+
+
+# g2gkinematics choice of each product computed by kinematics.
+_KINEMATICS = {'vorticity': 1, 'divergence': 2, 'vorticity_advection': 3,
+               'q_divergence': 4, 'q_advection': 5, 'q_laplacian': 6,
+               'deformation': 9}
+
+
+def kinematics(u, v, spax, spay, products, q=None, out=None, missing='flag',
+               **kwargs):
+    """
+    Calculate several kinematic fields of a wind in one pass over the grid.
+
+    The centered differences of u and v are computed once at each point and
+    shared by all of the requested products, which are otherwise the same
+    as from the separate g2gkinematics calculations.
+
+    Parameters
+    ----------
+    u, v : array_like, 2D
+        Wind components, missing values are indicated by values > 1e36.
+    spax, spay : array_like, 2D
+        Grid spacing in the X and Y directions, same shape as u.
+    products : sequence of str
+        Products to calculate, any of:
+
+        * 'vorticity' -- vorticity plus q.
+        * 'divergence' -- divergence of the wind.
+        * 'vorticity_advection' -- advection of the vorticity plus q.
+        * 'q_divergence' -- divergence of q times the wind.
+        * 'q_advection' -- advection of q.
+        * 'q_laplacian' -- Laplacian of q.
+        * 'deformation' -- total deformation.
+
+    q : array_like, 2D, optional
+        Scalar field with the shape of u.  Fill with the coriolis parameter
+        for the absolute vorticity and its advection, the default of zeros
+        gives the relative vorticity.  Required for the other q products.
+    nx : int, optional
+        Number of rows to calculate, default is all rows.
+    out : array, 3D, optional
+        Fortran ordered float32 array of shape u.shape + (len(products), ) to
+        store the products in.
+    missing : {'flag', 'nan', 'mask'}, optional
+        How missing values are returned: the 1e37 flag, NaN or masked.
+
+    Returns
+    -------
+    fields : dict of arrays, 2D, float32
+        Each product keyed by its name, as views into one array.  Boundaries
+        and bad/missing values are indicated by 1e37.
+
+    Examples
+    --------
+    >>> import aoslib
+    >>> u = [[0., 0., 0.], [10., 10., 10.], [20., 20., 20.]]
+    >>> v = [[0., 5., 10.], [0., 5., 10.], [0., 5., 10.]]
+    >>> dx = dy = [[1.e4, 1.e4, 1.e4]] * 3
+    >>> f = aoslib.kinematics(u, v, dx, dy, ['vorticity', 'divergence'])
+    >>> round(float(f['divergence'][1, 1]), 6), float(f['vorticity'][1, 1])
+    (0.0015, 0.0)
+
+    """
+    products = list(products)
+    for name in products:
+        if name not in _KINEMATICS:
+            raise ValueError('unknown kinematics product %r' % (name, ))
+    if len(set(products)) != len(products):
+        raise ValueError('products must not be repeated')
+    uses_q = set(['q_divergence', 'q_advection', 'q_laplacian'])
+    if q is None:
+        if uses_q.intersection(products):
+            raise ValueError('q is required for the q products')
+        q = np.zeros(np.shape(u), dtype=np.float32, order='F')
+    choices = np.array([_KINEMATICS[name] for name in products],
+                       dtype=np.int32)
+    arrays = _filled((u, v, q, spax, spay))
+    _check_copies(_awips.g2gkinmulti, _with_out(arrays, out), stacklevel=3)
+    shape = arrays[0].shape + (len(choices), )
+    if out is None:
+        kwargs['scalars'] = np.zeros(shape, dtype=np.float32, order='F')
+    elif out.shape != shape:
+        raise ValueError('out must have shape %r' % (shape, ))
+    else:
+        kwargs['scalars'] = out
+    result = _tiled(_awips.g2gkinmulti, arrays, (choices, ), kwargs,
+                    'scalars', halo=1, missing=missing)
+    result = _result(result, out)
+    return dict([(name, result[:, :, k]) for k, name in enumerate(products)])
+
+
+_MOISTURE = {'dewpoint': 1, 'dewpoint_depression': 2, 'mixing_ratio': 3,
+             'specific_humidity': 4, 'virtual_temperature': 5, 'thetae': 6,
+             'condensation_pressure': 7, 'condensation_pressure_deficit': 8,
+             'wetbulb': 9}
+
+
+def moisture(p, t, rh, products, out=None, iterations=None, missing='flag',
+             **kwargs):
+    """
+    Calculate several humidity fields from pressure, temperature and
+    relative humidity in one pass over the grid.
+
+    The dewpoint and saturation vapor pressure are computed once at each
+    point and shared by all of the requested products, which are otherwise
+    the same as from the separate routines to within rounding.
+
+    Parameters
+    ----------
+    p : array_like, 2D
+        Pressure (mb).
+    t : array_like, 2D
+        Temperature (K).
+    rh : array_like, 2D
+        Relative humidity (range 0 - 100).  p, t and rh are broadcast
+        against each other.
+    products : sequence of str
+        Products to calculate, any of:
+
+        * 'dewpoint' -- dewpoint (K), as calctd.
+        * 'dewpoint_depression' -- dewpoint depression (K), as calcdpd.
+        * 'mixing_ratio' -- mixing ratio (g/kg), as mixrat.
+        * 'specific_humidity' -- specific humidity (g/kg), as spechum.
+        * 'virtual_temperature' -- virtual temperature (K), as calctv.
+        * 'thetae' -- equivalent potential temperature (K), as calcthetae.
+        * 'condensation_pressure' -- condensation pressure (mb), as
+          calccondpr.
+        * 'condensation_pressure_deficit' -- condensation pressure deficit
+          (mb), as calccondprdef.
+        * 'wetbulb' -- wet-bulb temperature (K), as calctw.
+
+    iterations : int, optional
+        Number of Newton steps of the wet-bulb temperature, or 0 to iterate
+        each point until it converges.  By default the setting of
+        `set_wetbulb_iterations`.
+    ni : int, optional
+        Number of rows to calculate, default is all rows.
+    out : array, 3D, optional
+        Fortran ordered float32 array of shape p.shape + (len(products), )
+        to store the products in.
+    missing : {'flag', 'nan', 'mask'}, optional
+        How missing values are returned: the 1e37 flag, NaN or masked.
+
+    Returns
+    -------
+    fields : dict of arrays, 2D, float32
+        Each product keyed by its name, as views into one array.  Values >
+        99998.0 in the inputs give the flag value 1e37, except that the
+        dewpoint and dewpoint depression do not depend on p.
+
+    Examples
+    --------
+    >>> import aoslib
+    >>> f = aoslib.moisture([[1000., 850.]], [[300., 290.]], [[50., 80.]],
+    ...                     ['dewpoint', 'mixing_ratio'])
+    >>> round(float(f['dewpoint'][0, 0]), 2)
+    288.7
+    >>> round(float(f['mixing_ratio'][0, 0]), 2)
+    11.19
+
+    """
+    products = list(products)
+    for name in products:
+        if name not in _MOISTURE:
+            raise ValueError('unknown moisture product %r' % (name, ))
+    if len(set(products)) != len(products):
+        raise ValueError('products must not be repeated')
+    if iterations is None:
+        iterations = _wetbulb_settings['iterations']
+    choices = np.array([_MOISTURE[name] for name in products],
+                       dtype=np.int32)
+    arrays = list(np.broadcast_arrays(*_filled((p, t, rh))))
+    if arrays[0].ndim != 2:
+        raise ValueError('p, t and rh must be 2D')
+    _check_copies(_awips.moistmulti, _with_out(arrays, out), stacklevel=3)
+    shape = arrays[0].shape + (len(choices), )
+    if out is None:
+        kwargs['scalars'] = np.zeros(shape, dtype=np.float32, order='F')
+    elif out.shape != shape:
+        raise ValueError('out must have shape %r' % (shape, ))
+    else:
+        kwargs['scalars'] = out
+    result = _tiled(_awips.moistmulti, arrays, (choices, iterations), kwargs,
+                    'scalars', missing=missing)
+    result = _result(result, out)
+    return dict([(name, result[:, :, k]) for k, name in enumerate(products)])
+
+
+def isentropic(p, t, u, v, z, theta, out=None, missing='flag', **kwargs):
+    """
+    Interpolate temperature, wind and height fields on pressure levels to
+    surfaces of constant potential temperature.
+
+    The potential temperature of each column is computed once and each
+    surface bracketed by the lowest pair of adjacent levels it lies
+    between.  The pressure, winds and height are all interpolated with the
+    weight of that bracket, linearly in potential temperature and for the
+    pressure in log(p).
+
+    Parameters
+    ----------
+    p : array_like, 1D
+        Pressure (mb) of each level, in either order.
+    t : array_like, 3D
+        Temperature (K) of shape (nlev, ny, nx).
+    u, v : array_like, 3D
+        Wind components, same shape as t.
+    z : array_like, 3D
+        Height, same shape as t.
+    theta : array_like, 1D
+        Potential temperature (K) of each surface.
+    ni : int, optional
+        Number of points along the last axis to calculate, default is all.
+    out : array, 4D, optional
+        C ordered float32 array of shape (4, len(theta), ny, nx) to store
+        the pressure, winds and height in.
+    missing : {'flag', 'nan', 'mask'}, optional
+        How missing values are returned: the 1e37 flag, NaN or masked.
+
+    Returns
+    -------
+    fields : dict of arrays, 3D, float32
+        The pressure (mb) 'p', winds 'u' and 'v' and height 'z' of shape
+        (len(theta), ny, nx) on each surface, as views into one array.
+        Surfaces below or above a column and values interpolated from
+        missing input (> 99998.0, NaN or masked) are indicated by 1e37.
+
+    Notes
+    -----
+    C ordered float32 input is passed to the compiled routine without
+    copies, its transpose being in the Fortran order of the routine.
+
+    Examples
+    --------
+    >>> import aoslib
+    >>> import numpy as np
+    >>> t = np.array([300., 290., 280.]).reshape(3, 1, 1)
+    >>> z = np.array([100., 1500., 3000.]).reshape(3, 1, 1)
+    >>> f = aoslib.isentropic([1000., 850., 700.], t, 0. * t + 10.,
+    ...                       0. * t + 5., z, [300., 305.])
+    >>> f['p'].shape
+    (2, 1, 1)
+    >>> [round(float(x), 1) for x in f['p'][:, 0, 0]]
+    [1000.0, 818.9]
+    >>> [round(float(x), 1) for x in f['z'][:, 0, 0]]
+    [100.0, 1787.6]
+
+    """
+    p = np.asarray(p, dtype=np.float32)
+    theta = np.asarray(theta, dtype=np.float32)
+    if theta.ndim != 1:
+        raise ValueError('theta must be 1D')
+    arrays = _filled((t, u, v, z))
+    shape = arrays[0].shape
+    if len(shape) != 3:
+        raise ValueError('t must be 3D')
+    for a in arrays[1:]:
+        if a.shape != shape:
+            raise ValueError('u, v and z must have the shape of t')
+    if p.shape != shape[:1]:
+        raise ValueError('p must have one pressure per level of t')
+    arrays = [a.T for a in arrays]
+    outshape = (4, len(theta)) + shape[1:]
+    if out is not None and out.shape != outshape:
+        raise ValueError('out must have shape %r' % (outshape, ))
+    _check_copies(_awips.isentrans,
+                  _with_out(arrays, None if out is None else out.T),
+                  stacklevel=3)
+    if out is None:
+        kwargs['isen'] = np.zeros(outshape[::-1], dtype=np.float32,
+                                  order='F')
+    else:
+        kwargs['isen'] = out.T
+    result = _tiled(_awips.isentrans, arrays, (p, theta), kwargs, 'isen',
+                    missing=missing)
+    result = _result(result, None if out is None else out.T).T
+    return dict([(name, result[k]) for k, name in enumerate('puvz')])
+
+# Position of each QG product computed by qgprods.
+_QG_PRODUCTS = {'qx': 1, 'qy': 2, 'qdiv': 3, 'qnx': 4, 'qny': 5, 'qndiv': 6,
+                'qsx': 7, 'qsy': 8, 'qsdiv': 9, 'frontogenesis': 10}
+
+
+class QGGradients(object):
+    """
+    Geostrophic wind and temperature gradients and Q vector of a layer or
+    level, computed once by `qg_layer` or `qg_level` and reused by each
+    `qg_diagnostics` call.
+
+    Attributes
+    ----------
+    dugdx, dugdy, dvgdx, dvgdy : array, 2D, float32
+        d/dx and d/dy of the u and v components of geostrophic wind.
+    dtdx, dtdy : array, 2D, float32
+        d/dx and d/dy of the temperature, scaled as in the Q vector.
+    qx, qy : array, 2D, float32
+        Q vector components.
+    grads : array, 3D, float32
+        The arrays above stacked along the last axis, in that order.
+
+    """
+    names = ('dugdx', 'dugdy', 'dvgdx', 'dvgdy', 'dtdx', 'dtdy', 'qx', 'qy')
+
+    def __init__(self, grads, dx, dy, f, fscale, ni=None):
+        self.grads = grads
+        self.dx, self.dy, self.f = dx, dy, f
+        self.fscale = fscale
+        self.ni = ni
+        for k, name in enumerate(self.names):
+            setattr(self, name, grads[:, :, k])
+
+
+def _qg_gradients(func, arrays, extra, dx, dy, f, fscale, kwargs):
+    """
+    QGGradients from the qglayer or qglevel routine `func` called on
+    `arrays` and `extra` with the grid spacing and coriolis parameter.
+    """
+    _check_copies(func, list(arrays) + [dx, dy, f], stacklevel=4)
+    # The spacing and coriolis arrays are kept for qgprods, so convert them
+    # once here rather than on every qg_diagnostics call.
+    dx, dy, f = [np.asfortranarray(a, dtype=np.float32) for a in (dx, dy, f)]
+    arrays = [np.asarray(a) for a in arrays]
+    shape = arrays[0].shape + (8, )
+    kwargs['grads'] = np.zeros(shape, dtype=np.float32, order='F')
+
+    def grads(*args, **kw):
+        n = len(arrays)
+        return func(*(args[:n] + tuple(extra) + args[n:]), **kw)
+
+    # Each smoothing pass set by setqsmooth widens the stencil by a point.
+    halo = 1 + max(int(_awips.qsmthcmn.passes), 0)
+    result = _tiled(grads, arrays + [dx, dy, f], (), kwargs, 'grads',
+                    halo=halo, worknames=('zmid', ))
+    return QGGradients(result, dx, dy, f, fscale, kwargs.get('ni'))
+
+
+def qg_layer(ztop, zbot, ptop, pbot, dx, dy, f, **kwargs):
+    """
+    Calculate the geostrophic and thermal gradients of a layer for
+    `qg_diagnostics`.
+
+    The gradients are those of qvector, as used by qdiverg, fndiverg,
+    fsdiverg and frontogen, computed once so that any of their products can
+    be derived from them.
+
+    Parameters
+    ----------
+    ztop, zbot : array_like, 2D
+        Heights of the top and bottom of the layer (m above sea level).
+    ptop, pbot : float
+        Pressures corresponding to ztop and zbot (mb).
+    dx, dy : array_like, 2D
+        Grid spacing in the x and y directions (m).  Must have the same shape
+        as ztop.
+    f : array_like, 2D
+        Coriolis parameter (1/s).  Must have the same shape as ztop.
+    ni : int, optional
+        Number of rows to calculate the gradients for, default is all rows.
+
+    Returns
+    -------
+    gradients : QGGradients
+        The gradients and Q vector of the middle of the layer.
+
+    """
+    return _qg_gradients(_awips.qglayer, (ztop, zbot), (ptop, pbot), dx, dy,
+                         f, 2., kwargs)
+
+
+def qg_level(z, t, p, dx, dy, f, **kwargs):
+    """
+    Calculate the geostrophic and thermal gradients of a single level for
+    `qg_diagnostics`.
+
+    The gradients are those of slqvect, as used by slqdiv and slfront,
+    computed once so that any of their products can be derived from them.
+
+    Parameters
+    ----------
+    z : array_like, 2D
+        Height field for the level (m).
+    t : array_like, 2D
+        Temperature field for the level (K), same shape as z.
+    p : float
+        Pressure of the level (mb).
+    dx, dy : array_like, 2D
+        Grid spacing in the x and y directions (m), same shape as z.
+    f : array_like, 2D
+        Coriolis parameter (1/s), same shape as z.
+    ni : int, optional
+        Number of rows to calculate the gradients for, default is all rows.
+
+    Returns
+    -------
+    gradients : QGGradients
+        The gradients and Q vector of the level.
+
+    """
+    fscale = 2 * (np.float32(1000.) / np.float32(p)) ** np.float32(0.286)
+    return _qg_gradients(_awips.qglevel, (z, t), (p, ), dx, dy, f, fscale,
+                         kwargs)
+
+
+def qg_diagnostics(gradients, products, out=None, missing='flag'):
+    """
+    Calculate QG products from the gradients of a layer or level.
+
+    The gradients are not computed again, so any number of calls with the
+    same `gradients` only pay for the products they ask for.
+
+    Parameters
+    ----------
+    gradients : QGGradients
+        Result of `qg_layer` or `qg_level`.
+    products : sequence of str
+        Products to calculate, any of:
+
+        * 'qx', 'qy' -- Q vector components.
+        * 'qdiv' -- Q vector divergence, as qdiverg or slqdiv.
+        * 'qnx', 'qny' -- components of Q normal to the isotherms.
+        * 'qndiv' -- divergence of Qn, as fndiverg.
+        * 'qsx', 'qsy' -- components of Q along the isotherms.
+        * 'qsdiv' -- divergence of Qs, as fsdiverg.
+        * 'frontogenesis' -- QG frontogenesis, as frontogen or slfront.
+
+    out : array, 3D, optional
+        Fortran ordered float32 array of shape gradients.qx.shape +
+        (len(products), ) to store the products in.
+    missing : {'flag', 'nan', 'mask'}, optional
+        How missing values are returned: the 1e37 flag, NaN or masked.
+
+    Returns
+    -------
+    fields : dict of arrays, 2D, float32
+        Each product keyed by its name, as views into one array.  Boundaries
+        and bad/missing values are indicated by 1e37.
+
+    Examples
+    --------
+    >>> import aoslib
+    >>> import numpy as np
+    >>> i, j = np.mgrid[0:6, 0:5] * 4.e4
+    >>> z300 = 9000. + 50. * np.sin(i / 8.e5) * np.cos(j / 6.e5)
+    >>> z700 = 3000. + 30. * np.sin(i / 5.e5 + 1.) * np.cos(j / 9.e5)
+    >>> dx = dy = np.ones((6, 5)) * 4.e4
+    >>> f = np.ones((6, 5)) * 1.e-4
+    >>> g = aoslib.qg_layer(z300, z700, 300., 700., dx, dy, f)
+    >>> fields = aoslib.qg_diagnostics(g, ['qdiv', 'qndiv', 'frontogenesis'])
+    >>> sorted(fields)
+    ['frontogenesis', 'qdiv', 'qndiv']
+    >>> qdiv = aoslib.qdiverg(0. * z300, z300, z700, 300., 700., dx, dy, f)
+    >>> np.array_equal(fields['qdiv'], qdiv)
+    True
+
+    """
+    products = list(products)
+    for name in products:
+        if name not in _QG_PRODUCTS:
+            raise ValueError('unknown QG product %r' % (name, ))
+    if len(set(products)) != len(products):
+        raise ValueError('products must not be repeated')
+    choices = np.array([_QG_PRODUCTS[name] for name in products],
+                       dtype=np.int32)
+    shape = gradients.grads.shape[:2] + (len(choices), )
+    kwargs = {}
+    if gradients.ni is not None:
+        kwargs['ni'] = gradients.ni
+    if out is None:
+        kwargs['prods'] = np.zeros(shape, dtype=np.float32, order='F')
+    elif out.shape != shape:
+        raise ValueError('out must have shape %r' % (shape, ))
+    else:
+        _check_copies(_awips.qgprods, [out], stacklevel=3)
+        kwargs['prods'] = out
+    result = _tiled(_awips.qgprods, [gradients.grads, gradients.dx,
+                                     gradients.dy, gradients.f],
+                    (gradients.fscale, choices), kwargs, 'prods', halo=1,
+                    worknames=('vx', 'vy'), missing=missing)
+    result = _result(result, out)
+    return dict([(name, result[:, :, k]) for k, name in enumerate(products)])
+
+
+class VerticalPlan(object):
+    """
+    Bracketing indices and log(p) weights interpolating columns on the
+    pressures given to `vertical_plan` to its levels, applied to any
+    number of fields by `vertical_interp`.
+
+    Attributes
+    ----------
+    kidx : array, 2D, int32
+        Index (from 1) along the columns of the first pressure of the pair
+        bracketing each level, 0 where the level is not bracketed, of shape
+        (ncol, len(levels)).
+    wgt : array, 2D, float32
+        Weight of the second pressure of each pair, same shape as kidx.
+    levels : array, 1D, float32
+        Pressure (mb) of the levels interpolated to.
+    shape : tuple
+        Shape of the fields the plan applies to.
+    batch : bool
+        Whether the fields are batches of soundings, (ncol, nlev), rather
+        than (nlev, ...) arrays.
+
+    """
+
+    def __init__(self, kidx, wgt, levels, shape, batch):
+        self.kidx = kidx
+        self.wgt = wgt
+        self.levels = levels
+        self.shape = shape
+        self.batch = batch
+
+
+def vertical_plan(p, levels, batch=False, nlvls=None):
+    """
+    Find the pressures bracketing each level in every column, to
+    interpolate fields on those pressures to the levels with
+    `vertical_interp`.
+
+    Parameters
+    ----------
+    p : array_like
+        Pressure (mb) of shape (nlev, ...), for example the (nlev, ny, nx)
+        pressure of model levels, or of shape (ncol, nlev) or (nlev, ) with
+        `batch`.  The levels of each column can be in either order and
+        values > 99998.0 or NaN are missing.
+    levels : array_like, 1D
+        Pressure (mb) of each level to interpolate to.
+    batch : bool, optional
+        Whether p is a batch of soundings as for the ``*_batch`` routines.
+    nlvls : int or array_like, 1D (ncol), optional
+        With `batch`, the number of valid levels of each sounding, default
+        is all levels.
+
+    Returns
+    -------
+    plan : VerticalPlan
+        The plan for `vertical_interp`.
+
+    Notes
+    -----
+    Fields are interpolated linearly in log(p), as pvalue does, between the
+    first pair of adjacent pressures of a column bracketing each level.
+    Levels outside the pressures of a column are not bracketed.
+
+    Examples
+    --------
+    >>> import aoslib
+    >>> import numpy as np
+    >>> p = np.array([1000., 850., 700.]).reshape(3, 1, 1) - [[0., 50.]]
+    >>> t = np.array([20., 10., 0.]).reshape(3, 1, 1) - [[0., 2.]]
+    >>> plan = aoslib.vertical_plan(p, [900., 750.])
+    >>> t, u = aoslib.vertical_interp(plan, [t, 0. * t + 10.])
+    >>> t.shape
+    (2, 1, 2)
+    >>> [round(float(x), 2) for x in t[:, 0, 0]]
+    [13.52, 3.55]
+
+    """
+    levels = np.asarray(levels, dtype=np.float32).reshape(-1)
+    if batch:
+        shape = np.shape(p)
+        cols = _soundings(p)
+        nlvls = _nlvls(nlvls, cols)
+        kidx, wgt = _awips.viplan(cols[0], 1, nlvls, levels)
+    else:
+        if nlvls is not None:
+            raise ValueError('nlvls can only be used with batch=True')
+        p = np.asarray(p)
+        shape = p.shape
+        if not p.ndim:
+            raise ValueError('p must have at least one dimension')
+        cols = p.reshape(shape[0], -1).T
+        kidx, wgt = _awips.viplan(cols, 0, np.zeros(cols.shape[0],
+                                                     dtype=np.int32) +
+                                  shape[0], levels)
+    return VerticalPlan(kidx, wgt, levels, shape, batch)
+
+
+def _vertical_field(plan, a, missing):
+    """ Interpolate one field to the levels of `plan`. """
+    a = _filled((a, ))[0]
+    if a.shape != plan.shape:
+        raise ValueError('fields must have shape %r, not %r' %
+                         (plan.shape, a.shape))
+    nt = len(plan.levels)
+    if plan.batch:
+        cols = _soundings(a)[0]
+        out = np.zeros((nt, cols.shape[1]), dtype=np.float32, order='F')
+        lfirst = 1
+    else:
+        cols = a.reshape(a.shape[0], -1).T
+        _check_copies(_awips.viapply, [cols], stacklevel=5)
+        out = np.zeros((cols.shape[0], nt), dtype=np.float32, order='F')
+        lfirst = 0
+    result = _awips.viapply(cols, lfirst, plan.kidx, plan.wgt, out).T
+    if plan.batch:
+        if len(plan.shape) == 1:
+            result = result[0]
+    else:
+        result = result.reshape((nt, ) + plan.shape[1:])
+    mask = _mask(result, missing)
+    _mark_missing(result, missing, mask)
+    return _masked(result, mask)
+
+
+def vertical_interp(plan, fields, missing='flag'):
+    """
+    Interpolate fields to the levels of a plan from `vertical_plan`.
+
+    Parameters
+    ----------
+    plan : VerticalPlan
+        Plan made for the pressures of the fields.
+    fields : array_like or sequence of array_like
+        A field, or a list or tuple of fields, with the shape of the
+        pressures of the plan.  A list or tuple whose items have the shape
+        of a column, or of a level, of the plan is a single field, so that
+        a sounding can be given as a list of values.  Values > 99998.0, NaN
+        or masked are missing.
+    missing : {'flag', 'nan', 'mask'}, optional
+        How missing values are returned: the 1e37 flag, NaN or masked.
+
+    Returns
+    -------
+    result : array, float32, or list of arrays
+        Each field on the levels, of shape (len(levels), ...) for (nlev,
+        ...) fields and (ncol, len(levels)) or (len(levels), ) for batches.
+        Levels outside the pressures of a column, or between missing
+        values, are indicated by 1e37.
+
+    Notes
+    -----
+    Several fields are interpolated by the threads set with `set_workers`.
+
+    Examples
+    --------
+    >>> import aoslib
+    >>> import numpy as np
+    >>> p = [[1000., 850., 700.], [950., 800., 600.]]
+    >>> plan = aoslib.vertical_plan(p, [850., 700.], batch=True)
+    >>> t = np.array([[20., 10., 0.], [15., 5., -5.]])
+    >>> t850, t700 = aoslib.vertical_interp(plan, t).T
+    >>> [round(float(x), 2) for x in t850]
+    [10.0, 8.53]
+
+    """
+    if (not isinstance(fields, (list, tuple)) or
+            (len(fields) and np.shape(fields[0]) == plan.shape[1:])):
+        return _vertical_field(plan, fields, missing)
+    results = [None] * len(fields)
+
+    def field(k):
+        results[k] = _vertical_field(plan, fields[k], missing)
+
+    if _parallel_settings['workers'] > 1 and len(fields) > 1:
+        _run([lambda k=k: field(k) for k in range(len(fields))])
+    else:
+        for k in range(len(fields)):
+            field(k)
+    return results
+
+
+def contour(a, levels, badlo=99998., badhi=None):
+    """
+    Calculate contour lines of a grid.
+
+    All of the levels are found in one pass over the grid, there is no limit
+    on their number and the output is sized to fit.  Unlike fortconbuf no
+    state is kept between calls, so grids can be contoured from several
+    threads at once.
+
+    Parameters
+    ----------
+    a : array_like, 2D
+        Grid to contour.  NaN and masked values are missing.
+    levels : array_like, 1D
+        Contour values, in any order.
+    badlo, badhi : float, optional
+        Smallest and largest values which are missing, by default values of
+        99998 and above.  With badlo None only NaN and masked values are
+        missing.
+
+    Returns
+    -------
+    lines : list of lists of arrays
+        For each of the levels, its lines as float32 arrays of shape (n, 2)
+        of positions along the first and second dimensions of `a`, zero
+        based.  Lines keep the higher values on their right and closed lines
+        end with their first point.  Lines stop at the edges of the grid and
+        at cells with missing corners.
+
+    Examples
+    --------
+    >>> import aoslib
+    >>> import numpy as np
+    >>> a = np.hypot(*np.mgrid[-5:6, -5:6])
+    >>> lines = aoslib.contour(a, [2.5, 4.5])
+    >>> len(lines[0]), lines[0][0].shape
+    (1, (21, 2))
+
+    """
+    if np.ma.isMaskedArray(a):
+        a = np.ma.filled(a.astype(np.float32), np.nan)
+    a = np.asarray(a)
+    if a.ndim != 2:
+        raise ValueError('a must be 2D')
+    if badlo is None:
+        badlo, badhi = 1., 0.
+    elif badhi is None:
+        badhi = np.finfo(np.float32).max
+    levels = np.asarray(levels, dtype=np.float32).ravel()
+    values, index = np.unique(levels, return_inverse=True)
+    _check_copies(_awips.contcount, [a], stacklevel=3)
+    a = np.asfortranarray(a, dtype=np.float32)
+    lix, off, ncross = _awips.contcount(a, values, badlo, badhi)
+    xy, npt, start, level, nln = _awips.conttrace(a, values, lix, off,
+                                                  ncross)
+    if nln < 0:
+        raise RuntimeError('contour buffers overflowed')
+    points = xy.T
+    ends = list(start[1:nln] - 1) + [npt]
+    found = [[] for v in values]
+    for k in range(nln):
+        found[level[k] - 1].append(points[start[k] - 1:ends[k]])
+    return [list(found[k]) for k in index]
+
+
+# Record the calls of the routines while set_instrumentation is on.
+for _name, _func in list(globals().items()):
+    if (not _name.startswith('_') and callable(_func) and
+            getattr(_func, '__module__', None) == __name__ and
+            _name not in _SETTINGS and not isinstance(_func, type)):
+        globals()[_name] = _instrumented(_func)
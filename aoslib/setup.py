@@ -25,6 +25,7 @@ def configuration(parent_package='', top_path=None):
     config.add_extension(
         '_awips',
         sources=['_awips.pyf', f_files, c_files],
+        libraries=['pthread'],  # pthread_once in temp_of_te.c
         #extra_f77_compile_args = ['-fno-range-check'],  # See below
     )
 
@@ -7,16 +7,29 @@
    put a fudge factor into L/cp to get agreement of moist adiabats
    with a published thermodynamic diagram */
 
+/* The saturation vapor pressure comes from the table set up by
+   SetEsatLut (esatlut.f) when one is in use.  Only the number of table
+   points, the first member of its COMMON block, is declared here. */
+extern struct { int nlut; } esltcm_;
+extern float eslut_(float * k);
+
+static float esat_k(float * temp)
+    {
+    if (esltcm_.nlut > 0)
+        return eslut_(temp);
+    return exp(26.660820-0.0091379024*(*temp)-6106.396/(*temp));
+    }
+
 float FTN_MANGLE (adiabatic_te_) (float * temp, float * press)
     {
-    float e = exp(26.660820-0.0091379024*(*temp)-6106.396/(*temp));
+    float e = esat_k(temp);
     e = 0.622*e/(*press-e);
     return *temp*exp(2740.0*e/(*temp));
     }
 
 float FTN_MANGLE (adiabatic_te) (float * temp, float * press)
     {
-    float e = exp(26.660820-0.0091379024*(*temp)-6106.396/(*temp));
+    float e = esat_k(temp);
     e = 0.622*e/(*press-e);
     return *temp*exp(2740.0*e/(*temp));
     }
@@ -0,0 +1,353 @@
+      SUBROUTINE FRZLEVB(ELEV,P,HT,T,MNLVLS,NCOL,NLVLS,PFRZ,HFRZ)
+      IMPLICIT NONE
+C
+C Statement of purpose.
+C ---------------------
+C Batch versions of the sounding routines FRZLEV, CCLPAR, LCLPAR, TOTALS,
+C SWEAT, GUSTS, CALCHELICITY, AVWIND, RICHNO and EQP.  Each routine in
+C this file calls the single sounding routine for every column of a batch
+C of soundings, so that a whole batch is processed in one call.
+C
+C Except in EQPB, the soundings are held as in CAPECIN: P(K,ICOL) is
+C level K of sounding ICOL, MNLVLS (or MNW for the wind levels) is the
+C first dimension of the arrays and NLVLS(ICOL) (or NW(ICOL)) the number
+C of valid levels of each sounding.  Scalar inputs of the single sounding
+C routines are arrays of one value per sounding.
+C
+C User notes:
+C -----------
+C 1) The outputs of each sounding are those of the single sounding
+C    routine, which sets the outputs it cannot find to the flag value
+C    99999.  Outputs it leaves unset are also set to 99999.
+C 2) Soundings with fewer than two valid levels, or more valid levels
+C    than the first dimension of the arrays, have all outputs set to the
+C    flag value 1e37 (99999 for the integer output of GUSTSB).
+C
+C FRZLEVB: pressure (mb) and height (m asl) of the freezing level, see
+C FRZLEV.
+C
+      INTEGER MNLVLS,NCOL,NLVLS(NCOL)
+      REAL ELEV(NCOL),P(MNLVLS,NCOL),HT(MNLVLS,NCOL),T(MNLVLS,NCOL)
+      REAL PFRZ(NCOL),HFRZ(NCOL)
+      INTEGER ICOL,N
+      REAL BAD
+      PARAMETER (BAD=1E37)
+C
+      DO 100 ICOL=1,NCOL
+         N=NLVLS(ICOL)
+         PFRZ(ICOL)=BAD
+         HFRZ(ICOL)=BAD
+         IF (N.LT.2 .OR. N.GT.MNLVLS) GO TO 100
+         CALL FRZLEV(ELEV(ICOL),P(1,ICOL),HT(1,ICOL),T(1,ICOL),N,
+     +               PFRZ(ICOL),HFRZ(ICOL))
+ 100  CONTINUE
+      RETURN
+      END
+
+
+      SUBROUTINE CCLPARB(MIX,P,HT,T,MNLVLS,NCOL,NLVLS,PCCL,TCCL,HCCL)
+      IMPLICIT NONE
+C
+C Pressure (mb), temperature (K) and height (m asl) of the convective
+C condensation level of each sounding for the mixing ratio MIX (g/kg),
+C see CCLPAR.
+C
+      INTEGER MNLVLS,NCOL,NLVLS(NCOL)
+      REAL MIX(NCOL),P(MNLVLS,NCOL),HT(MNLVLS,NCOL),T(MNLVLS,NCOL)
+      REAL PCCL(NCOL),TCCL(NCOL),HCCL(NCOL)
+      INTEGER ICOL,N
+      REAL BAD
+      PARAMETER (BAD=1E37)
+C
+      DO 100 ICOL=1,NCOL
+         N=NLVLS(ICOL)
+         PCCL(ICOL)=BAD
+         TCCL(ICOL)=BAD
+         HCCL(ICOL)=BAD
+         IF (N.LT.2 .OR. N.GT.MNLVLS) GO TO 100
+         CALL CCLPAR(MIX(ICOL),P(1,ICOL),HT(1,ICOL),T(1,ICOL),N,
+     +               PCCL(ICOL),TCCL(ICOL),HCCL(ICOL))
+ 100  CONTINUE
+      RETURN
+      END
+
+
+      SUBROUTINE LCLPARB(MEANMIX,TS,P,HT,T,TD,MNLVLS,NCOL,NLVLS,
+     +                   PLCL,TLCL,HLCL)
+      IMPLICIT NONE
+C
+C Pressure (mb), temperature (K) and height (m asl) of the lifting
+C condensation level of each sounding for the mixing ratio MEANMIX and
+C the surface temperature TS (K), see LCLPAR.
+C
+      INTEGER MNLVLS,NCOL,NLVLS(NCOL)
+      REAL MEANMIX(NCOL),TS(NCOL),P(MNLVLS,NCOL),HT(MNLVLS,NCOL)
+      REAL T(MNLVLS,NCOL),TD(MNLVLS,NCOL)
+      REAL PLCL(NCOL),TLCL(NCOL),HLCL(NCOL)
+      INTEGER ICOL,N
+      REAL BAD
+      PARAMETER (BAD=1E37)
+C
+      DO 100 ICOL=1,NCOL
+         N=NLVLS(ICOL)
+         PLCL(ICOL)=BAD
+         TLCL(ICOL)=BAD
+         HLCL(ICOL)=BAD
+         IF (N.LT.2 .OR. N.GT.MNLVLS) GO TO 100
+         CALL LCLPAR(MEANMIX(ICOL),TS(ICOL),P(1,ICOL),HT(1,ICOL),
+     +               T(1,ICOL),TD(1,ICOL),N,PLCL(ICOL),TLCL(ICOL),
+     +               HLCL(ICOL))
+ 100  CONTINUE
+      RETURN
+      END
+
+
+      SUBROUTINE TOTALSB(P,T,TD,MNLVLS,NCOL,NLVLS,TOTIDX,CRSTOT,VERTOT)
+      IMPLICIT NONE
+C
+C Total totals, cross totals and vertical totals indices of each
+C sounding, see TOTALS.
+C
+      INTEGER MNLVLS,NCOL,NLVLS(NCOL)
+      REAL P(MNLVLS,NCOL),T(MNLVLS,NCOL),TD(MNLVLS,NCOL)
+      REAL TOTIDX(NCOL),CRSTOT(NCOL),VERTOT(NCOL)
+      INTEGER ICOL,N
+      REAL BAD
+      PARAMETER (BAD=1E37)
+C
+      DO 100 ICOL=1,NCOL
+         N=NLVLS(ICOL)
+         TOTIDX(ICOL)=BAD
+         CRSTOT(ICOL)=BAD
+         VERTOT(ICOL)=BAD
+         IF (N.LT.2 .OR. N.GT.MNLVLS) GO TO 100
+         CALL TOTALS(P(1,ICOL),T(1,ICOL),TD(1,ICOL),N,
+     +               TOTIDX(ICOL),CRSTOT(ICOL),VERTOT(ICOL))
+ 100  CONTINUE
+      RETURN
+      END
+
+
+      SUBROUTINE SWEATB(P,T,TD,MNLVLS,NCOL,NLVLS,PW,UW,VW,MNW,NW,SWIDX)
+      IMPLICIT NONE
+C
+C Severe weather threat index of each sounding, from its temperatures
+C and dewpoints (K) at the pressures P (mb) and its wind components
+C (m/s) at the pressures PW (mb), see SWEAT.
+C
+      INTEGER MNLVLS,NCOL,NLVLS(NCOL),MNW,NW(NCOL)
+      REAL P(MNLVLS,NCOL),T(MNLVLS,NCOL),TD(MNLVLS,NCOL)
+      REAL PW(MNW,NCOL),UW(MNW,NCOL),VW(MNW,NCOL)
+      REAL SWIDX(NCOL)
+      INTEGER ICOL,N,M
+      REAL BAD
+      PARAMETER (BAD=1E37)
+C
+      DO 100 ICOL=1,NCOL
+         N=NLVLS(ICOL)
+         M=NW(ICOL)
+         SWIDX(ICOL)=BAD
+         IF (N.LT.2 .OR. N.GT.MNLVLS .OR. M.LT.2 .OR. M.GT.MNW)
+     +      GO TO 100
+         CALL SWEAT(P(1,ICOL),T(1,ICOL),TD(1,ICOL),N,
+     +              PW(1,ICOL),UW(1,ICOL),VW(1,ICOL),M,SWIDX(ICOL))
+ 100  CONTINUE
+      RETURN
+      END
+
+
+      SUBROUTINE GUSTSB(P,T,TD,MNLVLS,NCOL,NLVLS,GSTPOT)
+      IMPLICIT NONE
+C
+C Gust potential (0-4) of each sounding, see GUSTS.
+C
+      INTEGER MNLVLS,NCOL,NLVLS(NCOL),GSTPOT(NCOL)
+      REAL P(MNLVLS,NCOL),T(MNLVLS,NCOL),TD(MNLVLS,NCOL)
+      INTEGER ICOL,N
+      INTEGER FLAG
+      PARAMETER (FLAG=99999)
+C
+      DO 100 ICOL=1,NCOL
+         N=NLVLS(ICOL)
+         GSTPOT(ICOL)=FLAG
+         IF (N.LT.2 .OR. N.GT.MNLVLS) GO TO 100
+         CALL GUSTS(P(1,ICOL),T(1,ICOL),TD(1,ICOL),N,GSTPOT(ICOL))
+ 100  CONTINUE
+      RETURN
+      END
+
+
+      SUBROUTINE HELICB(HW,PW,UW,VW,MNW,NCOL,NW,ELEV,ZTOP,DIRAVG,
+     +                  SPDAVG,GHX,GHY,STMDIR,STMSPD,HELIC,SRHEL)
+      IMPLICIT NONE
+C
+C Helicity and storm relative helicity (m**2/s**2) of the layer from the
+C ground ELEV to ZTOP (m) above it, with the storm motion derived from
+C the mean wind direction DIRAVG (deg) and speed SPDAVG (m/s), see
+C CALCHELICITY.  The wind shear components GHX and GHY (m/s) and the
+C storm direction STMDIR (deg) and speed STMSPD (kts) are returned too.
+C
+      INTEGER MNW,NCOL,NW(NCOL)
+      REAL HW(MNW,NCOL),PW(MNW,NCOL),UW(MNW,NCOL),VW(MNW,NCOL)
+      REAL ELEV(NCOL),ZTOP(NCOL),DIRAVG(NCOL),SPDAVG(NCOL)
+      REAL GHX(NCOL),GHY(NCOL),STMDIR(NCOL),STMSPD(NCOL)
+      REAL HELIC(NCOL),SRHEL(NCOL)
+      INTEGER ICOL,M
+      REAL FLAG,BAD
+      PARAMETER (FLAG=99999.,BAD=1E37)
+C
+      DO 100 ICOL=1,NCOL
+         M=NW(ICOL)
+         GHX(ICOL)=BAD
+         GHY(ICOL)=BAD
+         STMDIR(ICOL)=BAD
+         STMSPD(ICOL)=BAD
+         HELIC(ICOL)=BAD
+         SRHEL(ICOL)=BAD
+         IF (M.LT.2 .OR. M.GT.MNW) GO TO 100
+         GHX(ICOL)=FLAG
+         GHY(ICOL)=FLAG
+         STMDIR(ICOL)=FLAG
+         STMSPD(ICOL)=FLAG
+         CALL CALCHELICITY(HW(1,ICOL),PW(1,ICOL),UW(1,ICOL),VW(1,ICOL),
+     +                     M,ELEV(ICOL),ZTOP(ICOL),GHX(ICOL),GHY(ICOL),
+     +                     DIRAVG(ICOL),SPDAVG(ICOL),STMDIR(ICOL),
+     +                     STMSPD(ICOL),HELIC(ICOL),SRHEL(ICOL))
+ 100  CONTINUE
+      RETURN
+      END
+
+
+      SUBROUTINE AVWINDB(ELEV,TOP,BOT,HW,PW,TW,UW,VW,MNW,NCOL,NW,
+     +                   UAVG,VAVG,AVDIR,AVSPD)
+      IMPLICIT NONE
+C
+C Density weighted mean wind components (m/s), direction (deg) and speed
+C of the layer from BOT to TOP (km) above the ground ELEV (m), see AVWIND.
+C
+      INTEGER MNW,NCOL,NW(NCOL)
+      REAL ELEV(NCOL),TOP(NCOL),BOT(NCOL)
+      REAL HW(MNW,NCOL),PW(MNW,NCOL),TW(MNW,NCOL),UW(MNW,NCOL)
+      REAL VW(MNW,NCOL)
+      REAL UAVG(NCOL),VAVG(NCOL),AVDIR(NCOL),AVSPD(NCOL)
+      INTEGER ICOL,M
+      REAL FLAG,BAD
+      PARAMETER (FLAG=99999.,BAD=1E37)
+C
+      DO 100 ICOL=1,NCOL
+         M=NW(ICOL)
+         UAVG(ICOL)=BAD
+         VAVG(ICOL)=BAD
+         AVDIR(ICOL)=BAD
+         AVSPD(ICOL)=BAD
+         IF (M.LT.2 .OR. M.GT.MNW) GO TO 100
+         UAVG(ICOL)=FLAG
+         VAVG(ICOL)=FLAG
+         CALL AVWIND(ELEV(ICOL),TOP(ICOL),BOT(ICOL),HW(1,ICOL),
+     +               PW(1,ICOL),TW(1,ICOL),UW(1,ICOL),VW(1,ICOL),M,
+     +               UAVG(ICOL),VAVG(ICOL),AVDIR(ICOL),AVSPD(ICOL))
+ 100  CONTINUE
+      RETURN
+      END
+
+
+      SUBROUTINE RICHNOB(HT,HW,UW,VW,RHO,MNLVLS,MNW,NCOL,NLVLS,NW,
+     +                   BUOY,RICHNUM)
+      IMPLICIT NONE
+C
+C Bulk Richardson number of each sounding from the densities RHO
+C (kg/m**3) at the heights HT (m), the wind components (m/s) at the
+C heights HW (m) and the positive buoyant energy BUOY (J/kg), see RICHNO.
+C RICHNO takes at most 500 levels, soundings with more have their output
+C set to 1e37.
+C
+      INTEGER MNLVLS,MNW,NCOL,NLVLS(NCOL),NW(NCOL)
+      REAL HT(MNLVLS,NCOL),RHO(MNLVLS,NCOL)
+      REAL HW(MNW,NCOL),UW(MNW,NCOL),VW(MNW,NCOL)
+      REAL BUOY(NCOL),RICHNUM(NCOL)
+      INTEGER ICOL,N,M
+      INTEGER MNL
+      REAL BAD
+      PARAMETER (MNL=500,BAD=1E37)
+C
+      DO 100 ICOL=1,NCOL
+         N=NLVLS(ICOL)
+         M=NW(ICOL)
+         RICHNUM(ICOL)=BAD
+         IF (N.LT.2 .OR. N.GT.MIN(MNL,MNLVLS) .OR.
+     +       M.LT.2 .OR. M.GT.MIN(MNL,MNW)) GO TO 100
+         CALL RICHNO(HT(1,ICOL),HW(1,ICOL),UW(1,ICOL),VW(1,ICOL),
+     +               RHO(1,ICOL),N,M,BUOY(ICOL),RICHNUM(ICOL))
+ 100  CONTINUE
+      RETURN
+      END
+
+
+      SUBROUTINE EQPBN(DELTAP,OFFSETS,P,NTOT,NSTA,NN)
+      IMPLICIT NONE
+C
+C Number of levels EQP returns for each sounding of a ragged batch, see
+C EQPB.  Soundings which EQPB flags have 0 levels.
+C
+      INTEGER NTOT,NSTA,OFFSETS(NSTA+1),NN(NSTA)
+      REAL DELTAP,P(NTOT)
+      INTEGER ISTA,I0,N,PBOT,PTOP,PINC
+C
+      PINC=NINT(DELTAP)
+      DO 100 ISTA=1,NSTA
+         I0=OFFSETS(ISTA)+1
+         N=OFFSETS(ISTA+1)-OFFSETS(ISTA)
+         NN(ISTA)=0
+         IF (N.LT.2 .OR. I0.LT.1 .OR. I0+N-1.GT.NTOT .OR. PINC.LT.1)
+     +      GO TO 100
+C The pressures of EQP run from P(1) then PBOT down to PTOP by PINC.
+         IF (MOD(NINT(P(I0)),PINC).EQ.0) THEN
+            PBOT=NINT(P(I0)-DELTAP)
+         ELSE
+            PBOT=NINT(P(I0)-(MOD(NINT(P(I0)),PINC)))
+         END IF
+         PTOP=NINT(P(I0+N-1))
+         NN(ISTA)=1+MAX((PBOT-PTOP+PINC)/PINC,0)
+ 100  CONTINUE
+      RETURN
+      END
+
+
+      SUBROUTINE EQPB(DELTAP,OFFSETS,P,HT,T,TD,NTOT,NSTA,MNN,
+     +                PP,HTT,TT,TTD,NN)
+      IMPLICIT NONE
+C
+C Soundings of a ragged batch resampled at pressure intervals of DELTAP
+C (mb), see EQP.  Unlike the other routines of this file the soundings
+C are held one after the other in the flat arrays P, HT, T and TD, of
+C NTOT values, sounding ISTA being the values OFFSETS(ISTA)+1 to
+C OFFSETS(ISTA+1).  The results of sounding ISTA are PP(K,ISTA),
+C HTT(K,ISTA), TT(K,ISTA) and TTD(K,ISTA) for K up to NN(ISTA), the
+C number of levels found by EQPBN.  Soundings with more than MNN levels,
+C fewer than 2 input levels or offsets outside the arrays have NN of 0.
+C Levels left unset by EQP, and those beyond NN, are set to 1e37.
+C
+      INTEGER NTOT,NSTA,MNN,OFFSETS(NSTA+1),NN(NSTA)
+      REAL DELTAP,P(NTOT),HT(NTOT),T(NTOT),TD(NTOT)
+      REAL PP(MNN,NSTA),HTT(MNN,NSTA),TT(MNN,NSTA),TTD(MNN,NSTA)
+      INTEGER ISTA,I0,N,K
+      REAL BAD
+      PARAMETER (BAD=1E37)
+C
+      CALL EQPBN(DELTAP,OFFSETS,P,NTOT,NSTA,NN)
+      DO 100 ISTA=1,NSTA
+         DO 10 K=1,MNN
+            PP(K,ISTA)=BAD
+            HTT(K,ISTA)=BAD
+            TT(K,ISTA)=BAD
+            TTD(K,ISTA)=BAD
+  10     CONTINUE
+         IF (NN(ISTA).GT.MNN) NN(ISTA)=0
+         IF (NN(ISTA).EQ.0) GO TO 100
+         I0=OFFSETS(ISTA)+1
+         N=OFFSETS(ISTA+1)-OFFSETS(ISTA)
+         CALL EQP(DELTAP,P(I0),HT(I0),T(I0),TD(I0),N,PP(1,ISTA),
+     +            HTT(1,ISTA),TT(1,ISTA),TTD(1,ISTA),NN(ISTA))
+ 100  CONTINUE
+      RETURN
+      END
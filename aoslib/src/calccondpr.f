@@ -33,7 +33,8 @@ c
 
         do 20 j=1,nj
         do 20 i=1,ni
-        if (p(i,j).gt.flg .or. t(i,j).gt.flg .or. rh(i,j).gt.flg) then
+        if (.not.(p(i,j).le.flg .and. t(i,j).le.flg .and.
+     &      rh(i,j).le.flg)) then
             q(i,j)=flag
         else
             tp=t(i,j)
@@ -36,7 +36,7 @@ c
 
         Do 10 j=1,nj
         Do 10 i=1,ni
-        If (rh(i,j).gt.flg .or. t(i,j).gt.flg) then
+        If (.not.(rh(i,j).le.flg .and. t(i,j).le.flg)) then
             dpd(i,j)=flag
         Else
             k=t(i,j)
@@ -35,7 +35,7 @@ c
 
         Do 10 j=1,nj
         Do 10 i=1,ni
-        If (td(i,j).gt.flg .or. t(i,j).gt.flg) then
+        If (.not.(td(i,j).le.flg .and. t(i,j).le.flg)) then
             rh(i,j)=flag
         Else If (t(i,j).lt.80.0) Then
             t1=t(i,j)+k0
@@ -41,7 +41,8 @@ c first calculate vapor pressure (epsilon is 622 instead of 0.622 because
 c q is in g/Kg) then RH in percent.
         Do 10 j=1,nj
         Do 10 i=1,ni
-        If (p(i,j).gt.flg .or. t(i,j).gt.flg .or. q(i,j).gt.flg) then
+        If (.not.(p(i,j).le.flg .and. t(i,j).le.flg .and.
+     &      q(i,j).le.flg)) then
             rh(i,j)=flag
         Else
             eee=p(i,j)*q(i,j)/(622.0+0.378*q(i,j))
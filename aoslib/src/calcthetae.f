@@ -40,7 +40,8 @@ c
 
         Do 10 j=1,nj
         Do 10 i=1,ni
-          If (p(i,j).gt.flg .or. t(i,j).gt.flg .or. rh(i,j).gt.flg) then
+          If (.not.(p(i,j).le.flg .and. t(i,j).le.flg .and.
+     &        rh(i,j).le.flg)) then
             q(i,j)=flag
           Else
             k=t(i,j)
@@ -56,7 +56,8 @@ c
 
         Do 10 j=1,nj
         Do 10 i=1,ni
-        If (p(i,j).gt.flg .or. t(i,j).gt.flg .or. td(i,j).gt.flg) then
+        If (.not.(p(i,j).le.flg .and. t(i,j).le.flg .and.
+     &      td(i,j).le.flg)) then
             q(i,j)=flag
         Else
             If (t(i,j).lt.80.0) Then
@@ -36,7 +36,7 @@ c
 
         Do 10 j=1,nj
         Do 10 i=1,ni
-        If (q(i,j).gt.flg .or. t(i,j).gt.flg) then
+        If (.not.(q(i,j).le.flg .and. t(i,j).le.flg)) then
             tv(i,j)=flag
         Else
             tv(i,j)=t(i,j)*(1+0.000608*q(i,j))
@@ -36,7 +36,8 @@ c
 
         Do 10 j=1,nj
         Do 10 i=1,ni
-        If (rh(i,j).gt.flg .or. t(i,j).gt.flg .or. p(i,j).gt.flg) then
+        If (.not.(rh(i,j).le.flg .and. t(i,j).le.flg .and.
+     &      p(i,j).le.flg)) then
             tw(i,j)=flag
         Else
             k=t(i,j)
@@ -59,16 +60,19 @@ C in degrees K using an iterative technique.  For a given guess for the
 C wet bulb temp, one tries to do an energy balance, matching cp*(T-Tw) to
 C (esat(Tw)-esat(Td))*eps*L/p*.
 C
-C c0, c1, and c2 are the same constants as from the esat.f function.
+C c0, c1, and c2 are the same constants as from the esat.f function.  The
+C vapor pressures come from the table set up by SetEsatLut when there is one.
 C f = cp/(L*epsilon).
 C
 
       Implicit None
 
       Integer*4 l
-      Real*4    f,c0,c1,c2,K,Kd,Kw,ew,p,ed,fp,s,de,Kdx
+      Real*4    f,c0,c1,c2,K,Kd,Kw,ew,p,ed,fp,s,de,Kdx,EsLut
       Data      f,c0,c1,c2/0.0006355,26.66082,0.0091379024,6106.3960/
 
+      include 'esatlut.inc'
+
 C Special cases of Td >= T or a ridiculously low T.
       If (Kd.ge.K) Then
           Kw=(K+Kd)/2
@@ -84,7 +88,11 @@ C Special case of a ridiculously high saturation vapor pressure.
           Kw=(K+Kd)/2
           Goto 30
       End If
-      ew=exp(ew)
+      If (nlut.gt.0) Then
+          ew=EsLut(K)
+      Else
+          ew=exp(ew)
+      End If
 
 C Kw is our current guess for wet-bulb, ed the vapor pressure corresponding
 C to the depoint.  Deal with case of a ridiculously small dewpoint vapor
@@ -96,7 +104,11 @@ C pressure.
           ed=c0-c1*Kdx-c2/Kdx
           Goto 5
       End If
-      ed=exp(ed)
+      If (nlut.gt.0) Then
+          ed=EsLut(Kdx)
+      Else
+          ed=exp(ed)
+      End If
       fp=p*f
       s=(ew-ed)/(K-Kdx)
       Kw=(K*fp+Kdx*s)/(fp+s)
@@ -110,7 +122,11 @@ C numerical technique for finding the zero value of a function.
       Do 10 l=1,10
       ew=c0-c1*Kw-c2/Kw
       If (ew.lt.-50.0 .or. ew.gt.10.0) Goto 30
-      ew=exp(ew)
+      If (nlut.gt.0) Then
+          ew=EsLut(Kw)
+      Else
+          ew=exp(ew)
+      End If
       de=fp*(K-Kw)+ed-ew
       If (abs(de/ew).lt.1e-5) Goto 20
       s=ew*(c1-c2/(Kw*Kw))-fp
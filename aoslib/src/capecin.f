@@ -0,0 +1,150 @@
+      SUBROUTINE CAPECIN(P,HT,T,TD,MNLVLS,NCOL,NLVLS,WORK,
+     +                   CAPE,CIN,PLCL,HLCL,PLFC,HLFC,PEQL,HEQL)
+      IMPLICIT NONE
+C
+C Statement of purpose.
+C ---------------------
+C This routine computes the convective available potential energy (CAPE),
+C the convective inhibition (CIN) and the pressures and heights of the
+C lifting condensation level (LCL), level of free convection (LFC) and
+C equilibrium level (EL) of a surface based parcel for each of a batch
+C of soundings.  The parcel routines LCLPAR, DEFTRK, LIFTEDP, LFCPAR,
+C EQLEV, POSAREA and NEGAREA are called for each sounding in turn.
+C
+C Description of input and output.
+C --------------------------------
+C On input:
+C ---------
+C P           Real Array    Sounding pressures (mb), P(K,ICOL) is level K
+C                           of sounding ICOL, ordered from the surface up.
+C HT          Real Array    Sounding heights (m asl).
+C T           Real Array    Sounding temperatures (K).
+C TD          Real Array    Sounding dewpoint temperatures (K).
+C MNLVLS      Integer       First dimension of the sounding arrays.
+C NCOL        Integer       Number of soundings.
+C NLVLS       Integer Array Number of valid levels in each sounding.
+C WORK        Real Array    Work space of at least (MNLVLS+1)*7 elements.
+C
+C On output:
+C ----------
+C CAPE        Real Array    Positive buoyant energy between the LFC and the
+C                           EL (J/kg).
+C CIN         Real Array    Negative buoyant energy below the LFC (J/kg).
+C PLCL        Real Array    Pressure of the LCL (mb).
+C HLCL        Real Array    Height of the LCL (m asl).
+C PLFC        Real Array    Pressure of the LFC (mb).
+C HLFC        Real Array    Height of the LFC (m asl).
+C PEQL        Real Array    Pressure of the EL (mb).
+C HEQL        Real Array    Height of the EL (m asl).
+C
+C User notes:
+C -----------
+C 1) The parcel is lifted from the first level of each sounding using the
+C    mixing ratio of the surface dewpoint.
+C 2) Levels that are not found are set to the flag value 99999.  When no
+C    LFC exists CAPE and CIN are zero.
+C 3) Soundings with fewer than two levels, more than 450 levels or a value
+C    greater than 99998 in any of the valid levels have all outputs set to
+C    the flag value 1e37.
+C
+C
+C Input arguments.
+C
+      INTEGER MNLVLS,NCOL,NLVLS(NCOL)
+      REAL P(MNLVLS,NCOL),HT(MNLVLS,NCOL),T(MNLVLS,NCOL),TD(MNLVLS,NCOL)
+      REAL WORK(MNLVLS+1,7)
+C
+C Output arguments.
+C
+      REAL CAPE(NCOL),CIN(NCOL),PLCL(NCOL),HLCL(NCOL)
+      REAL PLFC(NCOL),HLFC(NCOL),PEQL(NCOL),HEQL(NCOL)
+C
+C Internal variables.
+C
+      INTEGER ICOL,K,N,NPAR
+      REAL E,W,TLCL,THDPAR,EPTPAR,TLFC,PLFC2,HLFC2,TLFC2,TEQL
+      REAL BUOY,CINCAPE,NEGBUOY
+C
+C External functions.
+C
+      REAL ESAT
+C
+C Subroutine constants.
+C
+      INTEGER NL
+      REAL FLG,FLAG,BAD
+      PARAMETER (NL=450,FLG=99998.,FLAG=99999.,BAD=1E37)
+C
+C Work space: WORK(,1) holds the virtual temperatures of the sounding and
+C WORK(,2) to WORK(,7) the lifted parcel arrays.
+C
+      DO 100 ICOL=1,NCOL
+         N=NLVLS(ICOL)
+         CAPE(ICOL)=BAD
+         CIN(ICOL)=BAD
+         PLCL(ICOL)=BAD
+         HLCL(ICOL)=BAD
+         PLFC(ICOL)=BAD
+         HLFC(ICOL)=BAD
+         PEQL(ICOL)=BAD
+         HEQL(ICOL)=BAD
+         IF (N.LT.2 .OR. N.GT.MIN(NL,MNLVLS)) GO TO 100
+         DO 10 K=1,N
+            IF (P(K,ICOL).GT.FLG .OR. HT(K,ICOL).GT.FLG .OR.
+     +          T(K,ICOL).GT.FLG .OR. TD(K,ICOL).GT.FLG) GO TO 100
+ 10      CONTINUE
+C
+C Lifting condensation level and the adiabats of the lifted parcel.
+C
+         E=ESAT(TD(1,ICOL))
+         W=0.622*E/(P(1,ICOL)-E)
+         CALL LCLPAR(W,T(1,ICOL),P(1,ICOL),HT(1,ICOL),T(1,ICOL),
+     +               TD(1,ICOL),N,PLCL(ICOL),TLCL,HLCL(ICOL))
+         PLFC(ICOL)=FLAG
+         HLFC(ICOL)=FLAG
+         PEQL(ICOL)=FLAG
+         HEQL(ICOL)=FLAG
+         CAPE(ICOL)=0.0
+         CIN(ICOL)=0.0
+         IF (PLCL(ICOL).GT.FLG) GO TO 100
+         CALL DEFTRK(TLCL,PLCL(ICOL),THDPAR,EPTPAR)
+C
+C Lifted parcel and corresponding environmental arrays.
+C
+         CALL VIRTUALT(T(1,ICOL),TD(1,ICOL),P(1,ICOL),N,WORK(1,1))
+         CALL LIFTEDP(P(1,ICOL),T(1,ICOL),HT(1,ICOL),WORK(1,1),N,N+1,
+     +                PLCL(ICOL),HLCL(ICOL),TLCL,W,THDPAR,EPTPAR,
+     +                P(1,ICOL),T(1,ICOL),WORK(1,2),WORK(1,3),
+     +                WORK(1,4),WORK(1,5),WORK(1,6),WORK(1,7),NPAR)
+         IF (NPAR.LT.2) GO TO 100
+C
+C Level of free convection.
+C
+         TLFC=FLAG
+         CALL LFCPAR(EPTPAR,PLCL(ICOL),TLCL,HLCL(ICOL),WORK(1,4),
+     +               WORK(1,6),WORK(1,2),WORK(1,3),NPAR,PLFC(ICOL),
+     +               HLFC(ICOL),TLFC,PLFC2,HLFC2,TLFC2)
+         IF (PLFC(ICOL).GT.FLG) GO TO 100
+C
+C Equilibrium level.
+C
+         TEQL=FLAG
+         CALL EQLEV(WORK(1,2),WORK(1,3),WORK(1,4),WORK(1,6),PLFC(ICOL),
+     +              EPTPAR,NPAR,PEQL(ICOL),HEQL(ICOL),TEQL)
+C
+C Positive area above the LFC and negative area below it.
+C
+         CALL POSAREA(PLFC(ICOL),PEQL(ICOL),TLFC,TEQL,HLFC(ICOL),
+     +                HEQL(ICOL),EPTPAR,WORK(1,2),WORK(1,3),WORK(1,6),
+     +                WORK(1,4),NPAR,BUOY,CINCAPE)
+         CALL NEGAREA(PLCL(ICOL),TLCL,HLCL(ICOL),PLFC(ICOL),HLFC(ICOL),
+     +                TLFC,THDPAR,EPTPAR,WORK(1,2),WORK(1,3),WORK(1,6),
+     +                WORK(1,4),NPAR,CINCAPE,NEGBUOY)
+         CAPE(ICOL)=BUOY
+         CIN(ICOL)=NEGBUOY
+ 100  CONTINUE
+C
+C Exit.
+C
+      RETURN
+      END
@@ -38,6 +38,7 @@ c########################################################################
       integer n
       parameter (n=400)
       real tempip(n), dwptip(n), presip(n), thetawip(n), soln(0:n) 
+      logical malift
 
 c
 c Initialize some variables.
@@ -103,7 +104,8 @@ c          print *,presip(i),thetawip(i)
 c
 c Lift the most unstable parcel found above to its LCL.  Then lift it 
 c pseudo-moist adiabatically up to "near" 400 mb then from there up to 
-c "near" 300 mb.  Compare these lifted parcel temperatures to the 
+c "near" 300 mb, using the moist adiabat table when one has been loaded
+c by SetMoistLut.  Compare these lifted parcel temperatures to the 
 c environmental temperatures at these levels to calculate the upper 
 c stability index.
 c
@@ -114,11 +116,14 @@ c
 c       print *,'lifting',presip(itwmax),tempip(itwmax),dwptip(itwmax)
 c       print *,'lcl',tl,pl
 c       print *,'going into pseudolift',pl,presip(it4),soln(0)
+      if (malift(tl,pl,presip(it4),t4) .and.
+     &    malift(tl,pl,presip(it3),soln(100))) goto 20
       call pseudolift(100,pl,presip(it4),soln)
       t4= soln(100)
 c       print *,'parcel temp at ',presip(it4),t4
       soln(0)= t4
       call pseudolift(100,presip(it4),presip(it3),soln)
+   20 continue
 c       print *,'parcel temp at ',presip(it3),soln(100)
 c       print *,'4,3',tempip(it4),tempip(it3)
       usi= (tempip(it4)-t4)+(tempip(it3)-soln(100))     
@@ -0,0 +1,371 @@
+
+      Subroutine ContCount(Dat,mnx,nx,ny,Levels,nlev,badlo,badhi,
+     &                     lix,off,ncross)
+
+C  Counts the crossings of the sides of the grid cells by a set of contour
+C  levels, the first of the two passes of ContTrace.  Unlike FortConBuf
+C  there is no limit on the number of levels, all of the levels are found
+C  in one pass over the grid and no state is kept between calls.
+
+C  Inputs:
+C   Dat(mnx,ny)     R*4   Array to contour.
+C   mnx             I*4   First dimension of input array.
+C   nx              I*4   First dimension of input grid.
+C   ny              I*4   Second dimension of input grid.
+C   Levels(nlev)    R*4   Contour values, strictly increasing.
+C   nlev            I*4   Number of contour values.
+C   badlo,badhi     R*4   Smallest and largest values which are missing.
+C                         If badlo>badhi only NaN values are missing.
+
+C  Outputs:
+C   lix(nx,ny)      I*4   Number of levels below each point, -1 where
+C                         the point is missing.
+C   off(2,nx,ny)    I*4   Index offsets of the crossings of each side,
+C                         along the first dimension (1,i,j) from (i,j) to
+C                         (i+1,j) and along the second (2,i,j) from (i,j)
+C                         to (i,j+1).  Crossing of level l is off+l.
+C   ncross          I*4   Total number of crossings.
+
+      Implicit None
+
+      Integer*4 mnx,nx,ny,nlev,lix(nx,ny),off(2,nx,ny),ncross
+      Real*4    Dat(mnx,ny),Levels(nlev),badlo,badhi
+
+      Integer*4 i,j,l1,l2,lh,ContIdx
+      Real*4    v
+      Logical   ContBad
+
+      lh=0
+      Do 10 j=1,ny
+      Do 10 i=1,nx
+      If (ContBad(Dat(i,j),badlo,badhi)) Then
+          lix(i,j)=-1
+      Else
+
+c  Neighbouring points mostly share a level band, so try the band of the
+c  last point before searching.
+          v=Dat(i,j)
+          If (lh.gt.0) Then
+              If (Levels(lh).ge.v) lh=-1
+          End If
+          If (lh.ge.0 .and. lh.lt.nlev) Then
+              If (Levels(lh+1).lt.v) lh=-1
+          End If
+          If (lh.lt.0) lh=ContIdx(Levels,nlev,v)
+          lix(i,j)=lh
+      End If
+10    Continue
+
+c  Levels l1+1 to l2 cross a side with l1 and l2 levels below its ends.
+      ncross=0
+      Do 20 j=1,ny
+      Do 20 i=1,nx
+      off(1,i,j)=0
+      off(2,i,j)=0
+      If (lix(i,j).lt.0) Goto 20
+      If (i.lt.nx) Then
+          If (lix(i+1,j).ge.0) Then
+              l1=min0(lix(i,j),lix(i+1,j))
+              l2=max0(lix(i,j),lix(i+1,j))
+              off(1,i,j)=ncross-l1
+              ncross=ncross+l2-l1
+          End If
+      End If
+      If (j.lt.ny) Then
+          If (lix(i,j+1).ge.0) Then
+              l1=min0(lix(i,j),lix(i,j+1))
+              l2=max0(lix(i,j),lix(i,j+1))
+              off(2,i,j)=ncross-l1
+              ncross=ncross+l2-l1
+          End If
+      End If
+20    Continue
+
+      Return
+      End
+
+
+      Subroutine ContTrace(Dat,mnx,nx,ny,Levels,nlev,lix,
+     &                     off,ncross,visit,maxpt,xy,npt,
+     &                     maxln,lstart,llev,nln)
+
+C  Joins the crossings counted by ContCount into contour lines.  Each
+C  crossing is used once, so maxpt=ncross+ncross/2 points and maxln=
+C  ncross/2+1 lines always suffice.  Ambiguous cells are resolved from
+C  the cell average as in Contr1_B.
+
+C  Inputs:
+C   Dat .. nlev           As for ContCount.
+C   lix(nx,ny)      I*4   Output of ContCount.
+C   off(2,nx,ny)    I*4   Output of ContCount.
+C   ncross          I*4   Output of ContCount.
+C   visit(ncross)   Byte  Workspace.
+C   maxpt           I*4   Size of xy.
+C   maxln           I*4   Size of lstart and llev.
+
+C  Outputs:
+C   xy(2,maxpt)     R*4   Points of the lines, as zero based positions
+C                         along the first and second dimensions.  Lines
+C                         keep the higher values on their right and
+C                         closed lines end with their first point.
+C   npt             I*4   Number of points.
+C   lstart(maxln)   I*4   Index in xy of the first point of each line.
+C   llev(maxln)     I*4   Index in Levels of each line.
+C   nln             I*4   Number of lines, or -1 if maxpt or maxln were
+C                         too small.
+
+      Implicit None
+
+      Integer*4 mnx,nx,ny,nlev,lix(nx,ny),off(2,nx,ny),ncross,maxpt,
+     &          npt,maxln,lstart(maxln),llev(maxln),nln
+      Real*4    Dat(mnx,ny),Levels(nlev),xy(2,maxpt)
+      Byte      visit(*)
+
+      Integer*4 i,j,k,l,m,la,lb,n,id,id2,
+     &          bi,bj,bs,si,sj,ss,x,
+     &          ContId,ContExit
+      Real*4    val
+      Logical   ContCel
+
+      Do 5 i=1,ncross
+5     visit(i)=0
+      npt=0
+      nln=0
+
+c  Open lines are traced from their start, where the line enters the grid
+c  or leaves a cell with missing corners, on the first pass (m=1).  What
+c  is left are closed lines, traced from any of their points on the second.
+      Do 300 m=1,2
+      Do 300 j=1,ny
+      Do 300 i=1,nx
+      Do 300 k=1,2
+      If (k.eq.1 .and. i.eq.nx) Goto 300
+      If (k.eq.2 .and. j.eq.ny) Goto 300
+      la=lix(i,j)
+      If (k.eq.1) Then
+          lb=lix(i+1,j)
+      Else
+          lb=lix(i,j+1)
+      End If
+      If (la.eq.lb .or. la.lt.0 .or. lb.lt.0) Goto 300
+
+c  Only a side next to a cell off the grid or with missing corners can
+c  hold the start of an open line.
+      If (m.eq.1) Then
+          If (k.eq.1) Then
+              If (ContCel(lix,nx,ny,i,j) .and.
+     &            ContCel(lix,nx,ny,i,j-1)) Goto 300
+          Else
+              If (ContCel(lix,nx,ny,i,j) .and.
+     &            ContCel(lix,nx,ny,i-1,j)) Goto 300
+          End If
+      End If
+      Do 200 l=min0(la,lb)+1,max0(la,lb)
+      id=off(k,i,j)+l
+      If (visit(id).ne.0) Goto 200
+      val=Levels(l)
+
+c  Cell the line enters from this crossing, keeping the higher values on
+c  its right, and the side it enters by.
+      If (k.eq.1) Then
+          si=i
+          If (l.le.lb) Then
+              sj=j
+              ss=1
+          Else
+              sj=j-1
+              ss=3
+          End If
+      Else
+          sj=j
+          If (l.le.la) Then
+              si=i
+              ss=4
+          Else
+              si=i-1
+              ss=2
+          End If
+      End If
+      If (m.eq.1) Then
+          Call ContNext(si,sj,ss,bi,bj,bs)
+          If (ContCel(lix,nx,ny,bi,bj)) Goto 200
+      End If
+
+c  Trace the line forward from its start.
+      If (npt.ge.maxpt .or. nln.ge.maxln) Goto 900
+      npt=npt+1
+      n=1
+      Call ContPnt(Dat,mnx,si,sj,ss,val,xy(1,npt),xy(2,npt))
+      visit(id)=1
+120   If (.not.ContCel(lix,nx,ny,si,sj)) Goto 130
+      x=ContExit(Dat,mnx,lix,nx,ny,si,sj,ss,l,val)
+      id2=ContId(off,nx,ny,si,sj,x,l)
+      If (npt.ge.maxpt) Goto 900
+      npt=npt+1
+      n=n+1
+      Call ContPnt(Dat,mnx,si,sj,x,val,xy(1,npt),xy(2,npt))
+      If (id2.eq.id) Goto 130
+      visit(id2)=1
+      Call ContNext(si,sj,x,bi,bj,bs)
+      si=bi
+      sj=bj
+      ss=bs
+      Goto 120
+
+c  Keep lines of more than one point.
+130   If (n.ge.2) Then
+          nln=nln+1
+          lstart(nln)=npt-n+1
+          llev(nln)=l
+      Else
+          npt=npt-n
+      End If
+200   Continue
+300   Continue
+      Return
+
+900   nln=-1
+      Return
+      End
+
+
+      Logical Function ContBad(v,badlo,badhi)
+C  Whether v is missing, NaN or from badlo to badhi.
+      Implicit None
+      Real*4 v,badlo,badhi
+      ContBad=.not.(v.lt.badlo .or. v.gt.badhi)
+      If (badlo.gt.badhi) ContBad=.not.(v.eq.v)
+      Return
+      End
+
+
+      Integer*4 Function ContIdx(Levels,nlev,v)
+C  Number of the increasing Levels which are less than v.
+      Implicit None
+      Integer*4 nlev,lo,hi,mid
+      Real*4    Levels(nlev),v
+      lo=0
+      hi=nlev
+10    If (lo.lt.hi) Then
+          mid=(lo+hi+1)/2
+          If (Levels(mid).lt.v) Then
+              lo=mid
+          Else
+              hi=mid-1
+          End If
+          Goto 10
+      End If
+      ContIdx=lo
+      Return
+      End
+
+
+      Logical Function ContCel(lix,nx,ny,i,j)
+C  Whether cell (i,j) is in the grid and has no missing corners.
+      Implicit None
+      Integer*4 nx,ny,lix(nx,ny),i,j
+      ContCel=.false.
+      If (i.lt.1 .or. i.ge.nx .or. j.lt.1 .or. j.ge.ny) Return
+      ContCel=lix(i,j).ge.0 .and. lix(i+1,j).ge.0 .and.
+     &        lix(i+1,j+1).ge.0 .and. lix(i,j+1).ge.0
+      Return
+      End
+
+
+      Integer*4 Function ContId(off,nx,ny,i,j,s,l)
+C  Index of the crossing of side s of cell (i,j) by level l.  Sides are
+C  numbered as in Contr1_B, 1 to 4 anticlockwise from (i,j)-(i+1,j).
+      Implicit None
+      Integer*4 nx,ny,off(2,nx,ny),i,j,s,l
+      If (s.eq.1) Then
+          ContId=off(1,i,j)+l
+      Else If (s.eq.2) Then
+          ContId=off(2,i+1,j)+l
+      Else If (s.eq.3) Then
+          ContId=off(1,i,j+1)+l
+      Else
+          ContId=off(2,i,j)+l
+      End If
+      Return
+      End
+
+
+      Subroutine ContNext(i,j,s,ni,nj,ns)
+C  Cell (ni,nj) across side s of cell (i,j), and the side ns it shares.
+      Implicit None
+      Integer*4 i,j,s,ni,nj,ns,ii,jj
+      ii=i
+      jj=j
+      If (s.eq.1) Then
+          jj=j-1
+          ns=3
+      Else If (s.eq.2) Then
+          ii=i+1
+          ns=4
+      Else If (s.eq.3) Then
+          jj=j+1
+          ns=1
+      Else
+          ii=i-1
+          ns=2
+      End If
+      ni=ii
+      nj=jj
+      Return
+      End
+
+
+      Subroutine ContPnt(Dat,mnx,i,j,s,val,x,y)
+C  Zero based position of the crossing of side s of cell (i,j) by val.
+      Implicit None
+      Integer*4 mnx,i,j,s
+      Real*4    Dat(mnx,*),val,x,y
+      If (s.eq.1) Then
+          x=i-1+(val-Dat(i,j))/(Dat(i+1,j)-Dat(i,j))
+          y=j-1
+      Else If (s.eq.2) Then
+          x=i
+          y=j-1+(val-Dat(i+1,j))/(Dat(i+1,j+1)-Dat(i+1,j))
+      Else If (s.eq.3) Then
+          x=i-1+(val-Dat(i,j+1))/(Dat(i+1,j+1)-Dat(i,j+1))
+          y=j
+      Else
+          x=i-1
+          y=j-1+(val-Dat(i,j))/(Dat(i,j+1)-Dat(i,j))
+      End If
+      Return
+      End
+
+
+      Integer*4 Function ContExit(Dat,mnx,lix,nx,ny,i,j,e,l,val)
+C  Side by which contour l, of value val, entering cell (i,j) by side e
+C  leaves it.
+      Implicit None
+      Integer*4 mnx,nx,ny,lix(nx,ny),i,j,e,l,s,n,h
+      Real*4    Dat(mnx,*),val
+      Logical   GGG(4),GGGD
+      GGG(1)=l.gt.lix(i,j)
+      GGG(2)=l.gt.lix(i+1,j)
+      GGG(3)=l.gt.lix(i+1,j+1)
+      GGG(4)=l.gt.lix(i,j+1)
+      n=0
+      Do 20 s=1,4
+      If (s.ne.e .and. (GGG(s).neqv.GGG(mod(s,4)+1))) Then
+          n=n+1
+          ContExit=s
+      End If
+20    Continue
+      If (n.eq.1) Return
+
+c  Saddle, cut off the corners of the entry side which differ from the
+c  cell average.
+      GGGD=(4*val).ge.(Dat(i,j)+Dat(i+1,j)+Dat(i+1,j+1)+Dat(i,j+1))
+      h=e
+      If (GGG(h).eqv.GGGD) h=mod(e,4)+1
+      If (h.eq.e) Then
+          ContExit=mod(h+2,4)+1
+      Else
+          ContExit=h
+      End If
+      Return
+      End
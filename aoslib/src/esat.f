@@ -14,7 +14,9 @@ C  it is invertable.
  
       Implicit None
  
-      Real*4 T,K
+      Real*4 T,K,EsLut
+
+      include 'esatlut.inc'
  
       Real*4 Flag
       Data Flag /1e37/
@@ -38,8 +40,13 @@ c  Avoid floating underflow.
           Return
          End If
  
-c  Calculation for normal range of values.
-      esat=exp(26.660820-0.0091379024*K-6106.3960/K)
+c  Calculation for normal range of values, from the table when one has
+c  been set up by SetEsatLut.
+      If (nlut.gt.0) Then
+          esat=EsLut(K)
+      Else
+          esat=exp(26.660820-0.0091379024*K-6106.3960/K)
+      End If
  
       Return
       End
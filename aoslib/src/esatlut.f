@@ -0,0 +1,74 @@
+      Subroutine SetEsatLut(npts,eserr)
+
+C*  Selects table interpolation for the saturation vapor pressure used by
+C*  esat, mixrat, spechum, calctw and adiabatic_te in place of evaluating
+C*  exp(26.66082-0.0091379024*K-6106.396/K) at every point.
+
+C  npts is the number of points in the table, between 2 and NLMAX (20001),
+C  spread evenly from 173.15 K to 373.15 K; npts=0 selects the exact
+C  formula again.  The table always takes 8*NLMAX bytes.  On return eserr
+C  is the largest relative error of the interpolated esat, measured
+C  against the exact formula halfway between table points where linear
+C  interpolation is least accurate.  It is about 0.0044*dt**2 for a
+C  spacing of dt degrees, down to the precision of the formula itself
+C  (a few parts in a million) for the finest tables.  Temperatures outside
+C  the table always use the exact formula.
+
+C  The table is shared by all callers, this routine should not be called
+C  while another thread is using it.
+
+      Implicit None
+
+      include 'esatlut.inc'
+
+      Integer*4 npts,i
+      Real*4    eserr,k,es,c0,c1,c2,thi
+
+      Data      nlut/0/
+      Data      c0,c1,c2,thi/26.660820,0.0091379024,6106.3960,373.15/
+
+      nlut=0
+      eserr=0.0
+      If (npts.lt.2 .or. npts.gt.NLMAX) Return
+
+      tlo=173.15
+      rdt=(npts-1)/(thi-tlo)
+      Do 10 i=1,npts
+          k=tlo+(i-1)/rdt
+          eslt(i)=exp(c0-c1*k-c2/k)
+10    Continue
+      Do 20 i=1,npts-1
+          dslt(i)=eslt(i+1)-eslt(i)
+          k=tlo+(i-0.5)/rdt
+          es=exp(c0-c1*k-c2/k)
+          eserr=amax1(eserr,abs(eslt(i)+0.5*dslt(i)-es)/es)
+20    Continue
+
+      nlut=npts
+      Return
+      End
+
+
+      Real*4 Function EsLut(K)
+
+C*  Saturation vapor pressure (mb) at K degrees Kelvin interpolated from
+C*  the table set up by SetEsatLut.  Temperatures outside the table, and
+C*  NaN, use the exact formula.
+
+      Implicit None
+
+      include 'esatlut.inc'
+
+      Real*4    K,x
+      Integer*4 i
+
+      x=(K-tlo)*rdt
+      If (.not.(x.ge.0.0 .and. x.lt.nlut-1)) Then
+          EsLut=exp(26.660820-0.0091379024*K-6106.3960/K)
+          Return
+      End If
+      i=int(x)
+      EsLut=eslt(i+1)+(x-i)*dslt(i+1)
+
+      Return
+      End
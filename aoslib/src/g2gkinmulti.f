@@ -0,0 +1,206 @@
+ 
+      Subroutine G2GKinMulti(Udx,Vdy,Q,SpaX,SpaY,mnx,mny,nx,ny,
+     -                       nset,choices,Scalars)
+
+C  Computes several of the scalar g2gkinematics products in one pass
+C  over the grid, sharing the centered differences of U and V between
+C  them.  Each product is the same as from G2GKinematics with that choice.
+
+C  Udx(mnx,mny)     Real   U component.
+C  Vdy(mnx,mny)     Real   V component.
+C  Q(mnx,mny)       Real   Array of parameter to advect, etc. (see notes)
+C  SpaX(mnx,mny)    Real   Grid spacing in the X direction.
+C  SpaY(mnx,mny)    Real   Grid spacing in the Y direction.
+C  mnx,mny          Int    Dimensions of input arrays.
+C  nx,ny            Int    Dimensions of input grids.
+C  nset             Int    Number of products.
+C  choices(nset)    Int    The g2gkinematics choice of each product.
+C  Scalars(mnx,mny,nset)   Real   Products, in the order of choices.
+
+C  The choices available are:
+C  choice=1, vorticity;
+C  choice=2, divergence, ignore Q;
+C  choice=3, vorticity advection;
+C  choice=4, divergence of Q;
+C  choice=5, advection of Q.
+c  choice=6, laplacian of Q, ignore U and V.
+c  choice=9, Total deformation.
+C  Any other choice is left unset.
+
+C Note for options one and three:
+C  To work with relative vorticity, fill first level of array Q with zeroes.
+C  For absolute vorticity, fill first level of Q with coriolis parameter
+C  values.
+
+      Implicit None
+
+      Integer*4 mnx,mny,nx,ny,nset,choices(nset),im,ip,jm,jp,i,j,k
+      Integer*4 kvor,kdiv,kvad,kqdv,kqad,klap,kdef
+
+      Real*4    Udx(mnx,mny),Vdy(mnx,mny),
+     -          Q(mnx,mny),SpaX(mnx,mny),SpaY(mnx,mny),
+     -          Scalars(mnx,mny,nset),
+     -          dux,duy,dvx,dvy,qad,qqq,www,dsh,dst
+
+      Logical   bux,buy,bvx,bvy
+
+      Real*4 Flag,Flg
+      Data Flag,Flg/1e37,1e36/
+
+      If (nx.lt.3 .or. nx.gt.mnx .or. ny.lt.3 .or. ny.gt.mny) Then
+          Write (6,*) 'Invalid dimensions in g2gkinmulti.'
+          Return
+      EndIf
+
+c  Position of each product in Scalars, 0 when it is not wanted.
+      kvor=0
+      kdiv=0
+      kvad=0
+      kqdv=0
+      kqad=0
+      klap=0
+      kdef=0
+      Do 5 k=1,nset
+      If (choices(k).eq.1) kvor=k
+      If (choices(k).eq.2) kdiv=k
+      If (choices(k).eq.3) kvad=k
+      If (choices(k).eq.4) kqdv=k
+      If (choices(k).eq.5) kqad=k
+      If (choices(k).eq.6) klap=k
+      If (choices(k).eq.9) kdef=k
+5     Continue
+
+c  Flag out boundaries.
+      Do 10 k=1,nset
+          Do 11 i=1,nx
+11        Scalars(i,1,k)=Flag
+           Do 12 j=2,ny-1
+           Scalars(1,j,k)=Flag
+12         Scalars(nx,j,k)=Flag
+            Do 13 i=1,nx
+13          Scalars(i,ny,k)=Flag
+10    Continue
+
+      jm=1
+      j=2
+      Do 91 jp=3,ny
+      im=1
+      i=2
+      Do 90 ip=3,nx
+
+c  Centered differences shared by the products and whether the points
+c  they use are missing.
+      dux=Udx(ip,j)-Udx(im,j)
+      duy=Udx(i,jp)-Udx(i,jm)
+      dvx=Vdy(ip,j)-Vdy(im,j)
+      dvy=Vdy(i,jp)-Vdy(i,jm)
+      bux=Udx(im,j).gt.Flg .or. Udx(ip,j).gt.Flg
+      buy=Udx(i,jm).gt.Flg .or. Udx(i,jp).gt.Flg
+      bvx=Vdy(im,j).gt.Flg .or. Vdy(ip,j).gt.Flg
+      bvy=Vdy(i,jm).gt.Flg .or. Vdy(i,jp).gt.Flg
+
+c  Vorticity.
+      If (kvor.gt.0) Then
+          If (buy .or. bvx) Then
+              Scalars(i,j,kvor)=Flag
+          Else
+              Scalars(i,j,kvor)=(dvx/SpaX(i,j)-duy/SpaY(i,j))/2
+     -                          + Q(i,j)
+          End If
+      End If
+
+c  Divergence.
+      If (kdiv.gt.0) Then
+          If (bvy .or. bux) Then
+              Scalars(i,j,kdiv)=Flag
+          Else
+              Scalars(i,j,kdiv)=(dux/SpaX(i,j)+dvy/SpaY(i,j))/2
+          End If
+      End If
+
+c  Advection of Q, also the advection of planetary vorticity in the
+c  vorticity advection.
+      If (kqad.gt.0 .or. kvad.gt.0)
+     -    qad=(Udx(i,j)*(Q(im,j)-Q(ip,j))/SpaX(i,j)+
+     -         Vdy(i,j)*(Q(i,jm)-Q(i,jp))/SpaY(i,j))/2
+      If (kqad.gt.0) Then
+          If (Q(im,j).gt.Flg .or. Q(ip,j).gt.Flg .or.
+     -        Q(i,jm).gt.Flg .or. Q(i,jp).gt.Flg .or.
+     -        Udx(i,j).gt.Flg .or. Vdy(i,j).gt.Flg) Then
+              Scalars(i,j,kqad)=Flag
+          Else
+              Scalars(i,j,kqad)=qad
+          End If
+      End If
+
+c  Vorticity advection.
+      If (kvad.gt.0) Then
+          If (Udx(im,jm).gt.Flg .or. Udx(im,jp).gt.Flg .or.
+     -        Udx(ip,jm).gt.Flg .or. Udx(ip,jp).gt.Flg .or.
+     -        Vdy(im,jm).gt.Flg .or. Vdy(im,jp).gt.Flg .or.
+     -        Vdy(ip,jm).gt.Flg .or. Vdy(ip,jp).gt.Flg .or.
+     -        bvx .or. buy .or.
+     -        Udx(i,j).gt.Flg .or. Vdy(i,j).gt.Flg) Then
+              Scalars(i,j,kvad)=Flag
+          Else
+              Scalars(i,j,kvad)=( Udx(i,j)*
+     -            ( (Udx(ip,jp)+Udx(im,jm)-Udx(im,jp)-Udx(ip,jm))/4
+     -              -Vdy(ip,j)-Vdy(im,j)+Vdy(i,j)+Vdy(i,j) )
+     -                - Vdy(i,j)*
+     -            ( (Vdy(ip,jp)+Vdy(im,jm)-Vdy(im,jp)-Vdy(ip,jm))/4
+     -              -Udx(i,jp)-Udx(i,jm)+Udx(i,j)+Udx(i,j) )
+     -                  ) /(SpaX(i,j)*SpaY(i,j))
+     -             +    qad
+          End If
+      End If
+
+c  Divergence of Q.
+      If (kqdv.gt.0) Then
+          If (bvy .or. bux .or.
+     -        Q(i,jm).gt.Flg .or. Q(i,jp).gt.Flg .or.
+     -        Q(im,j).gt.Flg .or. Q(ip,j).gt.Flg) Then
+              Scalars(i,j,kqdv)=Flag
+          Else
+              Scalars(i,j,kqdv)=((Q(ip,j)*Udx(ip,j)-Q(im,j)*Udx(im,j))
+     -                        /SpaX(i,j)+
+     -                     (Q(i,jp)*Vdy(i,jp)-Q(i,jm)*Vdy(i,jm))
+     -                        /SpaY(i,j))/2
+          End If
+      End If
+
+c  Laplacian of Q.
+      If (klap.gt.0) Then
+          If (Q(im,j).gt.Flg .or. Q(ip,j).gt.Flg .or. Q(i,j).gt.Flg .or.
+     -        Q(i,jm).gt.Flg .or. Q(i,jp).gt.Flg) Then
+              Scalars(i,j,klap)=Flag
+          Else
+              qqq=Q(i,j)+Q(i,j)
+              Scalars(i,j,klap)=(Q(im,j)+Q(ip,j)-qqq)
+     -                          /(SpaX(i,j)*SpaX(i,j)) +
+     -                          (Q(i,jm)+Q(i,jp)-qqq)
+     -                          /(SpaY(i,j)*SpaY(i,j))
+          End If
+      End If
+
+c  Deformation.
+      If (kdef.gt.0) Then
+          If (bvy .or. buy .or. bvx .or. bux) Then
+              Scalars(i,j,kdef)=Flag
+          Else
+              qqq=0.5/SpaX(i,j)
+              www=0.5/SpaY(i,j)
+              dst=dux*qqq-dvy*www
+              dsh=duy*qqq+dvx*www
+              Scalars(i,j,kdef)=sqrt(dst*dst+dsh*dsh)
+          End If
+      End If
+
+      im=i
+      i=ip
+90    Continue
+      jm=j
+      j=jp
+91    Continue
+
+      Return
+      End
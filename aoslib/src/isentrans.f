@@ -0,0 +1,125 @@
+      Subroutine IsenTrans(T,U,V,Z,mni,ni,nj,nlev,P,Theta,nth,Isen,
+     -                     Work)
+
+C*  Interpolates fields on pressure levels to surfaces of constant
+C*  potential temperature.  For each column the potential temperature of
+C*  the levels is computed once, as in temp2theta, and each surface is
+C*  bracketed by the lowest pair of adjacent levels between which it lies.
+C*  The pressure, winds and height on the surface are all interpolated
+C*  with the weight of that bracket, linearly in theta, the pressure being
+C*  interpolated in log(p).
+
+C  T(mni,nj,nlev)   Real   Temperature (K) on each pressure level.
+C  U(mni,nj,nlev)   Real   U wind component.
+C  V(mni,nj,nlev)   Real   V wind component.
+C  Z(mni,nj,nlev)   Real   Height.
+C  mni              Int    First dimension of input arrays.
+C  ni,nj            Int    Grid dimensions in i,j.
+C  nlev             Int    Number of pressure levels.
+C  P(nlev)          Real   Pressure (mb) of each level, in either order.
+C  Theta(nth)       Real   Potential temperature (K) of each surface.
+C  nth              Int    Number of surfaces.
+C  Isen(mni,nj,nth,4)      Real   Pressure (mb), U, V and height on each
+C                                 surface, in that order.
+C  Work(nlev,3)     Real   Work array.
+
+C  Surfaces below the lowest or above the highest potential temperature
+C  of a column, and values from missing (> 99998) input, are set to 1e37.
+
+      Implicit None
+
+      Integer*4 mni,ni,nj,nlev,nth,i,j,k,kn,k0,kd,l,m,n
+      Real*4    T(mni,nj,nlev),U(mni,nj,nlev),V(mni,nj,nlev),
+     -          Z(mni,nj,nlev),P(nlev),Theta(nth),Isen(mni,nj,nth,4),
+     -          Work(nlev,3)
+      Real*4    th,tlo,thi,w,a,b
+      Logical   found
+
+      Real*4    p0,R_cp,Flag,Flg
+      Data      p0,R_cp,Flag,Flg/1000.0,0.286,1e37,99998.0/
+
+c  Factor from temperature to potential temperature and log of pressure
+c  of each level, shared by all columns.
+      Do 5 k=1,nlev
+      Work(k,1)=(p0/P(k))**R_cp
+      Work(k,2)=alog(P(k))
+5     Continue
+
+c  Search the levels from the bottom, the highest pressure.
+      If (P(1).ge.P(nlev)) Then
+          k0=1
+          kd=1
+      Else
+          k0=nlev
+          kd=-1
+      End If
+
+      Do 100 j=1,nj
+      Do 90 i=1,ni
+
+      Do 10 k=1,nlev
+      If (T(i,j,k).lt.Flg) Then
+          Work(k,3)=T(i,j,k)*Work(k,1)
+      Else
+          Work(k,3)=Flag
+      End If
+10    Continue
+
+      Do 80 l=1,nth
+      th=Theta(l)
+      found=.false.
+      k=k0
+      tlo=Work(k,3)
+      Do 20 m=1,nlev-1
+      kn=k+kd
+      thi=Work(kn,3)
+      If (tlo.lt.Flg .and. thi.lt.Flg .and.
+     -    (th-tlo)*(th-thi).le.0.0) Then
+          found=.true.
+          Goto 30
+      End If
+      k=kn
+      tlo=thi
+20    Continue
+
+30    If (.not.found .or. th.gt.Flg) Then
+          Do 35 n=1,4
+35        Isen(i,j,l,n)=Flag
+          Goto 80
+      End If
+
+      If (thi.eq.tlo) Then
+          w=0.0
+      Else
+          w=(th-tlo)/(thi-tlo)
+      End If
+      Isen(i,j,l,1)=exp(Work(k,2)+w*(Work(kn,2)-Work(k,2)))
+
+      a=U(i,j,k)
+      b=U(i,j,kn)
+      If (a.lt.Flg .and. b.lt.Flg) Then
+          Isen(i,j,l,2)=a+w*(b-a)
+      Else
+          Isen(i,j,l,2)=Flag
+      End If
+      a=V(i,j,k)
+      b=V(i,j,kn)
+      If (a.lt.Flg .and. b.lt.Flg) Then
+          Isen(i,j,l,3)=a+w*(b-a)
+      Else
+          Isen(i,j,l,3)=Flag
+      End If
+      a=Z(i,j,k)
+      b=Z(i,j,kn)
+      If (a.lt.Flg .and. b.lt.Flg) Then
+          Isen(i,j,l,4)=a+w*(b-a)
+      Else
+          Isen(i,j,l,4)=Flag
+      End If
+
+80    Continue
+90    Continue
+100   Continue
+
+      Return
+      End
@@ -32,17 +32,23 @@ c
 	integer mni, ni, nj, i, j
 	real p(mni,nj), t(mni,nj), rh(mni,nj)
 	real q(mni,nj)
-        real k,eee
+        real k,eee,EsLut
         real flg,flag
+        include 'esatlut.inc'
         Data flg,flag/99998.0,1e37/
 
         Do 10 j=1,nj
         Do 10 i=1,ni
-        If (p(i,j).gt.flg .or. t(i,j).gt.flg .or. rh(i,j).gt.flg) then
+        If (.not.(p(i,j).le.flg .and. t(i,j).le.flg .and.
+     &      rh(i,j).le.flg)) then
             q(i,j)=flag
         Else
             k=t(i,j)
-            eee=rh(i,j)*exp(28.48859-0.0091379024*k-6106.396/k)
+            If (nlut.gt.0) Then
+                eee=rh(i,j)*6.22*EsLut(k)
+            Else
+                eee=rh(i,j)*exp(28.48859-0.0091379024*k-6106.396/k)
+            End If
             q(i,j)=eee/(p(i,j)-0.001607717*eee)
         End If
 10      Continue
@@ -0,0 +1,198 @@
+      subroutine moisttable(thw0,dthw,p0,dp,np,nthw,tab)
+      implicit none
+
+c#######################################################################
+c
+c Statement of purpose: Tabulates pseudo-moist adiabats for SetMoistLut.
+c Each adiabat is integrated with pseudolift from 1000 mb, where its
+c temperature is the wet bulb potential temperature, up to the top and
+c down to the bottom of the table, in steps of a fifth of the table
+c spacing.
+c
+c Input:
+c
+c  thw0  - wet bulb potential temperature of the first adiabat (K)
+c  dthw  - spacing of the adiabats (K)
+c  p0    - pressure of the first table row (mb)
+c  dp    - pressure spacing of the table rows (mb), 1000 mb must be one
+c          of the rows
+c  np    - number of pressures, at most MXP (201)
+c  nthw  - number of adiabats
+c
+c Output:
+c
+c  tab   - tab(k,j) is the temperature (K) of adiabat j at the pressure
+c          p0-(k-1)*dp.  The table is left unset if np or the 1000 mb
+c          row are out of range.
+c
+c######################################################################
+
+      include 'moistlut.inc'
+
+      integer nsub
+      parameter (nsub=5)
+
+      integer np, nthw, i, j, k0
+      real thw0, dthw, p0, dp, tab(np,nthw)
+      real soln(0:nsub*MXP)
+
+      k0 = nint((p0-1000.0)/dp)+1
+      if (np.gt.MXP .or. k0.lt.1 .or. k0.gt.np) return
+
+      do 20 j= 1,nthw
+         soln(0) = thw0+(j-1)*dthw
+         tab(k0,j) = soln(0)
+         if (k0.lt.np) then
+             call pseudolift(nsub*(np-k0),1000.0,p0-(np-1)*dp,soln)
+             do 10 i= k0+1,np
+                tab(i,j) = soln(nsub*(i-k0))
+   10        continue
+         endif
+         soln(0) = tab(k0,j)
+         if (k0.gt.1) then
+             call pseudolift(nsub*(k0-1),1000.0,p0,soln)
+             do 15 i= 1,k0-1
+                tab(i,j) = soln(nsub*(k0-i))
+   15        continue
+         endif
+   20 continue
+
+      return
+      end
+
+c----------------------------------------------------------------------
+
+      subroutine setmoistlut(tab,np,nthw,thwlo0,dthw,phi0,dp)
+      implicit none
+
+c#######################################################################
+c
+c Statement of purpose: Loads a moist adiabat table made by moisttable,
+c which thetawa, cgp and moistlift then interpolate in instead of
+c integrating each parcel with pseudolift.  nthw=0 removes the table.
+c The table is shared by all callers, this routine should not be called
+c while another thread is using it.
+c
+c######################################################################
+
+      include 'moistlut.inc'
+
+      integer np, nthw, i, j
+      real tab(np,nthw), thwlo0, dthw, phi0, dp
+
+      data nmth/0/
+
+      nmth = 0
+      if (nthw.lt.2 .or. nthw.gt.MXTHW) return
+      if (np.lt.2 .or. np.gt.MXP) return
+      do 10 j= 1,nthw
+         do 10 i= 1,np
+            mtab(i,j) = tab(i,j)
+   10 continue
+      nmp = np
+      thwlo = thwlo0
+      rdth = 1.0/dthw
+      phi = phi0
+      rdp = 1.0/dp
+      nmth = nthw
+
+      return
+      end
+
+c----------------------------------------------------------------------
+
+      logical function malift(tl,pl,p,t)
+      implicit none
+
+c#######################################################################
+c
+c Statement of purpose: Temperature t (K) at pressure p (mb) on the
+c pseudo-moist adiabat through the temperature tl (K) and pressure pl
+c (mb), interpolated from the table loaded by SetMoistLut.  Returns
+c .false., leaving t unset, when there is no table or the parcel lies
+c outside it.
+c
+c######################################################################
+
+      include 'moistlut.inc'
+
+      real tl, pl, p, t
+      real x, fx, fy, c1, c2, cm
+      integer i, k, j1, j2, jm
+
+      malift = .false.
+      if (nmth.eq.0) return
+
+c
+c Adiabats bracketing tl at pl, by bisection on the temperatures of the
+c adiabats interpolated to pl.
+c
+      x = (phi-pl)*rdp
+      i = int(x)
+      if (x.lt.0.0 .or. i.ge.nmp-1) return
+      fx = x-i
+      x = (phi-p)*rdp
+      k = int(x)
+      if (x.lt.0.0 .or. k.ge.nmp-1) return
+
+      j1 = 1
+      j2 = nmth
+      c1 = mtab(i+1,j1)+fx*(mtab(i+2,j1)-mtab(i+1,j1))
+      c2 = mtab(i+1,j2)+fx*(mtab(i+2,j2)-mtab(i+1,j2))
+      if (tl.lt.c1 .or. tl.gt.c2) return
+   10 if (j2-j1.gt.1) then
+          jm = (j1+j2)/2
+          cm = mtab(i+1,jm)+fx*(mtab(i+2,jm)-mtab(i+1,jm))
+          if (cm.gt.tl) then
+              j2 = jm
+              c2 = cm
+          else
+              j1 = jm
+              c1 = cm
+          endif
+          goto 10
+      endif
+      fy = (tl-c1)/(c2-c1)
+
+c
+c Bilinear interpolation at p between the two adiabats.
+c
+      fx = x-k
+      c1 = mtab(k+1,j1)+fx*(mtab(k+2,j1)-mtab(k+1,j1))
+      c2 = mtab(k+1,j2)+fx*(mtab(k+2,j2)-mtab(k+1,j2))
+      t = c1+fy*(c2-c1)
+      malift = .true.
+
+      return
+      end
+
+c----------------------------------------------------------------------
+
+      subroutine moistlift_aray(tstart,pstart,pfinish,tfinish,n)
+      implicit none
+
+c#######################################################################
+c
+c Statement of purpose: Temperature (K) at pfinish (mb) of each parcel
+c lifted pseudo-moist adiabatically from the temperature tstart (K) at
+c pstart (mb).  Uses the table loaded by SetMoistLut when the parcel lies
+c within it and otherwise integrates with pseudolift in 100 steps.
+c
+c######################################################################
+
+      integer n, i
+      real tstart(n), pstart(n), pfinish(n), tfinish(n)
+      real soln(0:100)
+      logical malift
+
+      do 10 i= 1,n
+         if (.not.malift(tstart(i),pstart(i),pfinish(i),tfinish(i)))
+     +       then
+             soln(0) = tstart(i)
+             call pseudolift(100,pstart(i),pfinish(i),soln)
+             tfinish(i) = soln(100)
+         endif
+   10 continue
+
+      return
+      end
@@ -0,0 +1,161 @@
+      Subroutine MoistMulti(p,t,rh,mni,ni,nj,nset,choices,niter,
+     -                      Scalars)
+
+C*  Computes several of the moisture products of pressure, temperature
+C*  and relative humidity in one pass over the grid, sharing the dewpoint
+C*  and saturation vapor pressure between them.  Each product is the same
+C*  as from the routine named below, to within rounding.
+
+C  p(mni,nj)        Real   Pressure (mb).
+C  t(mni,nj)        Real   Temperature (K).
+C  rh(mni,nj)       Real   Relative humidity [range: 0. - 100.]
+C  mni              Int    First dimension of input arrays.
+C  ni,nj            Int    Grid dimensions in i,j.
+C  nset             Int    Number of products.
+C  choices(nset)    Int    The product of each position of Scalars.
+C  niter            Int    Newton steps of the wet-bulb temperature as in
+C                          calctwfx, 0 to iterate as in calctw.
+C  Scalars(mni,nj,nset)    Real   Products, in the order of choices.
+
+C  The choices available are:
+C  choice=1, dewpoint (K), calctd;
+C  choice=2, dewpoint depression (K), calcdpd;
+C  choice=3, mixing ratio (g/kg), mixrat;
+C  choice=4, specific humidity (g/kg), spechum;
+C  choice=5, virtual temperature (K), calctv;
+C  choice=6, equivalent potential temperature (K), calcthetae;
+C  choice=7, condensation pressure (mb), calccondpr;
+C  choice=8, condensation pressure deficit (mb), calccondprdef;
+C  choice=9, wet-bulb temperature (K), calctw.
+C  Any other choice is left unset.
+
+C  The dewpoint and dewpoint depression only need t and rh, the other
+C  products are flagged where any of p, t and rh is missing.
+
+      Implicit None
+
+      Integer*4 mni,ni,nj,nset,choices(nset),niter,i,j,m
+      Integer*4 ktd,kdpd,kmix,kspc,ktv,kthe,kcp,kcpd,ktw
+
+      Real*4    p(mni,nj),t(mni,nj),rh(mni,nj),Scalars(mni,nj,nset)
+      Real*4    k,g,b,rhqc,tdp,tcp,es,esl,eee,w,kth,MyTw,EsLut
+      Logical   bad,badp,wdp,wes
+
+      Real*4    flg,flag,L_cp
+
+      include 'esatlut.inc'
+
+      Data      flg,flag,L_cp/99998.0,1e37,2540/
+
+c  Position of each product in Scalars, 0 when it is not wanted.
+      ktd=0
+      kdpd=0
+      kmix=0
+      kspc=0
+      ktv=0
+      kthe=0
+      kcp=0
+      kcpd=0
+      ktw=0
+      Do 5 m=1,nset
+      If (choices(m).eq.1) ktd=m
+      If (choices(m).eq.2) kdpd=m
+      If (choices(m).eq.3) kmix=m
+      If (choices(m).eq.4) kspc=m
+      If (choices(m).eq.5) ktv=m
+      If (choices(m).eq.6) kthe=m
+      If (choices(m).eq.7) kcp=m
+      If (choices(m).eq.8) kcpd=m
+      If (choices(m).eq.9) ktw=m
+5     Continue
+
+c  Which of the shared intermediates are needed.  The fixed steps of the
+c  wet-bulb temperature are vectorized over chunks of points, so they are
+c  left to calctwfx below.
+      If (niter.gt.0) Then
+          wdp=ktd+kdpd+kthe+kcp+kcpd.gt.0
+      Else
+          wdp=ktd+kdpd+kthe+kcp+kcpd+ktw.gt.0
+      End If
+      wes=ktv+kthe.gt.0 .or. (nlut.eq.0 .and. kmix+kspc.gt.0)
+
+      Do 20 j=1,nj
+      Do 10 i=1,ni
+
+      bad=.not.(rh(i,j).le.flg .and. t(i,j).le.flg)
+      badp=bad .or. .not.p(i,j).le.flg
+
+      If (badp) Then
+          Do 15 m=1,nset
+15        Scalars(i,j,m)=flag
+          If (bad) Goto 10
+      End If
+
+c  Dewpoint, and the temperature at the LCL from it.
+      k=t(i,j)
+      g=0.0091379024*k+6106.396/k
+      If (wdp) Then
+          rhqc=amin1(100.0,amax1(1.0,rh(i,j)))
+          b=g-alog(rhqc/100.0)
+          tdp=(b-sqrt(b*b-223.1986))/0.0182758048
+          If (ktd.gt.0) Scalars(i,j,ktd)=tdp
+          If (kdpd.gt.0) Scalars(i,j,kdpd)=k-tdp
+      End If
+      If (badp) Goto 10
+      If (wdp)
+     -    tcp=tdp-(k-tdp)*(-0.37329638+41.178204/k+0.0015945203*tdp)
+
+c  Wet-bulb temperature, iterated from the dewpoint as in calctw.
+      If (ktw.gt.0 .and. niter.eq.0)
+     -    Scalars(i,j,ktw)=MyTw(k,tdp,p(i,j))
+
+c  Saturation vapor pressure (mb), from the table of SetEsatLut for the
+c  mixing ratio and specific humidity when it is set up.
+      If (wes) es=exp(26.66082-g)
+      If (kmix+kspc.gt.0) Then
+          If (nlut.gt.0) Then
+              esl=EsLut(k)
+          Else
+              esl=es
+          End If
+          eee=rh(i,j)*6.22*esl
+          If (kmix.gt.0)
+     -        Scalars(i,j,kmix)=eee/(p(i,j)-0.001607717*eee)
+          If (kspc.gt.0)
+     -        Scalars(i,j,kspc)=eee/(p(i,j)-0.00060771703*eee)
+      End If
+
+      If (ktv.gt.0)
+     -    Scalars(i,j,ktv)=k*p(i,j)/(p(i,j)-rh(i,j)*0.00378*es)
+
+      If (kcp.gt.0) Scalars(i,j,kcp)=p(i,j)*(tcp/k)**3.498257
+      If (kcpd.gt.0) Scalars(i,j,kcpd)=p(i,j)-p(i,j)*(tcp/k)**3.498257
+
+c  Theta E takes temperatures below 80 as Celsius and limits the relative
+c  humidity to 0.01 rather than 1, recomputing the dewpoint for those.
+      If (kthe.gt.0) Then
+          rhqc=amax1(amin1(100.0,rh(i,j)),0.01)
+          eee=rhqc*0.01*es
+          kth=k
+          If (k.lt.80.0 .or. rhqc.lt.1.0) Then
+              If (k.lt.80.0) Then
+                  kth=k+273.15
+                  eee=rhqc*exp(22.05565-0.0091379024*kth-6106.396/kth)
+              End If
+              b=26.66082-alog(eee)
+              tdp=(b-sqrt(b*b-223.1986))/0.0182758048
+              tcp=tdp-(kth-tdp)*
+     -            (-0.37329638+41.178204/kth+0.0015945203*tdp)
+          End If
+          w=0.622*eee/(p(i,j)-eee)
+          Scalars(i,j,kthe)=kth*exp(w*L_cp/tcp)*(1000/p(i,j))**0.286
+      End If
+
+10    Continue
+20    Continue
+
+      If (ktw.gt.0 .and. niter.gt.0)
+     -    Call CalcTwFx(p,t,rh,mni,ni,nj,Scalars(1,1,ktw),niter)
+
+      Return
+      End
@@ -34,7 +34,7 @@ c
 
         Do 10 j=1,nj
         Do 10 i=1,ni
-        If (p(i,j).gt.flg .or. z(i,j).gt.flg) then
+        If (.not.(p(i,j).le.flg .and. z(i,j).le.flg)) then
             alt(i,j)=flag
         Else
             alt(i,j)=p(i,j)/((T0-gamma*z(i,j))/T0)**g_Rgamma
@@ -82,13 +82,13 @@ c
 
 c
 c Use the Adams four step, 4th order predictor-corrector scheme to 
-c find the rest of the solution.
+c find the rest of the solution, stopping after the n-th step rather
+c than when tt passes finish so that rounding in tt cannot leave soln(n)
+c unset.
 c
  
    60 tt= start+(real(i)*h)
-      if ((start.lt.finish).and.(tt.gt.finish)) return
-      if ((start.gt.finish).and.(tt.lt.finish)) return
-      if (start.eq.finish) return
+      if (i.gt.n) return
       
 c
 c Prediction step.
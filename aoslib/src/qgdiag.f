@@ -0,0 +1,227 @@
+c
+c
+	subroutine qglayer(ztop,zbot,ptop,pbot,dx,dy,f,mni,ni,nj,
+     &                     zmid,grads)
+c
+c..............................................................................
+c
+c	Routine to calculate the geostrophic wind and temperature gradients
+c	and the Q vector through a layer, once, for qgprods.  See qvector.f.
+c
+c	Inputs/Outputs:
+c
+c	   Variable     Var Type     I/O   Description
+c	  ----------   ----------   ----- -------------
+c	    ztop, zbot     RA         I    Heights of the top and bottom of
+c	                                   the layer (m asl).
+c	    ptop, pbot     R          I    Pressures of ztop and zbot (mb).
+c	    dx, dy         RA         I    Grid interval in x, y (meters).
+c	    f              RA         I    Coriolis parameter (/sec).
+c	    mni            I          I    First dimension of the arrays.
+c	    ni, nj         I          I    Grid dimension in x, y.
+c	    zmid           RA         I    Work array.
+c	    grads          RA         O    dugdx, dugdy, dvgdx, dvgdy, dtdx,
+c	                                   dtdy, qx and qy, in that order.
+c
+c..............................................................................
+c
+	implicit none
+	integer mni, ni, nj
+	real ptop, pbot
+	real ztop(mni,nj), zbot(mni,nj), dx(mni,nj), dy(mni,nj)
+	real f(mni,nj), zmid(mni,nj), grads(mni,nj,8)
+c
+	call qvector(zmid,ztop,zbot,ptop,pbot,mni,ni,nj,dx,dy,f,
+     &               grads(1,1,1),grads(1,1,3),grads(1,1,2),
+     &               grads(1,1,4),grads(1,1,5),grads(1,1,6),
+     &               grads(1,1,7),grads(1,1,8))
+	return
+	end
+c
+c
+	subroutine qglevel(z,t,p,dx,dy,f,mni,ni,nj,grads)
+c
+c..............................................................................
+c
+c	Routine to calculate the geostrophic wind and temperature gradients
+c	and the Q vector on a single level, once, for qgprods.  See
+c	slqvect.f.
+c
+c	Inputs/Outputs:
+c
+c	   Variable     Var Type     I/O   Description
+c	  ----------   ----------   ----- -------------
+c	    z              RA         I    Height field for the level (meters).
+c	                                   Overwritten when smoothing.
+c	    t              RA         I    Temperature field for the level (K).
+c	                                   Overwritten when smoothing.
+c	    p              R          I    Pressure of level (mb).
+c	    dx, dy         RA         I    Grid interval in x, y (meters).
+c	    f              RA         I    Coriolis parameter (/sec).
+c	    mni            I          I    First dimension of the arrays.
+c	    ni, nj         I          I    Grid dimension in x, y.
+c	    grads          RA         O    dugdx, dugdy, dvgdx, dvgdy, dtdx,
+c	                                   dtdy, slqx and slqy, in that order.
+c
+c..............................................................................
+c
+	implicit none
+	integer mni, ni, nj
+	real p
+	real z(mni,nj), t(mni,nj), dx(mni,nj), dy(mni,nj)
+	real f(mni,nj), grads(mni,nj,8)
+c
+	call slqvect(z,t,p,dx,dy,f,mni,ni,nj,grads(1,1,7),grads(1,1,8),
+     &               grads(1,1,1),grads(1,1,2),grads(1,1,3),
+     &               grads(1,1,4),grads(1,1,5),grads(1,1,6))
+	return
+	end
+c
+c
+	subroutine qgprods(grads,dx,dy,f,fscale,mni,ni,nj,nset,choices,
+     &                     prods,vx,vy)
+c
+c..............................................................................
+c
+c	Routine to derive several QG products from the gradients computed
+c	by qglayer or qglevel, without computing the gradients again.  Each
+c	product is the same as from the routine given below.
+c
+c	Inputs/Outputs:
+c
+c	   Variable     Var Type     I/O   Description
+c	  ----------   ----------   ----- -------------
+c	    grads          RA         I    Output of qglayer or qglevel.
+c	    dx, dy         RA         I    Grid interval in x, y (meters).
+c	    f              RA         I    Coriolis parameter (/sec).
+c	    fscale         R          I    Frontogenesis factor, 2 for a layer
+c	                                   and 2*(1000/p)**0.286 for a level.
+c	    mni            I          I    First dimension of the arrays.
+c	    ni, nj         I          I    Grid dimension in x, y.
+c	    nset           I          I    Number of products.
+c	    choices        IA         I    Product of each output:
+c	                                    1, 2  Q vector x, y components;
+c	                                    3     Q divergence (qdiverg);
+c	                                    4, 5  Qn x, y components;
+c	                                    6     Qn divergence (fndiverg);
+c	                                    7, 8  Qs x, y components;
+c	                                    9     Qs divergence (fsdiverg);
+c	                                   10     frontogenesis (frontogen,
+c	                                          slfront).
+c	    prods          RA         O    Products, in the order of choices.
+c	    vx, vy         RA         I    Work arrays.
+c
+c	User Notes:
+c
+c	1. Products are flagged with 1e37 where missing.  Other choices are
+c	   left unset.
+c
+c..............................................................................
+c
+	implicit none
+	integer mni, ni, nj, nset, choices(nset)
+	real fscale
+	real grads(mni,nj,8), dx(mni,nj), dy(mni,nj), f(mni,nj)
+	real prods(mni,nj,nset), vx(mni,nj), vy(mni,nj)
+c
+	integer i, j, k, kp(10)
+	real flag, bad, tempgrad
+	parameter(flag = 1.e37)
+c
+	bad = 1.e6 - 2.
+c
+c.... Position of each product in prods, 0 when it is not wanted.
+c
+	do 1 k=1,10
+	  kp(k) = 0
+1	continue
+	do 2 k=1,nset
+	  if (choices(k).ge.1 .and. choices(k).le.10)
+     &      kp(choices(k)) = k
+2	continue
+c
+c.... The Q vector and its divergence.
+c
+	do 10 j=1,nj
+	do 10 i=1,ni
+	  if (kp(1).gt.0) prods(i,j,kp(1)) = grads(i,j,7)
+	  if (kp(2).gt.0) prods(i,j,kp(2)) = grads(i,j,8)
+10	continue
+	if (kp(3).gt.0)
+     &    call G2Gkinematics(grads(1,1,7),grads(1,1,8),f,dx,dy,
+     &                       mni,nj,ni,nj,2,prods(1,1,kp(3)))
+c
+c.... Component of the Q vector normal to the isotherms.
+c
+	if (kp(4).gt.0 .or. kp(5).gt.0 .or. kp(6).gt.0) then
+	  do 20 j=1,nj
+	  do 20 i=1,ni
+	    if (grads(i,j,7).gt.bad .or. grads(i,j,8).gt.bad .or.
+     &          grads(i,j,5).gt.bad .or. grads(i,j,6).gt.bad) then
+	      vx(i,j) = flag
+	      vy(i,j) = flag
+	    else
+	      tempgrad = grads(i,j,5)**2+grads(i,j,6)**2
+	      if (tempgrad .lt. 1.e-15) then
+	        vx(i,j) = grads(i,j,7)
+	        vy(i,j) = grads(i,j,8)
+	      else
+	        tempgrad = (grads(i,j,7)*grads(i,j,5) +
+     &                      grads(i,j,8)*grads(i,j,6))/tempgrad
+	        vx(i,j) = grads(i,j,5)*tempgrad
+	        vy(i,j) = grads(i,j,6)*tempgrad
+	      endif
+	    endif
+	    if (kp(4).gt.0) prods(i,j,kp(4)) = vx(i,j)
+	    if (kp(5).gt.0) prods(i,j,kp(5)) = vy(i,j)
+20	  continue
+	  if (kp(6).gt.0)
+     &      call G2Gkinematics(vx,vy,f,dx,dy,mni,nj,ni,nj,2,
+     &                         prods(1,1,kp(6)))
+	endif
+c
+c.... Component of the Q vector along the isotherms.
+c
+	if (kp(7).gt.0 .or. kp(8).gt.0 .or. kp(9).gt.0) then
+	  do 30 j=1,nj
+	  do 30 i=1,ni
+	    if (grads(i,j,7).gt.bad .or. grads(i,j,8).gt.bad .or.
+     &          grads(i,j,5).gt.bad .or. grads(i,j,6).gt.bad) then
+	      vx(i,j) = flag
+	      vy(i,j) = flag
+	    else
+	      tempgrad = grads(i,j,5)**2+grads(i,j,6)**2
+	      if (tempgrad .lt. 1.e-15) then
+	        vx(i,j) = grads(i,j,7)
+	        vy(i,j) = grads(i,j,8)
+	      else
+	        tempgrad = (grads(i,j,7)*grads(i,j,6) -
+     &                      grads(i,j,8)*grads(i,j,5))/tempgrad
+	        vx(i,j) =   grads(i,j,6) *tempgrad
+	        vy(i,j) = (-grads(i,j,5))*tempgrad
+	      endif
+	    endif
+	    if (kp(7).gt.0) prods(i,j,kp(7)) = vx(i,j)
+	    if (kp(8).gt.0) prods(i,j,kp(8)) = vy(i,j)
+30	  continue
+	  if (kp(9).gt.0)
+     &      call G2Gkinematics(vx,vy,f,dx,dy,mni,nj,ni,nj,2,
+     &                         prods(1,1,kp(9)))
+	endif
+c
+c.... Frontogenesis.
+c
+	if (kp(10).gt.0) then
+	  do 40 j=1,nj
+	  do 40 i=1,ni
+	    if (grads(i,j,7).gt.bad .or. grads(i,j,8).gt.bad .or.
+     &          grads(i,j,5).gt.bad .or. grads(i,j,6).gt.bad) then
+	      prods(i,j,kp(10)) = flag
+	    else
+	      prods(i,j,kp(10)) = (grads(i,j,7)*grads(i,j,5) +
+     &                               grads(i,j,8)*grads(i,j,6))*fscale
+	    endif
+40	  continue
+	endif
+	return
+	end
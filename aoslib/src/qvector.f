@@ -67,11 +67,18 @@ c
         Integer*4 passes
         Real*4    smoothness
         Common /qsmthcmn/passes,smoothness
+        Integer*4 npass
+        Real*4    wgt
 	parameter(flag = 1.e37)
 
 	data g/9.806/
         data bad/99998./
 c
+c---- Use one copy of the smoothing settings from setqsmooth for the whole
+c---- call, another thread may change them.
+        npass = passes
+        wgt = smoothness
+c
 c---- Step 1:
 c---- Compute the "mean layer" geostrophic wind components at each grid point,
 c---- using the mean height between the two levels.  
@@ -87,12 +94,12 @@ c
  102    continue
 
 c smooth heights and calculate components of the geostrophic wind.
-        Do i=1,passes/2
-           call smooth(zmid,qx,mni,ni,nj,smoothness)
-           call smooth(qx,zmid,mni,ni,nj,smoothness)
+        Do i=1,npass/2
+           call smooth(zmid,qx,mni,ni,nj,wgt)
+           call smooth(qx,zmid,mni,ni,nj,wgt)
         EndDo
-        if (iand(passes,1).eq.1) then
-            call smooth(zmid,qx,mni,ni,nj,smoothness)
+        if (iand(npass,1).eq.1) then
+            call smooth(zmid,qx,mni,ni,nj,wgt)
             call DgeoComps(qx,f,dx,dy,mni,nj,ni,nj,
      &                     dugdx,dugdy,dvgdx,dvgdy)
         else
@@ -121,12 +128,12 @@ c---- Step 4:
 c---- Smooth and compute the gradient of the quantity computed in step 3 above.
 c---- (f is just a place holder)
 c
-        Do i=1,passes/2
-           call smooth(qx,qy,mni,ni,nj,smoothness)
-           call smooth(qy,qx,mni,ni,nj,smoothness)
+        Do i=1,npass/2
+           call smooth(qx,qy,mni,ni,nj,wgt)
+           call smooth(qy,qx,mni,ni,nj,wgt)
         EndDo
-        if (iand(passes,1).eq.1) then
-            call smooth(qx,qy,mni,ni,nj,smoothness)
+        if (iand(npass,1).eq.1) then
+            call smooth(qx,qy,mni,ni,nj,wgt)
             call G2Gkinematics(dtdx,dtdy,f,dx,dy,mni,nj,ni,nj,7,qy)
         else
             call G2Gkinematics(dtdx,dtdy,f,dx,dy,mni,nj,ni,nj,7,qx)
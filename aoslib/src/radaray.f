@@ -0,0 +1,70 @@
+      Subroutine Radiation_Aray(Lat,Lng,Lsm,Hr,Bext,Od,Day,Dec,Erv,Eqt,
+     -                          SolRad,n,nd)
+
+C*  Mean solar radiation at the ground (W/m**2) as from RADIATION, for n
+C*  points at once.  The solar declination, earth-sun distance factor and
+C*  equation of time only depend on the day, so they are given once for
+C*  each of nd days, and the sine and cosine of the declination are only
+C*  recomputed where the day changes from one point to the next.
+
+C  Lat(n)           Real   Latitude (degrees).
+C  Lng(n)           Real   Longitude (degrees).
+C  Lsm(n)           Real   Longitude of standard meridian (degrees).
+C  Hr(n)            Real   Local standard time (decimal hours).
+C  Bext(n)          Real   Rayleigh extinction coefficient.
+C  Od(n)            Real   Optical depth.
+C  Day(n)           Real   Number (1 to nd) of the day of each point.
+C  Dec(nd)          Real   Solar declination (radians), see SOLDEC.
+C  Erv(nd)          Real   Earth-sun distance factor, see RADNORM.
+C  Eqt(nd)          Real   Equation of time (radians), see TIMEQ.
+C  SolRad(n)        Real   Mean solar radiation at ground (W/m**2).
+
+C  Points with values > 99998 in any input, or a day outside 1 to nd,
+C  are set to 1e37.
+
+      Implicit None
+
+      Integer*4 n,nd,i,k,klast
+      Real*4    Lat(n),Lng(n),Lsm(n),Hr(n),Bext(n),Od(n),Day(n),
+     -          Dec(nd),Erv(nd),Eqt(nd),SolRad(n)
+      Real*4    rlat,hrangle,coszen,sdec,cdec,timcorr,hour,hetrhz,
+     -          hetrdn,PI,RPD,RPH,SC,AVGTIM,Flag,Flg
+
+      Parameter (PI=3.14159265)
+      Data      SC,AVGTIM/1353.,0.083333333/
+      Data      Flag,Flg/1e37,99998.0/
+
+      RPD=PI/180.
+      RPH=PI/12.
+      klast=0
+
+      Do 10 i=1,n
+      k=0
+      If (Day(i).lt.Flg) k=nint(Day(i))
+      If (.not.(Lat(i).lt.Flg .and. Lng(i).lt.Flg .and.
+     -          Lsm(i).lt.Flg .and. Hr(i).lt.Flg .and.
+     -          Bext(i).lt.Flg .and. Od(i).lt.Flg) .or.
+     -    k.lt.1 .or. k.gt.nd) Then
+          SolRad(i)=Flag
+          Goto 10
+      End If
+      If (k.ne.klast) Then
+          sdec=sin(Dec(k))
+          cdec=cos(Dec(k))
+          klast=k
+      End If
+      rlat=Lat(i)*RPD
+      hrangle=(Hr(i)-12.)*RPH
+      coszen=sin(rlat)*sdec+cos(rlat)*cdec*cos(hrangle)
+      If (coszen.le.0.0) Then
+          SolRad(i)=0.0
+      Else
+          timcorr=(Lng(i)-Lsm(i))/15.+Eqt(k)/RPH
+          hour=Hr(i)-timcorr
+          Call ETRAVG(SC*Erv(k),rlat,Dec(k),hour,AVGTIM,hetrhz,hetrdn)
+          SolRad(i)=hetrhz*exp((-Bext(i))*(Od(i)/coszen))
+      End If
+10    Continue
+
+      Return
+      End
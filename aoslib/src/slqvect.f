@@ -49,20 +49,27 @@ c
         Integer*4 passes
         Real*4    smoothness
         Common   /qsmthcmn/passes,smoothness
+        Integer*4 npass
+        Real*4    wgt
 
 	Data bad/99998./
 c
+c---- Use one copy of the smoothing settings from setqsmooth for the whole
+c---- call, another thread may change them.
+        npass = passes
+        wgt = smoothness
+c
 c.....	Compute the temperature to potential temperature ratio for this level.
         t2th=(1000.0/p)**0.286
 c
 c.....	Smooth heights, compute the geostrophic wind components for this level.
 c....   (store components in slqx and slqy)
-        Do i=1,passes/2
-           call smooth(z,slqx,mni,ni,nj,smoothness)
-           call smooth(slqx,z,mni,ni,nj,smoothness)
+        Do i=1,npass/2
+           call smooth(z,slqx,mni,ni,nj,wgt)
+           call smooth(slqx,z,mni,ni,nj,wgt)
         EndDo
-        if (iand(passes,1).eq.1) then
-            call smooth(z,slqx,mni,ni,nj,smoothness)
+        if (iand(npass,1).eq.1) then
+            call smooth(z,slqx,mni,ni,nj,wgt)
             call DgeoComps(slqx,coriolis,dx,dy,mni,nj,ni,nj,
      &                     dugdx,dugdy,dvgdx,dvgdy)
         else
@@ -75,12 +82,12 @@ c        call G2Gkinematics(dugdx,dugdy,coriolis,dx,dy,mni,nj,ni,nj,7,slqx)
 c        call G2Gkinematics(dvgdx,dvgdy,coriolis,dx,dy,mni,nj,ni,nj,7,slqy)
 
 c... Smooth temps, then compute dT/dx and dT/dy.  (coriolis just place holder)
-        Do i=1,passes/2
-           call smooth(t,slqy,mni,ni,nj,smoothness)
-           call smooth(slqy,t,mni,ni,nj,smoothness)
+        Do i=1,npass/2
+           call smooth(t,slqy,mni,ni,nj,wgt)
+           call smooth(slqy,t,mni,ni,nj,wgt)
         EndDo
-        if (iand(passes,1).eq.1) then
-            call smooth(t,slqy,mni,ni,nj,smoothness)
+        if (iand(npass,1).eq.1) then
+            call smooth(t,slqy,mni,ni,nj,wgt)
             call G2Gkinematics(dtdx,dtdy,coriolis,dx,dy,
      &                         mni,nj,ni,nj,7,slqy)
         else
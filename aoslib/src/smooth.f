@@ -101,3 +101,172 @@ c ----------------
 
         RETURN
 	END
+
+
+	SUBROUTINE SMOOTHN (INPUT,OUTPUT,WORK,NBAD,MNX,IX,IY,NZ,WGTS,
+	1		    NPASS)
+
+C	Applies NPASS passes of the SMOOTH filter, with weights WGTS,
+C	  to each of the NZ levels of INPUT.  The result is the same as
+C	  calling SMOOTH once for each weight, but the passes are run
+C	  together in one sweep along the second dimension: pass P
+C	  smooths column J-P+1 as soon as pass P-1 has produced column J,
+C	  so each column is still in cache when the next pass needs it.
+C	  WORK holds the last three columns of each pass but the last
+C	  and NBAD counts their missing values, pass 0 being the input.
+C	  Columns next to none skip the flag tests.
+
+      Implicit None
+c declare formal arguments
+      integer mnx, ix, iy, nz, npass
+      REAL    INPUT(MNX,IY,NZ), OUTPUT(MNX,IY,NZ)
+      REAL    WORK(MNX,3,NPASS), WGTS(NPASS)
+      INTEGER NBAD(3,0:NPASS)
+c
+	REAL 	FLG
+	INTEGER I,J,JJ,K,P,SM,S,SP
+	LOGICAL CLEAN
+	DATA	FLG/99998./
+
+	IF (NPASS.LT.1) RETURN
+	IF (IX.LT.2 .OR. IY.LT.2) THEN
+	  DO K=1,NZ
+	    DO J=1,IY
+	      DO I=1,IX
+		OUTPUT(I,J,K)=INPUT(I,J,K)
+	      END DO
+	    END DO
+	  END DO
+	  RETURN
+	END IF
+
+	DO K=1,NZ
+	  DO JJ=1,IY+NPASS
+	    IF (JJ.LE.IY) THEN
+	      S=MOD(JJ-1,3)+1
+	      NBAD(S,0)=0
+	      DO I=1,IX
+		IF (INPUT(I,JJ,K).GT.FLG) NBAD(S,0)=NBAD(S,0)+1
+	      END DO
+	    END IF
+	    DO P=1,NPASS
+	      J=JJ-P
+	      IF (J.GE.1 .AND. J.LE.IY) THEN
+		SM=MOD(J+1,3)+1
+		S=MOD(J-1,3)+1
+		SP=MOD(J,3)+1
+		CLEAN=NBAD(S,P-1).EQ.0
+		IF (J.GT.1) CLEAN=CLEAN .AND. NBAD(SM,P-1).EQ.0
+		IF (J.LT.IY) CLEAN=CLEAN .AND. NBAD(SP,P-1).EQ.0
+		IF (P.EQ.1 .AND. P.EQ.NPASS) THEN
+		  CALL SMTHCOL(INPUT(1,MAX(J-1,1),K),INPUT(1,J,K),
+	1		       INPUT(1,MIN(J+1,IY),K),OUTPUT(1,J,K),
+	1		       IX,J,IY,WGTS(P),CLEAN)
+		ELSE IF (P.EQ.1) THEN
+		  CALL SMTHCOL(INPUT(1,MAX(J-1,1),K),INPUT(1,J,K),
+	1		       INPUT(1,MIN(J+1,IY),K),WORK(1,S,P),
+	1		       IX,J,IY,WGTS(P),CLEAN)
+		ELSE IF (P.EQ.NPASS) THEN
+		  CALL SMTHCOL(WORK(1,SM,P-1),WORK(1,S,P-1),
+	1		       WORK(1,SP,P-1),OUTPUT(1,J,K),
+	1		       IX,J,IY,WGTS(P),CLEAN)
+		ELSE
+		  CALL SMTHCOL(WORK(1,SM,P-1),WORK(1,S,P-1),
+	1		       WORK(1,SP,P-1),WORK(1,S,P),
+	1		       IX,J,IY,WGTS(P),CLEAN)
+		END IF
+		IF (P.LT.NPASS) THEN
+		  NBAD(S,P)=0
+		  DO I=1,IX
+		    IF (WORK(I,S,P).GT.FLG) NBAD(S,P)=NBAD(S,P)+1
+		  END DO
+		END IF
+	      END IF
+	    END DO
+	  END DO
+	END DO
+
+        RETURN
+	END
+
+
+	SUBROUTINE SMTHCOL (AM,A,AP,B,IX,J,IY,SMTH,CLEAN)
+
+C	One SMOOTH pass over column J of IY, from the columns AM, A and
+C	  AP at J-1, J and J+1 into B.  With CLEAN none of the three
+C	  columns has missing values and the flag tests are skipped.
+
+      Implicit None
+      integer ix, j, iy
+      REAL    AM(IX), A(IX), AP(IX), B(IX), SMTH
+      LOGICAL CLEAN
+c
+	REAL 	FLG
+	INTEGER IP,I,IM
+	DATA	FLG/99998./
+      real   SMTH1, SMTH2, SMTH3, SMTH4, SMTH5, sum1, sum2
+
+	SMTH1 = 0.25 * SMTH * SMTH
+	SMTH2 = 0.5  * SMTH * (1.-SMTH)
+	SMTH3 = (1.-SMTH) * (1.-SMTH)
+	SMTH4 = (1.-SMTH)
+	SMTH5 = 0.5 * SMTH
+
+	IF (J.EQ.1 .OR. J.EQ.IY) THEN
+	  B(1)=A(1)
+	  B(IX)=A(IX)
+	  DO I=2,IX-1
+	    IM=I-1
+	    IP=I+1
+	    IF (.NOT.CLEAN .AND. (A(I).GT.FLG .OR.
+	1	A(IP).GT.FLG .OR. A(IM).GT.FLG)) THEN
+		B(I)=A(I)
+	    ELSE
+		B(I) = SMTH4* A(I)
+	1	     + SMTH5 * (A(IM) + A(IP))
+	    END IF
+	  END DO
+	  RETURN
+	END IF
+
+	DO I=1,IX,IX-1
+	  IF (.NOT.CLEAN .AND. (A(I).GT.FLG .OR.
+	1     AM(I).GT.FLG .OR. AP(I).GT.FLG)) THEN
+	    B(I)=A(I)
+	  ELSE
+	    B(I) = SMTH4* A(I)
+	1	 + SMTH5 * (AM(I) + AP(I))
+	  END IF
+	END DO
+
+	IF (CLEAN) THEN
+	  DO I=2,IX-1
+	    SUM1 = AP(I-1) + AM(I-1)
+	1	 + AP(I+1) + AM(I+1)
+	    SUM2 = AP(I) + A(I+1)
+	1	 + AM(I) + A(I-1)
+	    B(I) = SMTH1*SUM1 + SMTH2*SUM2 + SMTH3*A(I)
+	  END DO
+	  RETURN
+	END IF
+
+	DO I=2,IX-1
+	  IM=I-1
+	  IP=I+1
+	  IF (A(I).GT.FLG .OR.
+	1     AP(IP).GT.FLG .OR. AM(IM).GT.FLG .OR.
+	1     AM(IP).GT.FLG .OR. AP(IM).GT.FLG .OR.
+	1     AP(I).GT.FLG .OR. AM(I).GT.FLG .OR.
+	1     A(IP).GT.FLG .OR. A(IM).GT.FLG) THEN
+	    B(I)=A(I)
+	  ELSE
+	    SUM1 = AP(IM) + AM(IM)
+	1	 + AP(IP) + AM(IP)
+	    SUM2 = AP(I) + A(IP)
+	1	 + AM(I) + A(IM)
+	    B(I) = SMTH1*SUM1 + SMTH2*SUM2 + SMTH3*A(I)
+	  END IF
+	END DO
+
+        RETURN
+	END
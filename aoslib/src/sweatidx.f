@@ -42,9 +42,9 @@ c
 
         Do 10 j=1,nj
         Do 10 i=1,ni
-        If (tt(i,j).gt.flg .or. td8(i,j).gt.flg .or.
-     &      u8(i,j).gt.flg .or. v8(i,j).gt.flg .or.
-     &      u5(i,j).gt.flg .or. v5(i,j).gt.flg) Then
+        If (.not.(tt(i,j).le.flg .and. td8(i,j).le.flg .and.
+     &      u8(i,j).le.flg .and. v8(i,j).le.flg .and.
+     &      u5(i,j).le.flg .and. v5(i,j).le.flg)) Then
             q(i,j)=flag
         Else
             s8 = sqrt(u8(i,j)*u8(i,j)+v8(i,j)*v8(i,j))
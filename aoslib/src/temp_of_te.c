@@ -2,62 +2,63 @@
 #include "meteoLib.h"
 #include <stdio.h>
 #include <math.h>
+#include <pthread.h>
 
 /* This routine calculates the saturation tempurature of an equivalent
    temperature at given pressure using the adiabatic definition */
 
+#define TMIN 193
+#define TMAX 333
+#define NVAL (1+TMAX-TMIN)
+
+/* Lookup table of Te's of T from TMIN to TMAX K at 7 pressures, built by
+   build_table on the first call of temp_of_te.  pthread_once makes threads
+   making their first call at the same time wait for the table to be
+   complete, and makes its values visible to them. */
+static float TeData[7*NVAL];
+static pthread_once_t TeOnce = PTHREAD_ONCE_INIT;
+
+/* Equivalent temperature as from adiabatic_te, but always with the exact
+   saturation vapor pressure formula.  The lookup table is built with it so
+   that it does not keep the table of SetEsatLut in use when it is built. */
+static float table_te(float temp, float press)
+    {
+    float e = exp(26.660820-0.0091379024*temp-6106.396/temp);
+    e = 0.622*e/(press-e);
+    return temp*exp(2740.0*e/temp);
+    }
+
+static void build_table(void)
+    {
+    static const float plev[7] = {1000,850,700,600,500,350,200};
+    int i,k;
+
+    for (k=0; k<7; k++)
+        for (i=0; i<NVAL; i++)
+            TeData[k*NVAL+i] = table_te(TMIN+i,plev[k]);
+    }
+
 float FTN_MANGLE (temp_of_te_) (float * te, float * press)
     {
-    static const int tmin = 193;
-    static const int tmax = 333;
-    static const int nval = 1+333-193;  // 1 + tmax - tmin (vars. replaced)
-    static float TeData[7*141];     // replace 141 by nval
-    static float * Te1000 = 0;
-    static float * Te850 = 0;
-    static float * Te700 = 0;
-    static float * Te600 = 0;
-    static float * Te500 = 0;
-    static float * Te350 = 0;
-    static float * Te200 = 0;
+    static const int tmin = TMIN;
+    static const int tmax = TMAX;
+    static const int nval = NVAL;
+    float * Te1000 = TeData-tmin;
+    float * Te850 = Te1000+nval;
+    float * Te700 = Te850+nval;
+    float * Te600 = Te700+nval;
+    float * Te500 = Te600+nval;
+    float * Te350 = Te500+nval;
+    float * Te200 = Te350+nval;
     float * TeLookup;
     float base;
-    float t,p,t1,t2,d,d1,d2,w;
+    float t,t1,t2,d,d1,d2,w;
     int i;
 
 /*  int diag = (*te>243 && *te<243.05 && *press>394.9 && *press<395); */
 
-    /* very first time, construct lookup table Te's of T from 193 to 343 K */
-    if (Te1000==0)
-        {
-        Te1000 = TeData-tmin;
-        Te850 = Te1000+nval;
-        Te700 = Te850+nval;
-        Te600 = Te700+nval;
-        Te500 = Te600+nval;
-        Te350 = Te500+nval;
-        Te200 = Te350+nval;
-        p = 1000;
-        for (t=tmin; t<=tmax; t+=1)
-             Te1000[(int)t] = adiabatic_te(&t,&p);
-        p = 850;
-        for (t=tmin; t<=tmax; t+=1)
-             Te850[(int)t] = adiabatic_te(&t,&p);
-        p = 700;
-        for (t=tmin; t<=tmax; t+=1)
-             Te700[(int)t] = adiabatic_te(&t,&p);
-        p = 600;
-        for (t=tmin; t<=tmax; t+=1)
-             Te600[(int)t] = adiabatic_te(&t,&p);
-        p = 500;
-        for (t=tmin; t<=tmax; t+=1)
-             Te500[(int)t] = adiabatic_te(&t,&p);
-        p = 350;
-        for (t=tmin; t<=tmax; t+=1)
-             Te350[(int)t] = adiabatic_te(&t,&p);
-        p = 200;
-        for (t=tmin; t<=tmax; t+=1)
-             Te200[(int)t] = adiabatic_te(&t,&p);
-        }
+    /* very first time, construct lookup table Te's of T from 193 to 333 K */
+    pthread_once(&TeOnce, build_table);
 
     /* find correct table, check for beyond bounds of table */
     if (*press<=250)
@@ -150,6 +151,9 @@ float FTN_MANGLE (temp_of_te_) (float * te, float * press)
         d = adiabatic_te(&t,press) - *te;
         }
 /*  if (diag) printf("t,i %.2f %d\n",t,i); */
+    /* with a coarse table of SetEsatLut adiabatic_te need not increase
+       with temperature and the iteration can fail */
+    if (!(t>0 && t<1e30)) return 1e37;
     return t;
 
     }
@@ -0,0 +1,159 @@
+c
+c     Array versions of the scalar thermodynamic functions esat, tdofesat,
+c     dmixr, pottemp and thetawa and of the LCL routines tplcl and tpzlcl.
+c     Each routine applies the scalar function to every element of a one
+c     dimensional array so that a whole grid can be processed in a single
+c     call.  Multi-dimensional grids are passed in flattened.
+c
+      subroutine esat_aray(t,es,n)
+c
+c..... Saturation vapor pressure (mb) of each element of t (C or K).
+c
+      implicit none
+      integer n, i
+      real t(n), es(n)
+      real esat
+c
+      do 1 i=1,n
+        es(i) = esat(t(i))
+1     continue
+c
+      return
+      end
+
+
+      subroutine tdofesat_aray(es,td,n)
+c
+c..... Dewpoint (K) of each saturation vapor pressure (mb) in es.
+c
+      implicit none
+      integer n, i
+      real es(n), td(n)
+      real tdofesat
+c
+      do 1 i=1,n
+        td(i) = tdofesat(es(i))
+1     continue
+c
+      return
+      end
+
+
+      subroutine dmixr_aray(temp,pres,iw,w,n)
+c
+c..... Mixing ratio (g/kg) with respect to water (iw > 0) or ice (iw < 0)
+c..... for each temperature (K) and pressure (mb) pair.
+c
+      implicit none
+      integer n, iw, i
+      real temp(n), pres(n), w(n)
+      real dmixr
+c
+      do 1 i=1,n
+        w(i) = dmixr(temp(i),pres(i),iw)
+1     continue
+c
+      return
+      end
+
+
+      subroutine pottemp_aray(temp,dwpt,pres,iw,theta,n)
+c
+c..... Potential temperature for each temperature, dewpoint and pressure
+c..... triple.  See pottemp.f.
+c
+      implicit none
+      integer n, iw, i
+      real temp(n), dwpt(n), pres(n), theta(n)
+      real pottemp
+c
+      do 1 i=1,n
+        theta(i) = pottemp(temp(i),dwpt(i),pres(i),iw)
+1     continue
+c
+      return
+      end
+
+
+      subroutine thetawa_aray(temp,dwpt,pres,iw,thetaw,n)
+c
+c..... Adiabatic wet bulb potential temperature for each temperature,
+c..... dewpoint and pressure triple.  Elements for which thetawa fails are
+c..... set to -999.0.  See thetawa.f.
+c
+      implicit none
+      integer n, iw, i, ier
+      real temp(n), dwpt(n), pres(n), thetaw(n)
+      real thetawa
+c
+      do 1 i=1,n
+        thetaw(i) = thetawa(temp(i),dwpt(i),pres(i),iw,ier)
+1     continue
+c
+      return
+      end
+
+
+      subroutine tplcl_aray(temp,dwpt,pres,tl,pl,ier,n)
+c
+c..... Temperature (K) and pressure (mb) of the lifting condensation level
+c..... for each temperature and dewpoint (C) and pressure (mb) triple,
+c..... with the status ier of tplcl.  Elements with a missing input
+c..... (> 99998 or NaN) or for which tplcl fails are set to 1e37.  See
+c..... tplcl.f.
+c
+      implicit none
+      integer n, i, ier(n)
+      real temp(n), dwpt(n), pres(n), tl(n), pl(n)
+      real flg, flag
+      parameter (flg=99998.0, flag=1e37)
+c
+      do 1 i=1,n
+        tl(i) = flag
+        pl(i) = flag
+        ier(i) = -1
+        if (.not.(temp(i).le.flg .and. dwpt(i).le.flg .and.
+     &      pres(i).le.flg)) goto 1
+        call tplcl(temp(i),dwpt(i),pres(i),tl(i),pl(i),ier(i))
+        if (ier(i).lt.0) then
+          tl(i) = flag
+          pl(i) = flag
+        end if
+1     continue
+c
+      return
+      end
+
+
+      subroutine tpzlcl_aray(temp,dwpt,pres,iw,tl,pl,zl,ier,n)
+c
+c..... Temperature (K) and pressure (mb) of the lifting condensation level
+c..... and the distance to it (m) for each temperature and dewpoint (K) and
+c..... pressure (mb) triple, with the status ier of tpzlcl.  iw > 0 for
+c..... mixing ratios with respect to water, < 0 with respect to ice.
+c..... Elements with a missing input (> 99998 or NaN) or for which tpzlcl
+c..... fails are set to 1e37.  See tpzlcl.f.
+c
+      implicit none
+      integer n, iw, i, ier(n)
+      real temp(n), dwpt(n), pres(n), tl(n), pl(n), zl(n)
+      real flg, flag
+      parameter (flg=99998.0, flag=1e37)
+c
+      do 1 i=1,n
+        tl(i) = flag
+        pl(i) = flag
+        zl(i) = flag
+        ier(i) = -1
+        if (.not.(temp(i).le.flg .and. dwpt(i).le.flg .and.
+     &      pres(i).le.flg)) goto 1
+        call tpzlcl(temp(i),dwpt(i),pres(i),iw,tl(i),pl(i),zl(i),ier(i))
+        if (ier(i).lt.0) then
+          tl(i) = flag
+          pl(i) = flag
+          zl(i) = flag
+        end if
+1     continue
+c
+      return
+      end
@@ -32,6 +32,7 @@ c
       integer n
       parameter (n=100)
       real soln(0:n)
+      logical malift
       
 c
 c Calculate the temperature, pressure and height at the lifting 
@@ -46,8 +47,10 @@ c
       
 c
 c Calculate the adiabatic wet bulb potential temperature by bringing
-c the parcel down pseudo-moist adiabatically from the LCL to 1000 mb.
+c the parcel down pseudo-moist adiabatically from the LCL to 1000 mb,
+c from the moist adiabat table when one has been loaded by SetMoistLut.
 c
+      if (malift(tl,pl,1000.0,thetawa)) return
       call pseudolift(n,pl,1000.0,soln)
       thetawa = soln(n)
       
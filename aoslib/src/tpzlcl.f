@@ -38,7 +38,9 @@ C
 C Function declarations
 C      
 
-      real pottemp, dmixr
+      real pottemp, dmixr, tlclfix
+
+      include 'twfix.inc'
       
 c
 c Set up some parameters. 
@@ -62,6 +64,14 @@ c Use Newton's method to iteratively solve for the temperature
 c at the LCL. 
 c
 
+c With a fixed number of steps set by SetTwFix, solve from the first guess
+c of Bolton's equation 15 instead.
+
+      if (ntwfix.gt.0) then
+          dtl = tlclfix(tk,tdk,ntwfix)
+          goto 20
+      endif
+
       tlold = tdk
    10 fprime = (.001266/tlold) - (1.d0/(tlold**2))
       dtl = (1.0/tlold) - (1.0/tdk) + (.001266*log(tlold/tdk)) 
@@ -71,19 +81,20 @@ c
 c      
 c If we have converged to a solution, compute the pressure at and
 c the lifting distance to the LCL and return, otherwise iterate again.
+c The iteration is in single precision, whose resolution near 300 K is
+c about 3e-5, so it converges to within 1e-4 K.
 c
 
-      if (abs(dtl-tlold).le.1.0d-8) then
-          tlold = 1.0d0/(.2854*(1.0-(.28d-3*dmixr(tdk,pinit,iw))))
-          pl = p0 / ((theta/dtl)**tlold) 
-          tl = dtl
-          zl = (tk-tl)*1005.7/9.80665
-          ier = 1
-          return
-      else
-          tlold = dtl
-          i= i+1
-          if (i.lt.20) goto 10
-      endif
+      if (abs(dtl-tlold).le.1.0e-4) goto 20
+      tlold = dtl
+      i= i+1
+      if (i.lt.20) goto 10
       return  
+
+   20 tlold = 1.0d0/(.2854*(1.0-(.28d-3*dmixr(tdk,pinit,iw))))
+      pl = p0 / ((theta/dtl)**tlold) 
+      tl = dtl
+      zl = (tk-tl)*1005.7/9.80665
+      ier = 1
+      return
       end
@@ -36,7 +36,7 @@ c
 
         Do 10 j=1,nj
         Do 10 i=1,ni
-        If (q(i,j).gt.flg .or. tv(i,j).gt.flg) then
+        If (.not.(q(i,j).le.flg .and. tv(i,j).le.flg)) then
             t(i,j)=flag
         Else
             t(i,j)=tv(i,j)/(1+0.000608*q(i,j))
@@ -0,0 +1,132 @@
+      Subroutine SetTwFix(niter)
+
+C*  Selects a fixed number of Newton steps for the LCL temperature found by
+C*  tpzlcl, and so for thetawa and cgp, in place of iterating until the
+C*  step falls below 1e-8 K.  niter=0 selects the convergence test again.
+
+C  The setting is shared by all callers, this routine should not be called
+C  while another thread is using it.
+
+      Implicit None
+
+      include 'twfix.inc'
+
+      Integer*4 niter
+
+      Data      ntwfix/0/
+
+      ntwfix=max0(niter,0)
+      Return
+      End
+
+
+      Subroutine CalcTwFx(p,t,rh,mni,ni,nj,tw,niter)
+
+C*  Wet-bulb temperature (K) from pressure (mb), temperature (K) and
+C*  relative humidity (%) as in calctw, but taking niter Newton steps at
+C*  every point instead of stopping each point as it converges.
+
+C  The grid is processed in chunks of a column of NCH points, each step
+C  being a loop over the chunk without branches or early exits, so that
+C  the compiler can vectorize it and the run time does not depend on the
+C  data.  From the first guess of MyTw three steps match its 1e-5
+C  relative convergence test, to within 0.001 K.  The saturation vapor
+C  pressures always use the exact formula, not the table of SetEsatLut.
+
+      Implicit None
+
+      Integer*4 mni,ni,nj,niter
+      Real*4    p(mni,nj),t(mni,nj),rh(mni,nj),tw(mni,nj)
+
+      Integer*4 NCH
+      Parameter (NCH=256)
+      Integer*4 i,j,i0,n,m,l
+      Real*4    k(NCH),kd(NCH),kw(NCH),fp(NCH),ed(NCH),spec(NCH),
+     &          act(NCH)
+      Real*4    ew,e,de,s,q,b,rhqc,kdx
+      Logical   bad(NCH),one(NCH)
+      Real*4    f,c0,c1,c2,kt,flg,flag
+      Data      f,c0,c1,c2/0.0006355,26.66082,0.0091379024,6106.3960/
+      Data      flg,flag/99998.0,1e37/
+
+C  Temperature below which the vapor pressure is under exp(-50), where
+C  MyTw raises the dewpoint in steps of 10 K.
+      Data      kt/80.4/
+
+      Do 100 j=1,nj
+      Do 100 i0=1,ni,NCH
+      n=min0(NCH,ni-i0+1)
+
+C  Dewpoint, special cases and first guess.
+      Do 10 m=1,n
+      i=i0+m-1
+      bad(m)=.not.(rh(i,j).le.flg .and. t(i,j).le.flg .and.
+     &             p(i,j).le.flg)
+      k(m)=merge(300.0,t(i,j),bad(m))
+      rhqc=amin1(100.0,amax1(1.0,rh(i,j)))
+      b=0.0091379024*k(m)+6106.396/k(m)-alog(rhqc/100.0)
+      kd(m)=(b-sqrt(amax1(b*b-223.1986,0.0)))/0.0182758048
+      e=c0-c1*k(m)-c2/k(m)
+      one(m)=kd(m).ge.k(m) .or. k(m).lt.100 .or. e.gt.10.0
+      spec(m)=merge(k(m),(k(m)+kd(m))/2,
+     &              k(m).lt.100 .and. kd(m).lt.k(m))
+      ew=exp(amin1(e,10.0))
+      kdx=kd(m)
+      If (kd(m).lt.kt) kdx=kd(m)+10*aint((kt-kd(m))/10+1)
+      ed(m)=exp(c0-c1*kdx-c2/kdx)
+      fp(m)=p(i,j)*f
+      s=(ew-ed(m))/merge(1.0,k(m)-kdx,one(m))
+      kw(m)=(k(m)*fp(m)+kdx*s)/(fp(m)+s)
+      act(m)=merge(0.0,1.0,one(m))
+10    Continue
+
+C  Newton steps on the balance of MyTw, esat(Kw)=ed+fp*(K-Kw), taken in
+C  logarithms: log(esat) is close to linear in Kw, so the steps converge
+C  from much further away than on the vapor pressures themselves, and
+C  need no exponential.  Points where the vapor pressure leaves the range
+C  of MyTw keep their last value as there, act being 0 for them.
+      Do 30 l=1,niter
+      Do 20 m=1,n
+      e=c0-c1*kw(m)-c2/kw(m)
+      act(m)=merge(0.0,act(m),e.lt.-50.0 .or. e.gt.10.0)
+      q=amax1(ed(m)+fp(m)*(k(m)-kw(m)),1e-30)
+      de=e-alog(q)
+      s=c2/(kw(m)*kw(m))-c1+fp(m)/q
+      kw(m)=kw(m)-act(m)*de/s
+20    Continue
+30    Continue
+
+      Do 40 m=1,n
+      i=i0+m-1
+      tw(i,j)=merge(spec(m),kw(m),one(m))
+      If (bad(m)) tw(i,j)=flag
+40    Continue
+100   Continue
+
+      Return
+      End
+
+
+      Real*4 Function TLclFix(tk,tdk,niter)
+
+C*  Temperature (K) of the LCL of a parcel at tk with dewpoint tdk (K),
+C*  solving Bolton's (1980) equation 14 as tpzlcl does, but from the first
+C*  guess of his equation 15 and with a fixed niter Newton steps.  The
+C*  first guess is within 0.1 K, so two steps reach the precision of the
+C*  convergence test of tpzlcl.
+
+      Implicit None
+
+      Integer*4 niter,l
+      Real*4    tk,tdk,tl,fprime,dtl
+
+      tl=1.0/(1.0/(tdk-56.0)+alog(tk/tdk)/800.0)+56.0
+      Do 10 l=1,niter
+      fprime=(.001266/tl)-(1.d0/(tl**2))
+      dtl=(1.0/tl)-(1.0/tdk)+(.001266*log(tl/tdk))
+     &    -(.000514*log(tk/tdk))
+      tl=tl-(dtl/fprime)
+10    Continue
+      TLclFix=tl
+      Return
+      End
@@ -0,0 +1,132 @@
+      Subroutine VIPlan(P,m1,m2,lfirst,ncol,nlvls,Levels,nt,Kidx,Wgt,
+     -                  Work)
+
+C*  Plans the interpolation of columns of data, on the pressures P, to
+C*  the pressure levels Levels, linearly in log(p) as pvalue does.  For
+C*  each column and level the plan holds the index k of the pair of
+C*  adjacent pressures, k and k+1, bracketing the level and the weight of
+C*  the second of them, so that VIApply can interpolate any number of
+C*  fields on the same pressures without searching them again.
+
+C  P(m1,m2)         Real   Pressure (mb), levels along the first dimension
+C                          (m1 levels of m2 columns) if lfirst is not 0,
+C                          otherwise along the second (m1 columns of m2
+C                          levels).  The levels can be in either order.
+C  lfirst           Int    Whether the levels are along the first
+C                          dimension.
+C  ncol             Int    Number of columns.
+C  nlvls(ncol)      Int    Number of valid levels of each column.
+C  Levels(nt)       Real   Pressure (mb) of each level to interpolate to.
+C  nt               Int    Number of levels to interpolate to.
+C  Kidx(ncol,nt)    Int    Index of the first pressure of each bracket,
+C                          0 where the level is not bracketed.
+C  Wgt(ncol,nt)     Real   Weight of the second pressure of each bracket.
+C  Work(*)          Real   Work array of the number of levels.
+
+C  Where a level lies between more than one pair of pressures the first
+C  pair is used.  Pressures > 99998 are missing and do not bracket levels.
+
+      Implicit None
+
+      Integer*4 m1,m2,lfirst,ncol,nt,nlvls(ncol),Kidx(ncol,nt)
+      Real*4    P(m1,m2),Levels(nt),Wgt(ncol,nt),Work(*)
+      Integer*4 i,k,l,n
+      Real*4    q,plo,phi,Flg
+      Data      Flg/99998.0/
+
+      Do 100 i=1,ncol
+      n=nlvls(i)
+
+c  Log of the pressures of the column, Flg where they are missing.
+      Do 10 k=1,n
+      If (lfirst.ne.0) Then
+          q=P(k,i)
+      Else
+          q=P(i,k)
+      End If
+      If (q.gt.0.0 .and. q.lt.Flg) Then
+          Work(k)=alog(q)
+      Else
+          Work(k)=Flg
+      End If
+10    Continue
+
+      Do 50 l=1,nt
+      Kidx(i,l)=0
+      Wgt(i,l)=0.0
+      If (.not.(Levels(l).gt.0.0 .and. Levels(l).lt.Flg)) Goto 50
+      q=alog(Levels(l))
+      Do 20 k=1,n-1
+      plo=Work(k)
+      phi=Work(k+1)
+      If (plo.lt.Flg .and. phi.lt.Flg .and.
+     -    (q-plo)*(q-phi).le.0.0) Then
+          Kidx(i,l)=k
+          If (phi.ne.plo) Wgt(i,l)=(q-plo)/(phi-plo)
+          Goto 50
+      End If
+20    Continue
+50    Continue
+100   Continue
+
+      Return
+      End
+
+
+      Subroutine VIApply(A,m1,m2,lfirst,ncol,Kidx,Wgt,nt,Out,o1,o2)
+
+C*  Interpolates columns of data to the levels of a plan made by VIPlan
+C*  for the pressures of the data.
+
+C  A(m1,m2)         Real   Data, with the layout of the pressures given to
+C                          VIPlan.
+C  lfirst           Int    Whether the levels are along the first
+C                          dimension of A and Out.
+C  ncol             Int    Number of columns.
+C  Kidx(ncol,nt)    Int    Bracket indices from VIPlan.
+C  Wgt(ncol,nt)     Real   Bracket weights from VIPlan.
+C  nt               Int    Number of levels interpolated to.
+C  Out(o1,o2)       Real   Data on the levels, (nt,ncol) if lfirst is
+C                          not 0, otherwise (ncol,nt).
+
+C  Levels which are not bracketed, and those bracketed by missing
+C  (> 99998) data, are set to 1e37.
+
+      Implicit None
+
+      Integer*4 m1,m2,lfirst,ncol,nt,o1,o2,Kidx(ncol,nt)
+      Real*4    A(m1,m2),Wgt(ncol,nt),Out(o1,o2)
+      Integer*4 i,k,l
+      Real*4    a1,a2,v,Flag,Flg
+      Data      Flag,Flg/1e37,99998.0/
+
+      If (lfirst.ne.0) Then
+          Do 20 i=1,ncol
+          Do 10 l=1,nt
+          k=Kidx(i,l)
+          v=Flag
+          If (k.gt.0) Then
+              a1=A(k,i)
+              a2=A(k+1,i)
+              If (a1.lt.Flg .and. a2.lt.Flg) v=a1+Wgt(i,l)*(a2-a1)
+          End If
+          Out(l,i)=v
+10        Continue
+20        Continue
+      Else
+          Do 40 l=1,nt
+          Do 30 i=1,ncol
+          k=Kidx(i,l)
+          v=Flag
+          If (k.gt.0) Then
+              a1=A(i,k)
+              a2=A(i,k+1)
+              If (a1.lt.Flg .and. a2.lt.Flg) v=a1+Wgt(i,l)*(a2-a1)
+          End If
+          Out(i,l)=v
+30        Continue
+40        Continue
+      End If
+
+      Return
+      End
@@ -1,5 +1,11 @@
 """ Unit tests for aoslib.py """
 
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
 import numpy as np
 from numpy.testing import assert_allclose
 
@@ -9,6 +15,43 @@ verbose = 1
 ATOL = 1e-3     # default absolute tolerence
 
 
+def test_lazy_import():
+    # A new interpreter, in which aoslib has not been imported yet.
+    code = "\n".join([
+        "import sys",
+        "import aoslib",
+        "assert 'aoslib.awips' not in sys.modules",
+        "assert 'aoslib._awips' not in sys.modules",
+        "assert aoslib.__version__",
+        "assert abs(aoslib.esat(300.) - 35.33) < 0.01",
+        "assert 'aoslib._awips' in sys.modules",
+        "assert aoslib.calctd is aoslib.awips.calctd",
+        "assert 'calctd2' in dir(aoslib) and 'calctd2' in aoslib.__all__",
+        "assert 'np' not in aoslib.__all__ and 'os' not in aoslib.__all__",
+        "namespace = {}",
+        "exec('from aoslib import *', namespace)",
+        "assert 'set_workers' in namespace and 'ThreadPool' not in namespace",
+        "try:",
+        "    aoslib.no_such_routine",
+        "except AttributeError:",
+        "    pass",
+        "else:",
+        "    raise AssertionError('no AttributeError')",
+    ])
+    if verbose:
+        print("lazy import:")
+    assert _run_python(code) == 0
+
+
+def _run_python(code):
+    """ Exit status of `code` run by a new Python process. """
+    path = os.path.dirname(os.path.dirname(os.path.abspath(aoslib.__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([path] + [
+        p for p in [env.get('PYTHONPATH')] if p])
+    return subprocess.call([sys.executable, '-c', code], env=env)
+
+
 def test_calctd():
     t = [[300., 299.], [199., 200.], [99, 100.]]
     rh = [[50.0, 50.0], [50.0, 50.0], [50., 50.]]
@@ -33,6 +76,180 @@ def test_calctd():
     assert_allclose(aoslib.calctd(t, rh, ni=1), one_row, atol=ATOL)
 
 
+def test_grid_broadcast():
+    t = np.array([[300., 299.], [199., 200.], [99, 100.]])
+    rh = np.array([[50.0, 40.0], [30.0, 20.0], [60., 70.]])
+    p = np.array([1000., 850., 700., 500.])
+    t3 = np.array([t, t + 1., t + 2., t + 3.])
+    rh3 = np.array([rh, rh, rh, rh])
+    p3 = p[:, np.newaxis, np.newaxis]
+    if verbose:
+        print("grid_broadcast:")
+        print(aoslib.calctd(t3, rh3))
+        print(aoslib.mixrat(p3, t3, rh))
+
+    td = aoslib.calctd(t3, rh3)
+    w = aoslib.mixrat(p3, t3, rh)
+    assert td.shape == (4, 3, 2)
+    assert w.shape == (4, 3, 2)
+    for k in range(4):
+        assert_allclose(td[k], aoslib.calctd(t3[k], rh), atol=ATOL)
+        pk = np.empty_like(t)
+        pk[...] = p[k]
+        assert_allclose(w[k], aoslib.mixrat(pk, t3[k], rh), atol=ATOL)
+    t4 = t3[np.newaxis]
+    assert aoslib.calctd(t4, 50.).shape == (1, 4, 3, 2)
+    assert_allclose(aoslib.calctd(t4, 50.)[0, 0],
+                    aoslib.calctd(t, np.ones_like(t) * 50.), atol=ATOL)
+    assert aoslib.add_by_cnst(np.ones((2, 2, 2)), 2.).shape == (2, 2, 2)
+    assert aoslib.calctd(np.empty((0, 3, 2)), 50.).shape == (0, 3, 2)
+
+
+def test_copy_mode():
+    t = np.array([[300., 299., 298.], [199., 200., 201.]], dtype='float32')
+    rh = np.array([[50.0, 40.0, 30.0], [20.0, 60., 70.]], dtype='float32')
+    expected = aoslib.calctd(t, rh)
+    if verbose:
+        print("copy_mode:")
+    with aoslib.copy_mode('raise', transposed=True):
+        td = aoslib.calctd(t, rh)
+        assert td.flags.c_contiguous
+        assert_allclose(td, expected, atol=ATOL)
+        assert_allclose(aoslib.calctd(t[np.newaxis], rh), expected[np.newaxis],
+                        atol=ATOL)
+        np.testing.assert_raises(aoslib.CopyError, aoslib.calctd,
+                                 t.astype('float64'), rh)
+        np.testing.assert_raises(ValueError, aoslib.calctd, t, rh, ni=1)
+    with aoslib.copy_mode('raise'):
+        np.testing.assert_raises(aoslib.CopyError, aoslib.calctd, t, rh)
+        aoslib.calctd(np.asfortranarray(t), np.asfortranarray(rh))
+        aoslib.esat(t)
+    previous = aoslib.set_copy_mode('warn')
+    try:
+        import warnings
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            aoslib.calctd(t, rh)
+            assert len(w) == 2
+            assert issubclass(w[0].category, aoslib.CopyWarning)
+            del w[:]
+            aoslib.calctd(np.asfortranarray(t), np.float32(50.))
+            assert len(w) == 1
+            assert str(w[0].message).endswith('(float32, broadcast)')
+    finally:
+        aoslib.set_copy_mode(*previous)
+    assert_allclose(aoslib.calctd(t, rh), expected, atol=ATOL)
+
+
+def test_instrumentation():
+    t = np.array([[300., 299., 298.], [199., 200., 1e37]])
+    rh = np.array([[50.0, 40.0, 30.0], [20.0, 60., 70.]], dtype='float32',
+                  order='F')
+    expected = aoslib.calctd(t, rh)
+    if verbose:
+        print("instrumentation:")
+    aoslib.reset_call_stats()
+    assert not aoslib.set_instrumentation(True)
+    try:
+        with aoslib.instrumentation() as stats:
+            assert_allclose(aoslib.calctd(t, rh), expected, rtol=0)
+            aoslib.esat(t)
+        aoslib.calctd(t, rh)
+    finally:
+        assert aoslib.set_instrumentation(False)
+    aoslib.calctd(t, rh)
+    assert sorted(stats) == ['calctd', 'esat']
+    record = stats['calctd']
+    assert record['calls'] == record['kernel_calls'] == 1
+    assert record['elements'] == 2 * t.size
+    assert record['copies'] == 1 and record['bytes_copied'] == 4 * t.size
+    assert record['missing'] == 1
+    assert record['time'] >= record['kernel_time'] + record['conversion_time']
+    assert stats['esat']['missing'] == 1
+    session = aoslib.call_stats()
+    assert session['calctd']['calls'] == 2
+    assert session['esat'] == stats['esat']
+    aoslib.reset_call_stats()
+    assert aoslib.call_stats() == {}
+
+
+def test_instrumentation_common():
+    x = np.arange(20.)[:, np.newaxis] * 4.e4 + np.zeros(15)
+    z = 5500. + 50. * np.sin(x / 3.e5)
+    t = 260. + 5. * np.cos(x / 4.e5)
+    dx = np.ones((20, 15)) * 4.e4
+    f = np.ones((20, 15)) * 1.e-4
+    expected = aoslib.slfront(z, t, 500., dx, dx, f)
+    if verbose:
+        print("instrumentation_common:")
+    # slfront and qg_level read the smoothing passes from a COMMON block.
+    with aoslib.instrumentation() as stats:
+        assert_allclose(aoslib.slfront(z, t, 500., dx, dx, f), expected,
+                        rtol=0)
+        level = aoslib.qg_level(z, t, 500., dx, dx, f)
+    assert_allclose(aoslib.qg_diagnostics(level, ['frontogenesis'])[
+        'frontogenesis'], expected, rtol=0)
+    assert stats['slfront']['kernel_calls'] >= 1
+    assert stats['qg_level']['kernel_calls'] >= 1
+
+
+def test_missing():
+    t = np.array([[300., np.nan, 300.], [1.e37, 290., 290.]])
+    rh = np.ma.masked_array([[50., 50., 50.], [50., 50., 60.]],
+                            mask=[[0, 0, 1], [0, 0, 0]])
+    expected = aoslib.calctd([[300.]], [[50.]])[0, 0]
+    flagged = aoslib.calctd(t, rh)
+    if verbose:
+        print("missing:")
+        print(flagged)
+    assert np.all(flagged[[0, 0, 1], [1, 2, 0]] > 1.e36)
+    td = aoslib.calctd(t, rh, missing='nan')
+    assert_allclose(td[0, 0], expected)
+    assert np.all(np.isnan(td) == (flagged > 1.e36))
+    td = aoslib.calctd(t, rh, missing='mask')
+    assert np.all(td.mask == (flagged > 1.e36))
+    assert_allclose(td[1].compressed(), flagged[1, 1:])
+    td = aoslib.calctd(t[np.newaxis], rh[np.newaxis], missing='mask')
+    assert td.shape == (1, 2, 3) and td.mask.sum() == 3
+    es = aoslib.esat(np.ma.masked_array([300., 300.], mask=[0, 1]),
+                     missing='mask')
+    assert es.mask.tolist() == [False, True]
+    assert np.isnan(aoslib.esat(np.nan, missing='nan'))
+    assert aoslib.esat(1.e37, missing='mask') is np.ma.masked
+    np.testing.assert_raises(ValueError, aoslib.calctd, t, rh,
+                             missing='none')
+
+
+def test_missing_routines():
+    tw = aoslib.thetawa([30., np.nan, 1.e37], 20., 700., 1, missing='nan')
+    if verbose:
+        print("missing routines:")
+        print(tw)
+    assert_allclose(tw[0], aoslib.thetawa(30., 20., 700., 1), rtol=1e-6)
+    assert np.isnan(tw[1:]).all()
+    a = np.ma.masked_array(np.ones((6, 6)), mask=np.zeros((6, 6)))
+    a[2, 3] = np.ma.masked
+    smoothed = aoslib.smooth(a, [0.5, -0.5], missing='mask')
+    assert smoothed.mask[2, 3] and smoothed.mask.sum() == 1
+    ones = np.ones((6, 6))
+    fgen = aoslib.slfront(ones * 5000., ones * 250., 500., ones * 4.e4,
+                          ones * 4.e4, ones * 1.e-4, missing='nan')
+    assert np.isnan(fgen[0]).all() and not np.isnan(fgen[1:-1, 1:-1]).any()
+    dugdx = aoslib.dgeocomps(ones, ones, ones, ones, missing='mask')[0]
+    assert dugdx.mask[0].all() and not dugdx.mask[1:-1, 1:-1].any()
+    p = np.array([1000., 850., 700., 500., 300.])
+    t = np.array([290., 280., 270., 255., 230.])
+    ht = np.array([100., 1500., 3000., 5600., 9200.])
+    pfrz, hfrz = aoslib.frzlev_batch(100., [p, p[:1].repeat(5)],
+                                     [ht, ht], [t, t],
+                                     nlvls=[5, 1], missing='nan')
+    assert not np.isnan(pfrz[0]) and np.isnan(pfrz[1])
+    for func, args in [(aoslib.smooth, (ones, 0.5)),
+                       (aoslib.dgeocomps, (ones, ones, ones, ones))]:
+        np.testing.assert_raises(TypeError, func, *args, mode=1)
+        np.testing.assert_raises(ValueError, func, *args, missing='none')
+
+
 def test_calctd2():
     p = [[1000., 950.], [925., 975.], [960., 1020.]]
     t = [[300., 299.], [199., 200.], [99, 100.]]
@@ -1124,6 +1341,64 @@ def test_timeq():
     assert_allclose(tq, test_out, rtol=1e-06)
 
 
+def test_sun_arrays():
+    jd = np.array([[300, 365, 1], [182, 90, 300]])
+
+    rd = aoslib.radnorm(jd)
+    sd = aoslib.soldec(jd)
+    tq = aoslib.timeq(jd)
+
+    if verbose:
+        print("sun arrays:")
+        print(rd)
+        print(sd)
+        print(tq)
+
+    assert rd.shape == jd.shape
+    for i, day in np.ndenumerate(jd):
+        assert rd[i] == aoslib.radnorm(day)
+        assert sd[i] == aoslib.soldec(day)
+        assert tq[i] == aoslib.timeq(day)
+
+    # Missing days
+    sd = aoslib.soldec(np.ma.masked_array([1, 2, 1e37], mask=[0, 1, 0]),
+                       missing='nan')
+    assert sd[0] == aoslib.soldec(1)
+    assert np.isnan(sd[1:]).all()
+
+
+def test_radiation():
+    lat = np.linspace(20., 50., 200).reshape(-1, 1)
+    lng = np.linspace(-120., -70., 200)
+    jd = np.array([80, 80, 172, 355]).reshape(-1, 1, 1)
+    hr = np.array([3., 12., 15., 9.5]).reshape(-1, 1, 1)
+
+    sr = aoslib.radiation(lat, lng, -90., jd, hr, 0.1, 1.)
+
+    if verbose:
+        print("radiation:")
+        print(sr[:, ::50, ::50])
+
+    assert sr.shape == (4, 200, 200)
+    # Night
+    assert (sr[0] == 0).all()
+    assert (sr[1:] > 0).all()
+    for i in [(1, 0, 0), (2, 120, 37), (3, 199, 199)]:
+        assert_allclose(sr[i], aoslib.radiation(lat[i[1], 0], lng[i[2]], -90.,
+                                                jd[i[0], 0, 0],
+                                                hr[i[0], 0, 0], 0.1, 1.),
+                        rtol=1e-6)
+
+    # Sun overhead at the equinox without extinction
+    sr = aoslib.radiation(0., -90., -90., 80, 12., 0., 1.)
+    assert_allclose(sr, 1353. * aoslib.radnorm(80), rtol=0.01)
+
+    sr = aoslib.radiation([0., 1e37, np.nan], 0., 0., [80, 80, 80],
+                          12., 0.1, 1., missing='nan')
+    assert sr[0] > 0
+    assert np.isnan(sr[1:]).all()
+
+
 def test_esat():
     tk = np.array([300., 299., 320., 230., 274., 275.], dtype='float32')
     tc = tk - 273.15
@@ -1145,6 +1420,10 @@ def test_esat():
 
     assert_allclose(satk, test_out, atol=ATOL)
     assert_allclose(satc, test_out, atol=ATOL)
+    assert_allclose(aoslib.esat(tk), test_out, atol=ATOL)
+    assert_allclose(aoslib.esat(tc), test_out, atol=ATOL)
+    assert aoslib.esat(tk).dtype == 'float32'
+    assert aoslib.esat(tk.reshape(2, 3)).shape == (2, 3)
 
 
 def test_tdofesat():
@@ -1166,6 +1445,7 @@ def test_tdofesat():
         print(td)
 
     assert_allclose(td, test_out, atol=ATOL)
+    assert_allclose(aoslib.tdofesat(es), test_out, atol=ATOL)
 
 
 def test_pottemp():
@@ -1193,6 +1473,9 @@ def test_pottemp():
         print(pti)
     assert_allclose(ptw, test_ptw, atol=ATOL)
     assert_allclose(pti, test_pti, atol=ATOL)
+    assert_allclose(aoslib.pottemp(temp, dwpt, pres, 1), test_ptw, atol=ATOL)
+    assert_allclose(aoslib.pottemp(temp, dwpt, pres, -1), test_pti,
+                    atol=ATOL)
 
 
 def test_thetawa():
@@ -1203,9 +1486,11 @@ def test_thetawa():
     ptw = np.zeros_like(temp)
     pti = np.zeros_like(temp)
     test_ptw = np.array([297.34692383, 304.38040161, 227.4776001,
-                        201.44902039, -999.,   32.94946289], dtype='float32')
+                        201.44902039, 100.16052246, 32.94946289],
+                        dtype='float32')
     test_pti = np.array([297.35095215, 304.37991333, 227.4776001,
-                         201.44902039, -999., 32.94946289], dtype='float32')
+                         201.44902039, 100.16052246, 32.94946289],
+                        dtype='float32')
 
     it = np.nditer(temp, flags=['c_index'])
     while not it.finished:
@@ -1220,6 +1505,563 @@ def test_thetawa():
         print(pti)
     assert_allclose(ptw, test_ptw, atol=ATOL)
     assert_allclose(pti, test_pti, atol=ATOL)
+    assert_allclose(aoslib.thetawa(temp, dwpt, pres, 1), test_ptw, atol=ATOL)
+    assert_allclose(aoslib.thetawa(temp, dwpt, pres, -1), test_pti,
+                    atol=ATOL)
+    # The LCL iteration only fails for unphysical dewpoints.
+    assert aoslib.thetawa(300., 0., 850., 1) == -999.
+    assert aoslib.thetawa(300., 600., 850., 1) == -999.
+
+
+def test_elementwise():
+    # broadcasting against scalars
+    t = np.array([[301., 280.], [290., 250.]], dtype='float32')
+    res = aoslib.dmixr(t, 1000, 1)
+    assert res.shape == (2, 2)
+    assert res.dtype == 'float32'
+    assert_allclose(res[0], [24.23381233, 6.23040009], atol=ATOL)
+    assert_allclose(aoslib.dmixr(t, [1000., 500.], 1)[:, 0],
+                    [aoslib.dmixr(301., 1000, 1), aoslib.dmixr(290., 1000, 1)],
+                    atol=ATOL)
+
+    # dtype of the input is preserved
+    assert aoslib.esat(t.astype('float64')).dtype == 'float64'
+
+    # out parameter
+    out = np.zeros((2, 2), dtype='float32')
+    res = aoslib.pottemp(t, t - 5, 500., 1, out=out)
+    assert res is out
+    assert_allclose(out, aoslib.pottemp(t, t - 5, 500., 1))
+    out = np.zeros((2, 2), dtype='float64')
+    assert aoslib.esat(t, out=out) is out
+    assert_allclose(out, aoslib.esat(t), rtol=1e-6)
+
+
+def test_out():
+    t = np.array([[300., 299.], [199., 200.], [99, 100.]])
+    rh = np.array([[50.0, 40.0], [30.0, 20.0], [60., 70.]])
+    expected = aoslib.calctd(t, rh)
+    if verbose:
+        print("out:")
+
+    # Fortran ordered float32 arrays are filled in place
+    out = np.zeros((3, 2), dtype='float32', order='F')
+    assert aoslib.calctd(t, rh, out=out) is out
+    assert_allclose(out, expected, atol=ATOL)
+    out[2] = -1.
+    aoslib.calctd(t, rh, ni=2, out=out)
+    assert_allclose(out[2], [-1., -1.])
+
+    # other arrays receive a copy of the result
+    out = np.zeros((3, 2))
+    assert aoslib.calctd(t, rh, out=out) is out
+    assert_allclose(out, expected, atol=ATOL)
+    out = np.zeros((2, 3, 2), dtype='float32')
+    assert aoslib.add_by_cnst(np.ones((2, 3, 2)), 2., out=out) is out
+    assert_allclose(out, 3.)
+
+    # stencil routines with reused work arrays
+    z = 5500. + np.arange(30.).reshape(6, 5) ** 1.5
+    dx = np.ones((6, 5)) * 4.e4
+    f = np.ones((6, 5)) * 1.e-4
+    expected = aoslib.qdiverg(z, z + 2000., z - 2000., 400., 700., dx, dx, f)
+    out = np.zeros((6, 5), dtype='float32', order='F')
+    work = [np.zeros((6, 5), dtype='float32', order='F') for i in range(7)]
+    for i in range(2):
+        res = aoslib.qdiverg(z, z + 2000., z - 2000., 400., 700., dx, dx, f,
+                             out=out, work=work)
+        assert res is out
+        assert_allclose(out, expected)
+    assert_allclose(aoslib.smooth(z, 0.5, out=out), aoslib.smooth(z, 0.5))
+    np.testing.assert_raises(ValueError, aoslib.slfront, z, z, 500., dx, dx,
+                             f, work=work[:2])
+
+    # batched soundings
+    p = [1000., 900., 800., 700., 500., 300.]
+    ht = [100., 990., 1950., 3010., 5570., 9160.]
+    tk = [300., 293., 287., 281., 265., 240.]
+    td = [295., 287., 275., 265., 245., 220.]
+    expected = aoslib.capecin(p, ht, tk, td)
+    out = [np.zeros(1, dtype='float32') for i in range(8)]
+    work = np.zeros((7, 7), dtype='float32', order='F')
+    res = aoslib.capecin(p, ht, tk, td, out=out, work=work)
+    for r, o, e in zip(res, out, expected):
+        assert r is o
+        assert_allclose(o, e)
+
+
+def test_threads():
+    import threading
+    p = np.linspace(1000., 700., 400).reshape(40, 10)
+    t = np.linspace(300., 280., 400).reshape(40, 10)
+    rh = np.linspace(90., 40., 400).reshape(40, 10)
+    t5 = np.ones((40, 10)) * 265.
+    expected = aoslib.calcli(p, t, rh, t5)
+    tw = aoslib.calctw(p, t, rh)
+    if verbose:
+        print("threads:")
+
+    results = [None] * 8
+
+    def run(k):
+        rows = slice(5 * k, 5 * k + 5)
+        results[k] = (aoslib.calcli(p[rows], t[rows], rh[rows], t5[rows]),
+                      aoslib.calctw(p[rows], t[rows], rh[rows]))
+
+    threads = [threading.Thread(target=run, args=(k, )) for k in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert_allclose(np.vstack([r[0] for r in results]), expected)
+    assert_allclose(np.vstack([r[1] for r in results]), tw)
+
+
+def test_parallel():
+    p = np.linspace(1000., 700., 40000).reshape(200, 200)
+    t = np.linspace(300., 280., 40000).reshape(200, 200)
+    rh = np.linspace(90., 40., 40000).reshape(200, 200)
+    z = 5500. + (np.arange(200.) ** 1.5)[:, np.newaxis] + np.arange(200.)
+    dx = np.ones((200, 200)) * 4.e4
+    f = np.ones((200, 200)) * 1.e-4
+    expected = [aoslib.calctw(p, t, rh), aoslib.calctw(p, t, rh, ni=50),
+                aoslib.esat(t), aoslib.smooth(z, 0.5),
+                aoslib.slfront(z, t, 500., dx, dx, f)]
+    if verbose:
+        print("parallel:")
+    with aoslib.parallel(4):
+        out = np.zeros((200, 200), dtype='float32', order='F')
+        assert aoslib.calctw(p, t, rh, out=out) is out
+        results = [out, aoslib.calctw(p, t, rh, ni=50), aoslib.esat(t),
+                   aoslib.smooth(z, 0.5),
+                   aoslib.slfront(z, t, 500., dx, dx, f)]
+    for result, e in zip(results, expected):
+        assert_allclose(result, e)
+
+
+def test_esat_table():
+    t = np.linspace(180., 370., 1000).reshape(20, 50)
+    p = np.ones((20, 50)) * 850.
+    rh = np.ones((20, 50)) * 70.
+    es, q = aoslib.esat(t), aoslib.mixrat(p, t, rh)
+    tw = aoslib.calctw(p, t, rh)
+    if verbose:
+        print("esat_table:")
+    for points, error in ((201, 4.5e-3), (2001, 5.e-5)):
+        with aoslib.esat_table(points):
+            assert_allclose(aoslib.esat(t), es, rtol=error)
+            assert_allclose(aoslib.mixrat(p, t, rh), q, rtol=error)
+            assert_allclose(aoslib.calctw(p, t, rh), tw, atol=0.01)
+        assert_allclose(aoslib.esat(t), es, rtol=0)
+    assert aoslib.set_esat_table(20001) == 0
+    assert aoslib.set_esat_table(0) == 20001
+    np.testing.assert_raises(ValueError, aoslib.set_esat_table, 1)
+
+
+def test_esat_table_calcli():
+    # The first call of calcli builds the lookup table of temp_of_te, which
+    # must not keep the esat table in use at the time, so run it in a new
+    # process.
+    code = '\n'.join([
+        "import numpy as np",
+        "import aoslib",
+        "args = [np.array([[x]]) for x in (850., 300., 60., 260.)]",
+        "with aoslib.esat_table(3):",
+        "    li = aoslib.calcli(*args)[0, 0]",
+        "assert li < -1e36 or abs(li) < 100., li",
+        "li = aoslib.calcli(*args)[0, 0]",
+        "assert abs(li + 14.81) < 0.01, li",
+        "with aoslib.esat_table(2001):",
+        "    li = aoslib.calcli(*args)[0, 0]",
+        "assert abs(li + 14.81) < 0.01, li",
+    ])
+    if verbose:
+        print("esat_table calcli:")
+    assert _run_python(code) == 0
+
+
+def test_moist_table():
+    temp = np.linspace(250., 305., 12).reshape(3, 4)
+    dwpt = temp - np.linspace(0., 15., 12).reshape(3, 4)
+    pres = np.linspace(1000., 400., 12).reshape(3, 4)
+    pfinish = np.linspace(900., 150., 12).reshape(3, 4)
+    thetaw = aoslib.thetawa(temp, dwpt, pres, 1)
+    lifted = aoslib.moistlift(temp, pres, pfinish)
+    cache = tempfile.mkdtemp()
+    os.environ['AOSLIB_CACHE'] = cache
+    try:
+        with aoslib.moist_table():
+            assert_allclose(aoslib.thetawa(temp, dwpt, pres, 1), thetaw,
+                            atol=0.005)
+            assert_allclose(aoslib.moistlift(temp, pres, pfinish), lifted,
+                            atol=0.02)
+        assert len(os.listdir(cache)) == 1
+    finally:
+        del os.environ['AOSLIB_CACHE']
+        shutil.rmtree(cache)
+    if verbose:
+        print("moist_table:")
+        print(lifted)
+    assert_allclose(aoslib.moistlift(temp, pres, pfinish), lifted, rtol=0)
+    assert_allclose(aoslib.moistlift(temp, pres, pres), temp)
+
+
+def test_wetbulb_iterations():
+    t = np.linspace(200., 330., 1000).reshape(20, 50)
+    p = np.linspace(1050., 100., 1000).reshape(50, 20).T
+    rh = np.linspace(1., 100., 50) + np.zeros((20, 1))
+    t[3, 4] = 1e37
+    tw = aoslib.calctw(p, t, rh)
+    if verbose:
+        print("wetbulb_iterations:")
+    assert_allclose(aoslib.calctw(p, t, rh, iterations=3), tw, atol=0.001)
+    assert aoslib.calctw(p, t, rh, iterations=3)[3, 4] > 1e36
+    temp = np.linspace(250., 305., 12)
+    dwpt = temp - np.linspace(0., 15., 12)
+    pres = np.linspace(1000., 400., 12)
+    thetaw = aoslib.thetawa(temp, dwpt, pres, 1)
+    with aoslib.wetbulb_iterations(2):
+        assert_allclose(aoslib.calctw(p, t, rh), tw, atol=0.01)
+        fixed = aoslib.thetawa(temp, dwpt, pres, 1)
+    assert np.all(fixed > 0.)
+    solved = thetaw > -999.
+    assert_allclose(fixed[solved], thetaw[solved], atol=0.001)
+    assert aoslib.set_wetbulb_iterations(3) == 0
+    assert aoslib.set_wetbulb_iterations(0) == 3
+    np.testing.assert_raises(ValueError, aoslib.set_wetbulb_iterations, -1)
+
+
+def test_sounding_batches():
+    p = np.array([1000., 925., 850., 700., 500., 400., 300., 250., 200.])
+    ht = np.array([100., 760., 1460., 3010., 5570., 7190., 9160., 10360.,
+                   11790.])
+    t = np.array([290. - 0.0065 * ht, 295. - 0.0065 * ht, 280. + 0 * ht])
+    td = t - 5.
+    p, ht = p + np.zeros((3, 1)), ht + np.zeros((3, 1))
+    nlvls = [9, 9, 1]
+    if verbose:
+        print("sounding batches:")
+    pfrz, hfrz = aoslib.frzlev_batch(100., p, ht, t, nlvls)
+    assert_allclose(hfrz[:2], (np.array([290., 295.]) - 273.15) / 0.0065,
+                    rtol=1e-5)
+    assert hfrz[2] > 1e36
+    totidx, crstot, vertot = aoslib.totals_batch(p, t, td, nlvls)
+    assert_allclose(vertot[:2], 0.0065 * (5570. - 1460.), rtol=1e-4)
+    assert_allclose(crstot[:2], vertot[:2] - 5., rtol=1e-4)
+    assert_allclose(totidx[:2], crstot[:2] + vertot[:2])
+    result = aoslib.cclpar_batch([8., 12., 8.], p, ht, t, nlvls)
+    for i in range(2):
+        assert_allclose(np.transpose(result)[i],
+                        aoslib.cclpar([8., 12.][i], p[i], ht[i], t[i]))
+    u = 10. + np.zeros((3, 9))
+    wind = aoslib.avwind_batch(100., 6., 0., ht, p, t, u, 0. * u, nlvls)
+    assert_allclose(wind[0][:2], 10.)
+    assert_allclose(wind[2][:2], 270.)
+    assert aoslib.gusts_batch(p, t, td, nlvls)[2] == 99999
+    u = np.linspace(0., 20., 9) + np.zeros((3, 1))
+    rho = p * 100. / (287. * t)
+    richnum = aoslib.richno_batch(ht, ht, u, 0. * u, rho, 500., nlvls, 9)
+    assert_allclose(richnum[:2], [aoslib.richno(ht[i], ht[i], u[i],
+                                                0. * u[i], rho[i], 500.)
+                                  for i in range(2)])
+    assert richnum[2] > 1e36
+    e = aoslib.esat(td[:, 0])
+    mix = 0.622 * e / (p[:, 0] - e)
+    result = aoslib.lclpar_batch(mix, t[:, 0], p, ht, t, td, nlvls)
+    cape = aoslib.capecin(p, ht, t, td, nlvls)
+    assert_allclose(result[0], cape[2])
+    assert_allclose(result[2], cape[3])
+
+
+def test_eqp_batch():
+    p1 = np.array([1013., 900., 700., 500.])
+    p2 = np.array([995., 850., 600., 300., 200.])
+    p = np.concatenate([p1, p2, [980.]])
+    ht = 7000. * np.log(1000. / p)
+    t = 20. + 10. * np.log(p / 1000.)
+    offsets = [0, 4, 9, 10]
+    if verbose:
+        print("eqp_batch:")
+    pp, htt, tt, ttd, nn = aoslib.eqp_batch(10., offsets, p, ht, t, t - 5.)
+    assert list(nn) == [53, 81, 0]
+    assert pp.shape == (3, 81)
+    assert_allclose(pp[0, :3], [1013., 1010., 1000.])
+    assert_allclose(pp[1, :3], [995., 990., 980.])
+    assert_allclose(pp[1, 80], 200.)
+    for i in range(2):
+        n = nn[i]
+        assert_allclose(htt[i, :n], 7000. * np.log(1000. / pp[i, :n]),
+                        rtol=1e-4, atol=0.1)
+        assert_allclose(tt[i, :n] - ttd[i, :n], 5., rtol=1e-4)
+    assert np.all(pp[0, 53:] == 1e37)
+    assert np.all(tt[2] == 1e37)
+    pp, htt, tt, ttd, nn = aoslib.eqp_batch(10., offsets, p, ht, t, t, 60)
+    assert list(nn) == [53, 0, 0]
+    np.testing.assert_raises(ValueError, aoslib.eqp_batch, 10.,
+                             [0, 5, 4, 10], p, ht, t, t)
+
+
+def test_lcl_arrays():
+    t = np.array([[20., 30.], [5., -10.]])
+    td = np.array([[10., 5.], [np.nan, -12.]])
+    p = np.array([1000., 850.])
+    if verbose:
+        print("lcl arrays:")
+    tl, pl, ok = aoslib.tplcl(t, td, p)
+    assert tl.shape == pl.shape == ok.shape == (2, 2)
+    assert_allclose(ok, [[True, True], [False, True]], rtol=0)
+    assert tl[1, 0] > 1e36 and pl[1, 0] > 1e36
+    # Bolton (1980) equation 15.
+    tk, tdk = t + 273.15, td + 273.15
+    tb = 1. / (1. / (tdk - 56.) + np.log(tk / tdk) / 800.) + 56.
+    assert_allclose(tl[ok], tb[ok], atol=0.1)
+    assert_allclose(pl[ok], (p * (tl / tk) ** (1. / 0.2854))[ok], rtol=1e-4)
+    tl, pl, zl, ok = aoslib.tpzlcl(t + 273.15, td + 273.15, p,
+                                   missing='mask')
+    assert_allclose(ok, ~np.isnan(td), rtol=0)
+    assert_allclose(ok, ~zl.mask, rtol=0)
+    assert_allclose(pl[ok], aoslib.tplcl(t, td, p)[1][ok], rtol=1e-3)
+    with aoslib.wetbulb_iterations(3):
+        tl2, pl2, zl2, ok2 = aoslib.tpzlcl(t + 273.15, td + 273.15, p)
+    assert_allclose(ok2, ~np.isnan(td), rtol=0)
+    assert_allclose(tl2[ok], tl[ok], atol=0.01)
+    # All valid parcels converge.
+    rng = np.random.RandomState(0)
+    t = rng.uniform(250., 310., 10000)
+    td = t - rng.uniform(0., 30., 10000)
+    p = rng.uniform(500., 1050., 10000)
+    assert aoslib.tpzlcl(t, td, p)[3].all()
+    assert aoslib.tpzlcl(293.15, 283.15, 1000.)[3]
+
+
+def test_kinematics():
+    x = np.arange(60.)[:, np.newaxis] * 1.e4 + np.zeros(50)
+    y = np.arange(50.) * 1.e4 + np.zeros((60, 1))
+    u = 1.e-5 * x - 3.e-5 * y
+    v = 2.e-5 * x + 1.e-5 * y
+    dx = np.ones((60, 50)) * 1.e4
+    dy = np.ones((60, 50)) * 1.e4
+    q = 1.e-10 * x ** 2
+    names = ['vorticity', 'divergence', 'deformation', 'q_laplacian']
+    expected = [5.e-5 + q[1:-1, 1:-1], 2.e-5, 1.e-5, 2.e-10]
+    if verbose:
+        print("kinematics:")
+    fields = aoslib.kinematics(u, v, dx, dy, names, q=q)
+    for name, e in zip(names, expected):
+        assert np.all(fields[name][[0, -1]] == 1e37)
+        assert np.all(fields[name][:, [0, -1]] == 1e37)
+        assert_allclose(fields[name][1:-1, 1:-1], e, rtol=1e-3)
+    with aoslib.parallel(4):
+        again = aoslib.kinematics(u, v, dx, dy, names, q=q)
+    for name in names:
+        assert_allclose(again[name], fields[name], rtol=0)
+    np.testing.assert_raises(ValueError, aoslib.kinematics, u, v, dx, dy,
+                             ['q_advection'])
+    np.testing.assert_raises(ValueError, aoslib.kinematics, u, v, dx, dy,
+                             ['shear'])
+
+
+def test_moisture():
+    p = 1000. - 4. * np.arange(200.)[:, np.newaxis] + np.zeros(200)
+    t = 300. - 0.5 * np.arange(200.) + np.zeros((200, 1))
+    rh = 0.5 + 0.5 * np.arange(200.)[:, np.newaxis] + np.zeros(200)
+    p[3, 4] = 1e37
+    t[5, 6] = 1e37
+    names = ['dewpoint', 'dewpoint_depression', 'mixing_ratio',
+             'specific_humidity', 'virtual_temperature', 'thetae',
+             'condensation_pressure', 'condensation_pressure_deficit',
+             'wetbulb']
+    funcs = [lambda: aoslib.calctd(t, rh), lambda: aoslib.calcdpd(t, rh),
+             lambda: aoslib.mixrat(p, t, rh),
+             lambda: aoslib.spechum(p, t, rh),
+             lambda: aoslib.calctv(p, t, rh),
+             lambda: aoslib.calcthetae(p, t, rh),
+             lambda: aoslib.calccondpr(p, t, rh),
+             lambda: aoslib.calccondprdef(p, t, rh),
+             lambda: aoslib.calctw(p, t, rh)]
+    if verbose:
+        print("moisture:")
+    fields = aoslib.moisture(p, t, rh, names)
+    for name, func in zip(names, funcs):
+        assert_allclose(fields[name], func(), rtol=1e-5)
+    for name in ('dewpoint', 'dewpoint_depression', 'condensation_pressure',
+                 'wetbulb'):
+        assert_allclose(fields[name], aoslib.moisture(p, t, rh, [name])[name],
+                        rtol=0)
+    assert fields['dewpoint'][3, 4] < 1e36
+    assert fields['mixing_ratio'][3, 4] == 1e37
+    with aoslib.parallel(4):
+        again = aoslib.moisture(p, t, rh, names[::-1], missing='nan')
+    for name in names:
+        assert_allclose(again[name], np.where(fields[name] > 1e36, np.nan,
+                                              fields[name]), rtol=0)
+    with aoslib.esat_table(), aoslib.wetbulb_iterations():
+        fields = aoslib.moisture(p, t, rh, ['mixing_ratio', 'wetbulb'])
+        assert_allclose(fields['mixing_ratio'], aoslib.mixrat(p, t, rh),
+                        rtol=0)
+        assert_allclose(fields['wetbulb'], aoslib.calctw(p, t, rh), rtol=0)
+    np.testing.assert_raises(ValueError, aoslib.moisture, p, t, rh,
+                             ['dewpoint', 'dewpoint'])
+    np.testing.assert_raises(ValueError, aoslib.moisture, p, t, rh, ['rh'])
+
+
+def test_isentropic():
+    levels = np.linspace(1000., 200., 17)
+    y = np.arange(150.)[:, np.newaxis] + np.zeros(250)
+    theta = 280. + 3. * np.arange(17.)[:, np.newaxis, np.newaxis] + 0.02 * y
+    t = np.asarray(theta * (levels[:, np.newaxis, np.newaxis] / 1000.) **
+                   0.286, dtype=np.float32)
+    u = np.asarray(0.5 * theta, dtype=np.float32)
+    v = u - 20.
+    z = np.asarray(100. * theta, dtype=np.float32)
+    u[13, 10, 20] = 1e37
+    if verbose:
+        print("isentropic:")
+    with aoslib.copy_mode('raise'):
+        fields = aoslib.isentropic(levels, t, u, v, z, [270., 300., 320.])
+    assert fields['p'].shape == (3, 150, 250)
+    assert np.all(fields['p'][0] == 1e37)
+    assert_allclose(fields['z'][1], 30000., rtol=1e-6)
+    assert_allclose(fields['z'][2], 32000., rtol=1e-6)
+    assert_allclose(fields['v'][1], 130., rtol=1e-6)
+    assert_allclose(fields['v'][2], 140., rtol=1e-6)
+    assert fields['u'][2, 10, 20] == 1e37
+    assert fields['z'][2, 10, 20] < 1e36
+    # theta = 300 lies on level 6 where y is 100.
+    assert_allclose(fields['p'][1, 100], levels[6], rtol=1e-5)
+    assert np.all((fields['p'][1] < levels[6]) == (y < 100.))
+    with aoslib.parallel(4):
+        again = aoslib.isentropic(levels[::-1], t[::-1], u[::-1], v[::-1],
+                                  z[::-1], [270., 300., 320.],
+                                  missing='nan')
+    for name in 'puvz':
+        assert_allclose(again[name], np.where(fields[name] > 1e36, np.nan,
+                                              fields[name]), rtol=0)
+    np.testing.assert_raises(ValueError, aoslib.isentropic, levels[1:], t,
+                             u, u, z, [300.])
+
+
+def test_vertical_interp():
+    p = np.array([1010., 950., 870., 780., 690., 560., 430., 300.])
+    pcube = p[:, np.newaxis, np.newaxis] * (1. + 0.01 * np.arange(3.) +
+                                          np.zeros((4, 1)))
+    t = 300. + 20. * np.log(pcube / 1000.)
+    u = 5. + np.arange(4.)[:, np.newaxis] - 0.01 * pcube
+    levels = [1000., 850., 500., 250.]
+    if verbose:
+        print("vertical_interp:")
+    plan = aoslib.vertical_plan(pcube, levels)
+    tl, ul = aoslib.vertical_interp(plan, [t, u])
+    assert tl.shape == (4, 4, 3)
+    assert_allclose(tl[:3], 300. + 20. * np.log(np.array(levels[:3]) /
+                    1000.)[:, np.newaxis, np.newaxis] + np.zeros((4, 3)),
+                    rtol=1e-6)
+    assert np.all(tl[3] == 1e37)
+    logp = np.log(pcube[::-1, 2, 1])
+    assert_allclose(ul[:3, 2, 1], np.interp(np.log(levels[:3]), logp,
+                                            u[::-1, 2, 1]), rtol=1e-5)
+    # Batches of soundings, with the levels of the second reversed.
+    cols = np.array([p, p[::-1] * 1.02, p])
+    tcols = 300. + 20. * np.log(cols / 1000.)
+    tcols[2, 3] = 1e37
+    plan = aoslib.vertical_plan(cols, levels, batch=True, nlvls=[8, 8, 6])
+    with aoslib.parallel(2):
+        result, again = aoslib.vertical_interp(plan, [tcols, tcols],
+                                               missing='nan')
+    assert result.shape == (3, 4)
+    assert_allclose(result[:2, :3], 300. + 20. * np.log(
+        np.array(levels[:3]) / 1000.) + np.zeros((2, 1)), rtol=1e-6)
+    assert np.isnan(result[2, 1]) and np.isnan(result[2, 2])
+    assert_allclose(again, result, rtol=0)
+    np.testing.assert_raises(ValueError, aoslib.vertical_interp, plan, t)
+    # A single sounding, or a batch, given as nested lists is one field.
+    plan = aoslib.vertical_plan([1000., 850., 700.], [900.], batch=True)
+    assert_allclose(aoslib.vertical_interp(plan, [20., 10., 0.]),
+                    aoslib.vertical_interp(plan, np.array([20., 10., 0.])),
+                    rtol=0)
+    plan = aoslib.vertical_plan(cols, levels, batch=True, nlvls=[8, 8, 6])
+    assert_allclose(aoslib.vertical_interp(plan, tcols.tolist(),
+                                           missing='nan'), result, rtol=0)
+
+
+def test_qg_diagnostics():
+    x = np.arange(40.)[:, np.newaxis] * 4.e4 + np.zeros(30)
+    y = np.arange(30.) * 4.e4 + np.zeros((40, 1))
+    ztop = 9000. + 50. * np.sin(x / 8.e5) * np.cos(y / 6.e5)
+    zbot = 3000. + 30. * np.sin(x / 5.e5 + 1.) * np.cos(y / 9.e5)
+    t = 260. + 5. * np.sin(x / 7.e5) + 0.001 * y / 4.e4
+    dx = np.ones((40, 30)) * 4.e4
+    f = np.ones((40, 30)) * 1.e-4
+    zmid = np.zeros((40, 30))
+    if verbose:
+        print("qg_diagnostics:")
+    layer = aoslib.qg_layer(ztop, zbot, 300., 700., dx, dx, f)
+    fields = aoslib.qg_diagnostics(layer, ['frontogenesis', 'qdiv', 'qndiv'])
+    assert_allclose(fields['qdiv'],
+                    aoslib.qdiverg(zmid, ztop, zbot, 300., 700., dx, dx, f),
+                    rtol=0)
+    assert_allclose(fields['qndiv'],
+                    aoslib.fndiverg(zmid, ztop, zbot, 300., 700., dx, dx, f),
+                    rtol=0)
+    fields = aoslib.qg_diagnostics(layer, ['qnx', 'qsx', 'qx'])
+    inner = fields['qx'] < 1e36
+    assert_allclose(fields['qnx'][inner] + fields['qsx'][inner],
+                    fields['qx'][inner], rtol=1e-4, atol=1e-16)
+    level = aoslib.qg_level(ztop, t, 500., dx, dx, f)
+    fields = aoslib.qg_diagnostics(level, ['frontogenesis'])
+    assert_allclose(fields['frontogenesis'],
+                    aoslib.slfront(ztop, t, 500., dx, dx, f), rtol=0)
+    np.testing.assert_raises(ValueError, aoslib.qg_diagnostics, level,
+                             ['qdiv', 'qdiv'])
+
+
+def test_smooth_passes():
+    z = 5500. + 40. * np.sin(np.arange(300.).reshape(20, 15))
+    z[8:10, 4] = 1e37
+    if verbose:
+        print("smooth passes:")
+    expected = z
+    for i in range(3):
+        expected = aoslib.smooth(expected, 0.5)
+        expected = aoslib.smooth(expected, -0.5)
+    result = aoslib.smooth(z, [0.5, -0.5], npasses=3)
+    assert_allclose(result, expected, rtol=0)
+    assert np.all(result[8:10, 4] > 1e36)
+    stack = np.array([z, 2. * z])
+    result = aoslib.smooth(stack, [0.5, -0.5], npasses=3)
+    assert result.shape == (2, 20, 15)
+    assert_allclose(result[0], expected, rtol=0)
+    assert_allclose(result[1][z < 1e36],
+                    aoslib.smooth(2. * z, [0.5, -0.5] * 3)[z < 1e36],
+                    rtol=0)
+    out = np.zeros((2, 20, 15))
+    aoslib.smooth(stack, [0.5, -0.5], out=out, npasses=3)
+    assert_allclose(out, result, rtol=0)
+
+
+def test_contour():
+    a = np.hypot(*np.mgrid[-5:6, -5:6])
+    if verbose:
+        print("contour:")
+    lines = aoslib.contour(a, [4.5, 2.5])
+    for level, found in zip([4.5, 2.5], lines):
+        assert len(found) == 1
+        xy = found[0]
+        assert_allclose(xy[0], xy[-1], rtol=0)
+        assert_allclose(np.hypot(xy[:, 0] - 5., xy[:, 1] - 5.), level,
+                        atol=0.15)
+        # Higher values on the right: anticlockwise around a minimum.
+        area = np.sum(xy[:-1, 0] * xy[1:, 1] - xy[1:, 0] * xy[:-1, 1])
+        assert area > 0
+    levels = np.linspace(0.1, 7., 300)
+    lines = aoslib.contour(a, levels)
+    assert len(lines) == 300 and all(len(found) > 0 for found in lines)
+    b = a.copy()
+    b[5, :] = np.nan
+    lines = aoslib.contour(b, [2.5], badlo=None)
+    assert len(lines[0]) == 2
+    assert np.all(np.abs(lines[0][0][:, 0] - 5.) >= 1.)
+    assert aoslib.contour(np.ma.masked_less(a, 3.), [2.5]) == [[]]
 
 
 def test_cclpar():
@@ -1246,6 +2088,45 @@ def test_cclpar():
     assert_allclose(res2, test_res2, atol=ATOL)
 
 
+def test_capecin():
+    p = np.array([1000., 950., 900., 850., 800., 750., 700., 650., 600.,
+                  550., 500., 450., 400., 350., 300., 250., 200., 150.,
+                  100.], dtype='float32')
+    h = np.array([100., 540., 990., 1460., 1950., 2460., 3010., 3590.,
+                  4210., 4870., 5570., 6330., 7180., 8110., 9160., 10360.,
+                  11790., 13600., 16180.], dtype='float32')
+    t = np.array([303., 299., 296., 293., 290., 287., 284., 280., 276.,
+                  271., 266., 260., 253., 245., 236., 226., 217., 212.,
+                  205.], dtype='float32')
+    td = np.array([295., 293., 291., 287., 283., 278., 272., 266., 260.,
+                   252., 245., 238., 230., 222., 213., 205., 195., 190.,
+                   185.], dtype='float32')
+
+    test_res = (2684.0847, -74.26891, 890.625, 1076.1033, 753.125,
+                2427.1423, 173.4375, 12686.5625)
+
+    res = aoslib.capecin(p, h, t, td)
+    if verbose:
+        print("capecin:")
+        print(res)
+    assert len(res) == 8
+    assert res[0].shape == (1, )
+    assert_allclose([r[0] for r in res], test_res, rtol=1e-3)
+
+    # batch of soundings, second is stable, third has too few levels
+    ps = np.array([p, p, p])
+    hs = np.array([h, h, h])
+    ts = np.array([t, t - 5, t])
+    tds = np.array([td, td - 10, td])
+    res = aoslib.capecin(ps, hs, ts, tds, nlvls=[19, 19, 1])
+    assert_allclose([r[0] for r in res], test_res, rtol=1e-3)
+    assert res[0][1] == 0
+    assert res[1][1] == 0
+    assert res[4][1] == 99999.
+    assert res[6][1] == 99999.
+    assert np.all([r[2] > 9.e36 for r in res])
+
+
 def test_add_aray():
 
     # simple test
@@ -0,0 +1,47 @@
+"""
+Benchmarks of the grid routines using finite differences or neighbouring
+points: potential vorticity, geostrophic and QG diagnostics, kinematics,
+smoothing and contouring.
+"""
+
+import aoslib
+
+from .common import GRID_SIZES, LAYOUTS, RoutineBenchmark, grid_fields
+
+
+class Stencil(RoutineBenchmark):
+    """ Routines computing each point from its neighbours. """
+    routines = {
+        'calcpv': ('pup', 'plow', 310., 300., 'u', 'v', 'u', 'v', 'dx', 'dy',
+                   'f'),
+        'contour': ('t', [255., 265., 275., 285., 295.]),
+        'dgeocomps': ('zmid', 'f', 'dx', 'dy'),
+        'fndiverg': ('zmid', 'ztop', 'zbot', 300., 700., 'dx', 'dy', 'f'),
+        'kinematics': ('u', 'v', 'dx', 'dy',
+                       ['vorticity', 'divergence', 'deformation']),
+        'meanomega': ('pup', 'u', 'v', 'plow', 'u', 'v', 'dx', 'dy', 3600.),
+        'qdiverg': ('zmid', 'ztop', 'zbot', 300., 700., 'dx', 'dy', 'f'),
+        'qg_layer': ('ztop', 'zbot', 300., 700., 'dx', 'dy', 'f'),
+        'qg_level': ('zmid', 't', 500., 'dx', 'dy', 'f'),
+        'slfront': ('zmid', 't', 500., 'dx', 'dy', 'f'),
+        'smooth': ('t', 0.5),
+    }
+    params = [sorted(routines), GRID_SIZES, LAYOUTS]
+    param_names = ['routine', 'size', 'layout']
+
+    def setup(self, name, size, layout):
+        self.fields = grid_fields(size, layout)
+        self.prepare(name)
+
+
+class QGDiagnostics(RoutineBenchmark):
+    """ QG products derived from the gradients cached by qg_layer. """
+    products = ['qx', 'qy', 'qdiv', 'qndiv', 'qsdiv', 'frontogenesis']
+    params = [GRID_SIZES, LAYOUTS]
+    param_names = ['size', 'layout']
+
+    def setup(self, size, layout):
+        fields = grid_fields(size, layout)
+        self.func = aoslib.qg_diagnostics
+        self.args = [aoslib.qg_layer(*fields.args(
+            Stencil.routines['qg_layer'])), self.products]
@@ -0,0 +1,104 @@
+"""
+Benchmarks of the pointwise grid routines, the ``*_aray`` style
+element-by-element routines and the routines interpolating (nlev, ny, nx)
+cubes between levels.
+"""
+
+import aoslib
+
+from .common import (CUBE_SIZES, GRID_SIZES, LAYOUTS, RoutineBenchmark,
+                     cube_fields, grid_fields)
+
+
+class PointwiseGrid(RoutineBenchmark):
+    """ Pointwise (mni, nj) grid routines. """
+    routines = {
+        'add_aray': ('a', 'b'),
+        'add_by_cnst': ('a', 2.),
+        'alt2press': ('alt', 'z'),
+        'calccondpr': ('p', 't', 'rh'),
+        'calccondprdef': ('p', 't', 'rh'),
+        'calcdpd': ('t', 'rh'),
+        'calcli': ('p', 't', 'rh', 't5'),
+        'calcrh': ('t', 'td'),
+        'calcrh2': ('p', 't', 'q'),
+        'calctd': ('t', 'rh'),
+        'calctd2': ('p', 't', 'q'),
+        'calcthetae': ('p', 't', 'rh'),
+        'calcthetae2': ('p', 't', 'td'),
+        'calctv': ('p', 't', 'rh'),
+        'calctv2': ('t', 'q'),
+        'calctw': ('p', 't', 'rh'),
+        'constant': ('a', 0.),
+        'crossvectors': ('u', 'v', 'a', 'b'),
+        'derivative': ('a', 'b', 'p', 't'),
+        'derived_icing': ('t', 'rh'),
+        'div_aray': ('a', 'b'),
+        'dotvectors': ('u', 'v', 'a', 'b'),
+        'exp_aray': ('a', ),
+        'hgt2pres': ('z', ),
+        'lintrans': ('a', 2., 1.),
+        'mixrat': ('p', 't', 'rh'),
+        'moisture': ('p', 't', 'rh',
+                     ['dewpoint', 'dewpoint_depression', 'mixing_ratio',
+                      'specific_humidity', 'virtual_temperature', 'thetae',
+                      'condensation_pressure',
+                      'condensation_pressure_deficit', 'wetbulb']),
+        'mslp2thkns': ('mslp', 'hgt'),
+        'mult_by_cnst': ('a', 2.),
+        'natlog': ('a', ),
+        'powercalc': ('a', 'b'),
+        'press2alt': ('p', 'z'),
+        'spechum': ('p', 't', 'rh'),
+        'spechum2': ('p', 'td'),
+        'tv2temp': ('tv', 'q'),
+    }
+    params = [sorted(routines), GRID_SIZES, LAYOUTS]
+    param_names = ['routine', 'size', 'layout']
+
+    def setup(self, name, size, layout):
+        self.fields = grid_fields(size, layout)
+        self.prepare(name)
+
+
+class Elementwise(PointwiseGrid):
+    """ Element-by-element thermodynamic routines. """
+    routines = {
+        'dmixr': ('t', 'p', 1),
+        'esat': ('t', ),
+        'moistlift': ('t', 'p', 500.),
+        'pottemp': ('t', 'td', 'p', 1),
+        'radiation': ('lat', 'lon', -90., 172, 15., 0.1, 1.),
+        'tdofesat': ('es', ),
+        'thetawa': ('t', 'td', 'p', 1),
+        'tplcl': ('tc', 'tdc', 'p'),
+        'tpzlcl': ('t', 'td', 'p'),
+    }
+    params = [sorted(routines), GRID_SIZES, LAYOUTS]
+
+
+class Cube(RoutineBenchmark):
+    """ Routines interpolating (nlev, ny, nx) cubes between levels. """
+    routines = {
+        'isentropic': ('plev', 't', 'u', 'v', 'z',
+                       [305., 310., 315., 320., 325., 330., 335., 340.]),
+        'vertical_plan': ('p', [1000., 925., 850., 700., 500., 300., 250.]),
+    }
+    params = [sorted(routines), CUBE_SIZES, LAYOUTS]
+    param_names = ['routine', 'size', 'layout']
+
+    def setup(self, name, size, layout):
+        self.fields = cube_fields(size, layout)
+        self.prepare(name)
+
+
+class VerticalInterp(RoutineBenchmark):
+    """ Interpolation of cubes with the plan made by vertical_plan. """
+    params = [CUBE_SIZES, LAYOUTS]
+    param_names = ['size', 'layout']
+
+    def setup(self, size, layout):
+        fields = cube_fields(size, layout)
+        self.func = aoslib.vertical_interp
+        self.args = [aoslib.vertical_plan(*fields.args(
+            Cube.routines['vertical_plan'])), fields.args(['t', 'u', 'v'])]
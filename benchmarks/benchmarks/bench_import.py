@@ -0,0 +1,17 @@
+"""
+Benchmarks of the time to import aoslib, each in a new interpreter.
+"""
+
+
+class Import(object):
+    """ Import of the package and first use of a routine. """
+    timeout = 120
+
+    def timeraw_import(self):
+        return "import aoslib"
+
+    def timeraw_import_awips(self):
+        return "import aoslib.awips"
+
+    def timeraw_first_call(self):
+        return "import aoslib; aoslib.calctd([[300.]], [[50.]])"
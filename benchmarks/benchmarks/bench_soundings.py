@@ -0,0 +1,81 @@
+"""
+Benchmarks of the sounding routines, on batches of soundings and on
+single soundings.
+"""
+
+import numpy as np
+
+import aoslib
+
+from .common import (BATCH_SIZES, LAYOUTS, NLEV, RoutineBenchmark,
+                     sounding_fields)
+
+
+class Batch(RoutineBenchmark):
+    """ Routines processing a batch of (ncol, nlev) soundings. """
+    routines = {
+        'avwind_batch': ('elev', 6., 0., 'ht', 'p', 't', 'u', 'v'),
+        'capecin': ('p', 'ht', 't', 'td'),
+        'cclpar_batch': ('mix', 'p', 'ht', 't'),
+        'eqp_batch': (10., 'offsets', 'flat_p', 'flat_ht', 'flat_t',
+                      'flat_td'),
+        'frzlev_batch': ('elev', 'p', 'ht', 't'),
+        'gusts_batch': ('p', 't', 'td'),
+        'helicity_batch': ('ht', 'p', 'u', 'v', 'elev', 3000., 270., 15.),
+        'lclpar_batch': ('mix', 'ts', 'p', 'ht', 't', 'td'),
+        'richno_batch': ('ht', 'ht', 'u', 'v', 'rho', 500.),
+        'sweat_batch': ('p', 't', 'td', 'p', 'u', 'v'),
+        'totals_batch': ('p', 't', 'td'),
+    }
+    params = [sorted(routines), BATCH_SIZES, LAYOUTS]
+    param_names = ['routine', 'ncol', 'layout']
+
+    def setup(self, name, ncol, layout):
+        self.fields = sounding_fields(ncol, layout)
+        self.prepare(name)
+
+
+class SingleSounding(object):
+    """ Routines working on a single sounding, called once per sounding. """
+    params = [LAYOUTS]
+    param_names = ['layout']
+
+    def setup(self, layout):
+        f = sounding_fields(1, layout)
+        self.p, self.ht, self.t, self.u, self.v, self.rho = [
+            f[name][0] for name in ('p', 'ht', 't', 'u', 'v', 'rho')]
+        self.vv = np.linspace(0., 20., NLEV)
+
+    def time_cclpar(self, layout):
+        aoslib.cclpar(0.01, self.p, self.ht, self.t)
+
+    def time_ctop(self, layout):
+        aoslib.ctop(self.p, self.ht, self.vv, 200.)
+
+    def time_density(self, layout):
+        aoslib.density(self.p, self.t - 273.15)
+
+    def time_richno(self, layout):
+        aoslib.richno(self.ht, self.ht, self.u, self.v, self.rho, 500.)
+
+
+class Scalars(object):
+    """ Routines of scalar arguments, called once per point. """
+
+    def time_dzdlnp(self):
+        aoslib.dzdlnp(850., 280., 275.)
+
+    def time_ptozsa(self):
+        aoslib.ptozsa(500.)
+
+    def time_ztopsa(self):
+        aoslib.ztopsa(5500.)
+
+    def time_radnorm(self):
+        aoslib.radnorm(2455000.)
+
+    def time_soldec(self):
+        aoslib.soldec(2455000.)
+
+    def time_timeq(self):
+        aoslib.timeq(2455000.)
@@ -0,0 +1,241 @@
+"""
+Input fields and measurements shared by the aoslib benchmarks.
+
+Each benchmark class lists the routines it covers in `routines`, a
+mapping from the name of the aoslib function to its arguments.  A string
+argument names one of the fields built by `grid_fields`,
+`sounding_fields` or `cube_fields`, anything else is passed unchanged.
+The fields are generated in one of the input `LAYOUTS`:
+
+* 'float32-F' -- float32 arrays in Fortran order, the layout of the
+  compiled routines.
+* 'float64-C' -- float64 arrays in C order, as numpy creates by default,
+  which the wrappers convert before each call.
+"""
+
+import warnings
+
+import numpy as np
+
+import aoslib
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+LAYOUTS = ['float32-F', 'float64-C']
+
+# Grid sizes (points along each side) and sounding batch sizes (columns).
+GRID_SIZES = [100, 1000, 4000]
+BATCH_SIZES = [1, 1000, 100000]
+
+# Grid sizes of the (NLEV, n, n) cubes.
+CUBE_SIZES = [100, 500]
+
+# Number of levels of the soundings and cubes.
+NLEV = 40
+
+
+def as_layout(a, layout):
+    """ `a` as an array in the given input layout. """
+    if layout == 'float32-F':
+        return np.asfortranarray(a, dtype=np.float32)
+    if layout == 'float64-C':
+        return np.ascontiguousarray(a, dtype=np.float64)
+    raise ValueError('unknown layout %r' % (layout, ))
+
+
+def as_cube_layout(a, layout):
+    """
+    `a` as an array in the given input layout, for the routines taking
+    (nlev, ny, nx) cubes.  Their compiled routines work on the transpose,
+    so 'float32-F' cubes are in C order.
+    """
+    if layout == 'float32-F':
+        return as_layout(a.T, layout).T
+    return as_layout(a, layout)
+
+
+class Fields(object):
+    """
+    Named input fields, built the first time they are used.
+
+    `makers` maps each name to a function of the Fields object returning
+    the field as a float64 array, which `convert` stores in the requested
+    layout.
+    """
+
+    def __init__(self, makers, layout, convert=as_layout):
+        self.makers = makers
+        self.layout = layout
+        self.convert = convert
+        self.fields = {}
+
+    def __getitem__(self, name):
+        if name not in self.fields:
+            self.fields[name] = self.convert(self.makers[name](self),
+                                             self.layout)
+        return self.fields[name]
+
+    def args(self, spec):
+        """ The arguments described by `spec`, see the module docstring. """
+        return [self[a] if isinstance(a, str) else a for a in spec]
+
+
+def _coords(n):
+    """ Coordinates running from 0 to 1 across an n by n grid. """
+    x = np.linspace(0., 1., n)
+    return x[:, np.newaxis] + np.zeros(n), np.zeros((n, 1)) + x
+
+
+def _wave(n, scale):
+    """ A smooth two dimensional wave with an amplitude of `scale`. """
+    x, y = _coords(n)
+    return scale * np.sin(4. * np.pi * x) * np.cos(3. * np.pi * y)
+
+
+def grid_fields(n, layout):
+    """
+    Fields of n by n points with realistic values for the grid routines.
+    """
+    x, y = _coords(n)
+    makers = {
+        'p': lambda f: 500. + 500. * x,
+        'pup': lambda f: 330. + 40. * x + _wave(n, 10.),
+        'plow': lambda f: 450. + 50. * x + _wave(n, 15.),
+        't': lambda f: 250. + 50. * y + _wave(n, 3.),
+        'tc': lambda f: f['t'] - 273.15,
+        'td': lambda f: f['t'] - 2. - 20. * (1. - x),
+        'tdc': lambda f: f['td'] - 273.15,
+        't5': lambda f: 255. + 10. * y,
+        'tv': lambda f: f['t'] + 1.,
+        'rh': lambda f: 10. + 90. * x,
+        'q': lambda f: 0.001 + 0.015 * x,
+        'es': lambda f: 1. + 40. * x,
+        'alt': lambda f: 1000. + 30. * x,
+        'z': lambda f: 3000. * x,
+        'mslp': lambda f: 990. + 30. * y,
+        'hgt': lambda f: 5400. + 300. * y,
+        'zmid': lambda f: 5500. + 200. * y + _wave(n, 60.),
+        'ztop': lambda f: f['zmid'] + 2000. + _wave(n, 20.),
+        'zbot': lambda f: f['zmid'] - 2000.,
+        'u': lambda f: 10. + _wave(n, 5.),
+        'v': lambda f: 5. - _wave(n, 4.),
+        'a': lambda f: 0.5 + 1.5 * x,
+        'b': lambda f: 2. - 1.5 * y,
+        'dx': lambda f: 2.e4 + 0. * x,
+        'dy': lambda f: 2.e4 + 0. * x,
+        'f': lambda f: 8.e-5 + 4.e-5 * y,
+        'lat': lambda f: 20. + 30. * y,
+        'lon': lambda f: -120. + 50. * x,
+    }
+    return Fields(makers, layout)
+
+
+def sounding_fields(ncol, layout):
+    """
+    A batch of `ncol` soundings of NLEV levels, as (ncol, NLEV) arrays, and
+    per column values as (ncol, ) arrays.  The 'flat_' fields hold the
+    soundings one after the other, starting at 'offsets'.
+    """
+    level = np.linspace(0., 1., NLEV)
+    col = np.linspace(0., 1., ncol)[:, np.newaxis]
+    makers = {
+        'p': lambda f: 1000. - 900. * level - 50. * col,
+        'ht': lambda f: 7400. * np.log(1000. / f['p']),
+        't': lambda f: np.maximum(300. - 10. * col - 0.0065 * f['ht'],
+                                  210.),
+        'td': lambda f: f['t'] - 2. - 20. * level - 5. * col,
+        'u': lambda f: 5. + 30. * level + 0. * col,
+        'v': lambda f: 10. * level - 5. * col,
+        'rho': lambda f: f['p'] * 100. / (287. * f['t']),
+        'elev': lambda f: f['ht'][:, 0],
+        'ts': lambda f: f['t'][:, 0],
+        'mix': lambda f: 0.006 + 0.008 * col[:, 0],
+        'offsets': lambda f: NLEV * np.arange(ncol + 1.),
+        'flat_p': lambda f: f['p'].reshape(-1),
+        'flat_ht': lambda f: f['ht'].reshape(-1),
+        'flat_t': lambda f: f['t'].reshape(-1),
+        'flat_td': lambda f: f['td'].reshape(-1),
+    }
+    return Fields(makers, layout)
+
+
+def cube_fields(n, layout):
+    """
+    Fields on NLEV pressure levels 'plev' of n by n points, as (NLEV, n, n)
+    cubes.  The 'p' cube holds pressures varying across the grid, as on
+    model levels.
+    """
+    plev = np.linspace(1000., 100., NLEV)
+    level = plev[:, np.newaxis, np.newaxis]
+    x, y = _coords(n)
+    makers = {
+        'plev': lambda f: plev,
+        'p': lambda f: level * (1. - 0.05 * x),
+        't': lambda f: 300. * (level / 1000.) ** 0.2 + _wave(n, 3.),
+        'u': lambda f: 5. + 0.03 * (1000. - level) + _wave(n, 5.),
+        'v': lambda f: 5. - _wave(n, 4.) + 0. * level,
+        'z': lambda f: 7400. * np.log(1000. / level) + _wave(n, 20.),
+    }
+    return Fields(makers, layout, as_cube_layout)
+
+
+def count_copies(func, args):
+    """ Number of input arrays copied by a call of `func`. """
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always', aoslib.CopyWarning)
+        with aoslib.copy_mode('warn'):
+            func(*args)
+    return len([w for w in caught
+                if issubclass(w.category, aoslib.CopyWarning)])
+
+
+def allocated_mb(func, args):
+    """
+    Peak memory allocated by a call of `func` (MB), including the arrays it
+    returns.  NaN when tracemalloc is not available.
+    """
+    if tracemalloc is None:
+        return float('nan')
+    tracemalloc.start()
+    try:
+        func(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak / 1.e6
+
+
+class RoutineBenchmark(object):
+    """
+    Time, peak memory, input copies and allocated memory of one call of
+    each routine in `routines`.
+
+    Subclasses set `routines`, `params` and `param_names` and build
+    ``self.fields`` in `setup` before calling `prepare`.
+    """
+    routines = {}
+    timeout = 600
+
+    def setup(self, *params):
+        raise NotImplementedError()
+
+    def prepare(self, name):
+        self.func = getattr(aoslib, name)
+        self.args = self.fields.args(self.routines[name])
+
+    def time_call(self, *params):
+        self.func(*self.args)
+
+    def peakmem_call(self, *params):
+        self.func(*self.args)
+
+    def track_copies(self, *params):
+        return count_copies(self.func, self.args)
+    track_copies.unit = 'copies'
+
+    def track_allocated(self, *params):
+        return allocated_mb(self.func, self.args)
+    track_allocated.unit = 'MB'